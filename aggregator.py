@@ -1,25 +1,63 @@
 """
 Cloud cost aggregator - orchestrates cost collection from all providers
 """
-from datetime import date
-from typing import List, Dict
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import Any, Callable, List, Dict, Iterable, Iterator, Optional, Tuple
+from itertools import islice
+import asyncio
 import logging
+import queue
+import sqlite3
 import sys
+import threading
 
+from sqlalchemy import select, tuple_
 from sqlalchemy.dialects.postgresql import insert
 
-from collectors.base_collector import CostRecord
-from collectors.aws_collector import AWSCollector
-from collectors.gcp_collector import GCPCollector
-from collectors.azure_collector import AzureCollector
+from collectors import COLLECTOR_CLASS_PATHS, load_collector_class
+from collectors.base_collector import BaseCollector, CostRecord, CostRecordBatch, CostRecords, records_between, total_cost_usd
+from collectors.response_cache import ResponseCache
 from database.connection import DatabaseManager
 from database.models import CloudCost
+from database.partitions import PartitionManager
+from database.rollups import CostDelta, CostRollups
+from database.watermarks import FinalizedDateStore, Watermark, WatermarkStore
 from config import Config
+from utils.date_utils import get_date_list, group_consecutive_dates
 from utils.logger import get_logger
+from utils.task_scheduler import AsyncWindowTaskScheduler, WindowTask, WindowTaskScheduler
 
 logger = get_logger('cloud_cost_aggregator')
 
+WRITE_MODES = ('upsert', 'copy')
+ENGINES = ('thread', 'async')
+
+
+def _iter_batches(records: Iterable[CostRecord], batch_size: int) -> Iterator[List[CostRecord]]:
+    """Yield lists of at most batch_size records from an iterable"""
+    iterator = iter(records)
+    while True:
+        batch = list(islice(iterator, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+def _source_label(provider: str, account_id: str) -> str:
+    """Display name of a provider account, e.g. 'AWS' or 'AWS/prod'"""
+    return f"{provider.upper()}/{account_id}" if account_id else provider.upper()
+
+
+def _empty_write_counts() -> Dict[str, int]:
+    """Zeroed write statistics as returned by CostAggregator.save_costs"""
+    return {
+        'saved_records': 0,
+        'inserted_records': 0,
+        'updated_records': 0,
+        'unchanged_records': 0
+    }
+
 
 class CostAggregator:
     """
@@ -27,68 +65,141 @@ class CostAggregator:
     and stores results in PostgreSQL
     """
 
-    def __init__(self, config: Config, db_manager: DatabaseManager):
+    def __init__(
+        self,
+        config: Config,
+        db_manager: DatabaseManager,
+        write_mode: str = 'upsert',
+        engine: str = 'thread'
+    ):
         """
         Initialize cost aggregator
 
         Args:
             config: Application configuration
             db_manager: Database manager instance
+            write_mode: 'upsert' for batched INSERT ... ON CONFLICT,
+                        'copy' for COPY into a staging table followed by one merge
+            engine: 'thread' to run window tasks on a thread pool,
+                    'async' to run them on one asyncio event loop
         """
+        if write_mode not in WRITE_MODES:
+            raise ValueError(f"Unknown write mode: {write_mode}")
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown engine: {engine}")
+
         self.config = config
         self.db_manager = db_manager
+        self.write_mode = write_mode
+        self.engine = engine
+        self.watermarks = WatermarkStore(db_manager)
+        self.finalized_dates = FinalizedDateStore(db_manager)
+        self.response_cache = self._open_response_cache()
+        # Latest cacheable window end per (provider, account_id) for the
+        # current run; see BaseCollector.cache_through
+        self._cache_through: Dict[Tuple[str, str], Optional[date]] = {}
+        self.partitions = PartitionManager.from_config(db_manager, config.database)
+        self.rollups = CostRollups(db_manager)
+        # Whether the rollup tables exist; checked on the first write
+        self._rollups_available = None
+        # Called with the statistics after every aggregate_and_store() run
+        self._run_listeners: List[Callable[[Dict[str, Any]], None]] = []
 
-        # Lazy initialization - collectors will be created when needed
+        # Lazy initialization - collectors (and their SDK imports) are
+        # resolved from dotted paths when first needed
         self._collectors = {}
-        self._collector_classes = {
-            'aws': AWSCollector,
-            'gcp': GCPCollector,
-            'azure': AzureCollector
-        }
-        self._collector_configs = {
-            'aws': config.aws,
-            'gcp': config.gcp,
-            'azure': config.azure
-        }
+        self._collector_classes = dict(COLLECTOR_CLASS_PATHS)
+        # Window tasks for the same provider may ask for its collector concurrently
+        self._collectors_lock = threading.Lock()
     
     @property
     def collectors(self):
-        """Lazy-loaded collectors dictionary"""
+        """Lazy-loaded collectors dictionary keyed by (provider, account_id)"""
         # Initialize all collectors if not already done
         if not self._collectors:
-            for provider, collector_class in self._collector_classes.items():
+            for provider in self._collector_classes:
                 try:
-                    self._collectors[provider] = collector_class(self._collector_configs[provider])
+                    accounts = self.config.get_provider_accounts(provider)
                 except Exception as e:
-                    logger.warning(f"Failed to initialize {provider} collector: {e}")
-                    # Store None to indicate initialization failure
-                    self._collectors[provider] = None
+                    logger.warning(f"Failed to load {provider} accounts: {e}")
+                    continue
+                for account in accounts:
+                    try:
+                        self._get_collector(provider, account.account_id)
+                    except ValueError:
+                        # Stored as None to indicate initialization failure
+                        pass
         return self._collectors
-    
-    def _get_collector(self, provider: str):
-        """Get a collector for a specific provider, initializing it if needed"""
-        if provider not in self._collectors:
-            if provider not in self._collector_classes:
-                raise ValueError(f"Unknown provider: {provider}")
-            try:
-                self._collectors[provider] = self._collector_classes[provider](
-                    self._collector_configs[provider]
-                )
-            except Exception as e:
-                logger.warning(f"Failed to initialize {provider} collector: {e}")
-                self._collectors[provider] = None
-        
-        collector = self._collectors.get(provider)
+
+    def _open_response_cache(self) -> Optional[ResponseCache]:
+        """Open the collectors' shared response cache, or None if disabled or unusable"""
+        app = self.config.app
+        if app.response_cache_ttl_seconds <= 0:
+            return None
+        try:
+            return ResponseCache(
+                app.response_cache_dir,
+                ttl_seconds=app.response_cache_ttl_seconds,
+                max_bytes=app.response_cache_max_mb * 1024 * 1024
+            )
+        except (OSError, sqlite3.Error) as e:
+            logger.warning(f"Response cache disabled, could not open it: {e}")
+            return None
+
+    def _get_account_config(self, provider: str, account_id: str):
+        """Find the configuration of one provider account"""
+        for account in self.config.get_provider_accounts(provider):
+            if account.account_id == account_id:
+                return account
+        raise ValueError(f"Unknown {provider} account: {account_id!r}")
+
+    def _get_collector(self, provider: str, account_id: str = ''):
+        """Get a collector for a provider account, initializing it if needed"""
+        key = (provider, account_id)
+        source = _source_label(provider, account_id)
+        with self._collectors_lock:
+            if key not in self._collectors:
+                if provider not in self._collector_classes:
+                    raise ValueError(f"Unknown provider: {provider}")
+                try:
+                    # Provider config is resolved here, so e.g. Azure secrets are
+                    # only fetched when the Azure collector is actually built
+                    collector_class = load_collector_class(self._collector_classes[provider])
+                    collector = collector_class(self._get_account_config(provider, account_id))
+                    collector.response_cache = self.response_cache
+                    self._collectors[key] = collector
+                except Exception as e:
+                    logger.warning(f"Failed to initialize {source} collector: {e}")
+                    self._collectors[key] = None
+
+        collector = self._collectors.get(key)
         if collector is None:
-            raise ValueError(f"Collector for {provider} failed to initialize")
+            raise ValueError(f"Collector for {source} failed to initialize")
+        collector.cache_through = self._cache_through.get(key)
         return collector
 
+    def reset_failed_collectors(self) -> int:
+        """
+        Forget collectors that failed to initialize so the next run retries them
+
+        Collectors are built once and reused across runs; a long-running
+        process must not keep a transient failure (e.g. an SSM outage) forever.
+
+        Returns:
+            Number of collectors reset
+        """
+        with self._collectors_lock:
+            failed = [key for key, collector in self._collectors.items() if collector is None]
+            for key in failed:
+                del self._collectors[key]
+        return len(failed)
+
     def collect_all_costs(
         self,
         start_date: date,
         end_date: date,
         providers: List[str] = None
-    ) -> Dict[str, List[CostRecord]]:
+    ) -> Dict[str, CostRecords]:
         """
         Collect costs from all (or specified) cloud providers in parallel
 
@@ -99,54 +210,25 @@ class CostAggregator:
                       If None, collect from all providers
 
         Returns:
-            Dictionary mapping provider name to list of cost records
+            Dictionary mapping provider name to the cost records of all its
+            accounts (list of CostRecord or CostRecordBatch)
         """
         if providers is None:
             providers = ['aws', 'gcp', 'azure']
 
         logger.info(f"Collecting costs from providers: {providers}")
+        known_providers = self._known_providers(providers)
 
-        results = {}
+        results = {provider: CostRecordBatch() for provider in known_providers}
         errors = {}
+        account_ranges = self._plan_account_ranges(known_providers, start_date, end_date, errors)
+        self._limit_response_cache(account_ranges)
 
-        # Collect costs in parallel
-        logger.info(f"Submitting collection tasks for {len(providers)} provider(s)...")
-        logger.info("Creating ThreadPoolExecutor...")
-        with ThreadPoolExecutor(max_workers=3) as executor:
-            logger.info("ThreadPoolExecutor created")
-            # Submit collection tasks
-            future_to_provider = {}
-            for provider in providers:
-                if provider in self._collector_classes:
-                    logger.info(f"Submitting collection task for {provider.upper()}...")
-                    future = executor.submit(
-                        self._collect_provider_costs,
-                        provider,
-                        start_date,
-                        end_date
-                    )
-                    future_to_provider[future] = provider
-                    logger.info(f"Collection task submitted for {provider.upper()}")
-                else:
-                    logger.warning(f"Skipping unknown provider: {provider}")
+        # Windows complete in any order; merge each into its provider's batch
+        for provider, account_id, records in self._run_window_tasks(known_providers, account_ranges, errors):
+            results[provider].extend(records)
 
-            logger.info(f"Waiting for {len(future_to_provider)} collection task(s) to complete...")
-            
-            # Gather results as they complete
-            completed = 0
-            for future in as_completed(future_to_provider):
-                provider = future_to_provider[future]
-                completed += 1
-                logger.info(f"[{completed}/{len(future_to_provider)}] Processing results for {provider.upper()}...")
-                try:
-                    logger.info(f"Waiting for {provider.upper()} collection to finish...")
-                    records = future.result()
-                    results[provider] = records
-                    logger.info(f"{provider.upper()}: ✓ Successfully collected {len(records)} cost records")
-                except Exception as e:
-                    logger.error(f"{provider.upper()}: ✗ Failed to collect costs: {e}", exc_info=True)
-                    errors[provider] = str(e)
-                    results[provider] = []
+        self._log_provider_results(known_providers, {p: len(r) for p, r in results.items()}, errors)
 
         # Log summary
         total_records = sum(len(records) for records in results.values())
@@ -155,102 +237,760 @@ class CostAggregator:
             f"{len(results)} providers. Errors: {len(errors)}"
         )
 
+        return results
+
+    @staticmethod
+    def _log_provider_results(
+        providers: List[str],
+        provider_records: Dict[str, int],
+        errors: Dict[Tuple[str, str], str]
+    ):
+        """Log per-provider outcome; a provider with failed accounts is reported per account"""
+        for provider in providers:
+            account_errors = {
+                account_id: message
+                for (error_provider, account_id), message in errors.items()
+                if error_provider == provider
+            }
+            for account_id, message in account_errors.items():
+                logger.error(f"{_source_label(provider, account_id)}: ✗ Failed to collect costs: {message}")
+            if not account_errors or provider_records[provider]:
+                logger.info(f"{provider.upper()}: ✓ Successfully collected {provider_records[provider]} cost records")
         if errors:
-            logger.warning(f"Errors during collection: {errors}")
+            labelled = {
+                _source_label(provider, account_id): message
+                for (provider, account_id), message in errors.items()
+            }
+            logger.warning(f"Errors during collection: {labelled}")
 
-        return results
+    def _stream_provider_costs(self, task: WindowTask, emit: Callable[[WindowTask, CostRecords], None]) -> int:
+        """
+        Collect one window from a provider account, handing each batch to
+        emit as soon as it is fetched
+
+        Args:
+            task: Window task to collect
+            emit: Called with (task, records) per batch; may block
+
+        Returns:
+            Number of records collected
+        """
+        source = task.source
+        logger.info(f"[{source}] Starting cost collection for date range: {task.start_date} to {task.end_date}")
+        try:
+            logger.info(f"[{source}] Getting collector instance...")
+            collector = self._get_collector(task.provider, task.account_id)
+            logger.info(f"[{source}] Collector instance obtained, streaming iter_cost_batches()...")
+            record_count = 0
+            for batch in collector.iter_cost_batches(task.start_date, task.end_date):
+                if not len(batch):
+                    continue
+                records = CostRecordBatch()
+                records.extend(batch, account_id=collector.account_id)
+                emit(task, records)
+                record_count += len(records)
+            logger.info(f"[{source}] Collection completed, streamed {record_count} records")
+            return record_count
+        except Exception as e:
+            logger.error(f"[{source}] Error in _stream_provider_costs: {e}", exc_info=True)
+            raise
 
-    def _collect_provider_costs(
+    async def _stream_window_async(
         self,
-        provider: str,
+        task: WindowTask,
+        http_session,
+        emit: Callable[[WindowTask, CostRecords], None]
+    ) -> int:
+        """
+        Collect one window from the async engine's event loop
+
+        Collector construction (SDK imports, SSM lookups) and emit() block,
+        so they run on the loop's bounded executor. Collectors with a native
+        async HTTP path collect through collect_costs_async(); the others
+        stream their blocking iter_cost_batches() on the executor.
+
+        Args:
+            task: Window task to collect
+            http_session: Shared aiohttp session, or None
+            emit: Called with (task, records) per batch; may block
+
+        Returns:
+            Number of records collected
+        """
+        loop = asyncio.get_running_loop()
+        collector = await loop.run_in_executor(None, self._get_collector, task.provider, task.account_id)
+        if http_session is None or type(collector).collect_costs_async is BaseCollector.collect_costs_async:
+            return await loop.run_in_executor(None, self._stream_provider_costs, task, emit)
+
+        logger.info(f"[{task.source}] Starting async cost collection for date range: {task.start_date} to {task.end_date}")
+        records = await collector.collect_costs_async(task.start_date, task.end_date, http_session=http_session)
+        if len(records):
+            await loop.run_in_executor(None, emit, task, records)
+        return len(records)
+
+    def save_costs(
+        self,
+        cost_records: Iterable[CostRecord],
+        batch_size: Optional[int] = None
+    ) -> Dict[str, int]:
+        """
+        Save cost records to database with upsert logic
+
+        Records are consumed lazily and written in batches, each batch in its
+        own upsert statement and commit. Memory stays bounded by the batch size
+        and a failing batch only rolls back itself; batches committed before
+        the failure are kept.
+
+        Existing rows are only rewritten when their cost actually changed, so
+        re-collecting an unchanged window produces no row versions or WAL.
+        The cost change of every written row is added to the rollup tables
+        in the same transaction.
+
+        Args:
+            cost_records: Iterable of cost records to save
+            batch_size: Records per batch (default: config.app.db_batch_size)
+
+        Returns:
+            Dictionary with saved_records, inserted_records, updated_records
+            and unchanged_records counts
+        """
+        if self.write_mode == 'copy':
+            return self._copy_costs(cost_records)
+
+        batch_size = batch_size or self.config.app.db_batch_size
+        maintain_rollups = self._maintain_rollups()
+        counts = _empty_write_counts()
+        batch_count = 0
+
+        try:
+            with self.db_manager.get_session() as session:
+                for batch in _iter_batches(cost_records, batch_size):
+                    batch_count += 1
+                    inserted, updated, deltas = self._upsert_batch(session, batch, track_deltas=maintain_rollups)
+                    if deltas:
+                        CostRollups.apply_deltas(session, deltas)
+                    session.commit()
+                    counts['saved_records'] += len(batch)
+                    counts['inserted_records'] += inserted
+                    counts['updated_records'] += updated
+                    counts['unchanged_records'] += len(batch) - inserted - updated
+                    logger.debug(
+                        f"Committed batch {batch_count} ({len(batch)} records: "
+                        f"{inserted} inserted, {updated} updated)"
+                    )
+
+        except Exception as e:
+            logger.error(
+                f"Failed to save cost records in batch {batch_count} "
+                f"({counts['saved_records']} records committed before failure): {e}"
+            )
+            raise
+
+        if counts['saved_records'] == 0:
+            logger.info("No cost records to save")
+        else:
+            logger.info(
+                f"Successfully saved {counts['saved_records']} cost records in {batch_count} batch(es): "
+                f"{counts['inserted_records']} inserted, {counts['updated_records']} updated, "
+                f"{counts['unchanged_records']} unchanged"
+            )
+        return counts
+
+    def _copy_costs(self, cost_records: Iterable[CostRecord]) -> Dict[str, int]:
+        """
+        Save cost records through the COPY bulk loader
+
+        Args:
+            cost_records: Iterable of cost records to save
+
+        Returns:
+            Dictionary with saved_records, inserted_records, updated_records
+            and unchanged_records counts
+        """
+        try:
+            loaded, inserted, updated = self.db_manager.copy_upsert_costs(
+                cost_records,
+                maintain_rollups=self._maintain_rollups()
+            )
+        except Exception as e:
+            logger.error(f"Failed to bulk load cost records: {e}")
+            raise
+
+        counts = {
+            'saved_records': loaded,
+            'inserted_records': inserted,
+            'updated_records': updated,
+            'unchanged_records': loaded - inserted - updated
+        }
+
+        if loaded == 0:
+            logger.info("No cost records to save")
+        else:
+            logger.info(
+                f"Successfully bulk loaded {loaded} cost records via COPY: "
+                f"{inserted} inserted, {updated} updated, {counts['unchanged_records']} unchanged"
+            )
+        return counts
+
+    def _maintain_rollups(self) -> bool:
+        """Whether writes should update the rollup tables (only if they exist)"""
+        if self._rollups_available is None:
+            try:
+                self._rollups_available = self.rollups.available()
+            except Exception as e:
+                logger.warning(f"Could not check for cost rollup tables: {e}")
+                return False
+            if not self._rollups_available:
+                logger.warning(
+                    "Cost rollup tables not found; run --init-db and then --rebuild-rollups to enable them"
+                )
+        return self._rollups_available
+
+    @staticmethod
+    def _upsert_batch(
+        session,
+        batch: List[CostRecord],
+        track_deltas: bool = False
+    ) -> Tuple[int, int, List[CostDelta]]:
+        """
+        Upsert a single batch of cost records
+
+        Args:
+            session: Active database session
+            batch: Cost records to upsert
+            track_deltas: Also return the cost change of every written row
+
+        Returns:
+            Tuple of (inserted, updated, deltas); rows whose cost did not
+            change are neither inserted nor updated and have no delta
+        """
+        # Convert CostRecord objects to dictionaries
+        records_data = [
+            {
+                'cloud_provider': record.cloud_provider,
+                'account_id': record.account_id,
+                'service_name': record.service_name,
+                'cost_usd': record.cost_usd,
+                'usage_date': record.usage_date
+            }
+            for record in batch
+        ]
+
+        key_columns = (CloudCost.cloud_provider, CloudCost.account_id, CloudCost.service_name, CloudCost.usage_date)
+
+        if track_deltas:
+            # Held until the batch commits, so the rows read below stay current
+            CostRollups.lock_writes(session)
+
+        # Partitioned tables cannot return xmax and RETURNING only sees new
+        # values, so read the existing rows (and the costs being replaced) first
+        keys = {
+            (row['cloud_provider'], row['account_id'], row['service_name'], row['usage_date'])
+            for row in records_data
+        }
+        previous = session.execute(
+            select(*key_columns, CloudCost.cost_usd).where(tuple_(*key_columns).in_(keys))
+        )
+        previous_costs = {tuple(row[:4]): row[4] for row in previous}
+
+        # Perform upsert (insert with on conflict update), skipping rows
+        # whose cost is unchanged
+        stmt = insert(CloudCost).values(records_data)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['cloud_provider', 'account_id', 'service_name', 'usage_date'],
+            set_={
+                'cost_usd': stmt.excluded.cost_usd,
+                'updated_at': stmt.excluded.updated_at
+            },
+            where=CloudCost.cost_usd.is_distinct_from(stmt.excluded.cost_usd)
+        ).returning(*key_columns, CloudCost.cost_usd)
+
+        written = session.execute(stmt).all()
+        inserted = sum(1 for row in written if tuple(row[:4]) not in previous_costs)
+        deltas = []
+        if track_deltas:
+            deltas = [
+                (
+                    row.cloud_provider,
+                    row.service_name,
+                    row.usage_date,
+                    row.cost_usd - previous_costs.get(tuple(row[:4]), Decimal(0))
+                )
+                for row in written
+            ]
+        return inserted, len(written) - inserted, deltas
+
+    def _known_providers(self, providers: List[str]) -> List[str]:
+        """Filter out (and warn about) providers without a registered collector"""
+        known_providers = []
+        for provider in providers:
+            if provider in self._collector_classes:
+                known_providers.append(provider)
+            else:
+                logger.warning(f"Skipping unknown provider: {provider}")
+        return known_providers
+
+    def _create_scheduler(self, providers: List[str]) -> Tuple[WindowTaskScheduler, Dict[str, int]]:
+        """
+        Build the window task scheduler from the providers' configured limits
+
+        Args:
+            providers: Provider names that will be scheduled
+
+        Returns:
+            Tuple of (scheduler, window days per provider)
+        """
+        window_days = {}
+        concurrency = {}
+        rates = {}
+        for provider in providers:
+            provider_config = self.config.get_provider_config(provider)
+            # Azure names its window setting after the Cost Management query
+            window_days[provider] = getattr(provider_config, 'query_window_days', None) or provider_config.window_days
+            concurrency[provider] = provider_config.max_workers
+            rates[provider] = provider_config.requests_per_second
+
+        if self.engine == 'async':
+            scheduler = AsyncWindowTaskScheduler(
+                max_workers=self.config.app.scheduler_workers,
+                provider_concurrency=concurrency,
+                provider_rates=rates,
+                http_connections=self.config.app.async_http_connections
+            )
+        else:
+            scheduler = WindowTaskScheduler(
+                max_workers=self.config.app.scheduler_workers,
+                provider_concurrency=concurrency,
+                provider_rates=rates
+            )
+        return scheduler, window_days
+
+    def _plan_account_ranges(
+        self,
+        providers: List[str],
         start_date: date,
-        end_date: date
-    ) -> List[CostRecord]:
+        end_date: date,
+        errors: Dict[Tuple[str, str], str]
+    ) -> Dict[Tuple[str, str], List[Tuple[date, date]]]:
         """
-        Collect costs from a single provider
+        Assign the requested date range to every configured account
 
         Args:
-            provider: Provider name
+            providers: Provider names to collect from
             start_date: Start date
             end_date: End date
+            errors: Dictionary filled with (provider, '') -> error message for
+                    providers whose account configuration is invalid
 
         Returns:
-            List of cost records
+            Dictionary mapping (provider, account_id) to its date ranges
         """
-        logger.info(f"[{provider.upper()}] Starting cost collection for date range: {start_date} to {end_date}")
+        account_ranges = {}
+        for provider in providers:
+            try:
+                accounts = self.config.get_provider_accounts(provider)
+            except ValueError as e:
+                logger.error(f"{provider.upper()}: ✗ Invalid account configuration: {e}")
+                errors[(provider, '')] = str(e)
+                continue
+            for account in accounts:
+                account_ranges[(provider, account.account_id)] = [(start_date, end_date)]
+        return account_ranges
+
+    def _load_watermarks(self) -> Optional[Dict[Tuple[str, str], Watermark]]:
+        """Load collection watermarks, or None if the table cannot be read"""
         try:
-            logger.info(f"[{provider.upper()}] Getting collector instance...")
-            collector = self._get_collector(provider)
-            logger.info(f"[{provider.upper()}] Collector instance obtained, calling collect_costs()...")
-            records = collector.collect_costs(start_date, end_date)
-            logger.info(f"[{provider.upper()}] Collection completed, returning {len(records)} records")
-            return records
+            return self.watermarks.load_all()
         except Exception as e:
-            logger.error(f"[{provider.upper()}] Error in _collect_provider_costs: {e}", exc_info=True)
-            raise
+            logger.warning(f"Could not load collection watermarks (run --init-db to create the table): {e}")
+            return None
 
-    def save_costs(self, cost_records: List[CostRecord]) -> int:
+    def _narrow_to_watermarks(
+        self,
+        account_ranges: Dict[Tuple[str, str], List[Tuple[date, date]]],
+        watermarks: Dict[Tuple[str, str], Watermark],
+        start_date: date,
+        end_date: date
+    ) -> Dict[Tuple[str, str], Optional[datetime]]:
         """
-        Save cost records to database with upsert logic
+        Replace each account's range with the minimal ranges its watermarks allow
+
+        Providers with export timestamps (GCP) are probed for usage dates
+        exported after last_export_time; the others resume the day after
+        last_finalized_date. Accounts without watermarks keep the requested
+        range, as does any account whose probe fails.
 
         Args:
-            cost_records: List of cost records to save
+            account_ranges: Ranges per (provider, account_id), updated in place
+            watermarks: Stored watermarks per (provider, account_id)
+            start_date: Requested start date
+            end_date: Requested end date
 
         Returns:
-            Number of records saved/updated
+            Latest export timestamp seen per probed account, to store once
+            its collection succeeds
         """
-        if not cost_records:
-            logger.info("No cost records to save")
-            return 0
+        export_times = {}
+        for key, ranges in account_ranges.items():
+            provider, account_id = key
+            source = _source_label(provider, account_id)
+            watermark = watermarks.get(key)
+            collector_class = load_collector_class(self._collector_classes[provider])
+
+            if collector_class.supports_export_watermark:
+                since = watermark.last_export_time if watermark else None
+                try:
+                    collector = self._get_collector(provider, account_id)
+                    changed_dates, latest_export_time = collector.find_changed_dates(since, start_date, end_date)
+                except Exception as e:
+                    logger.warning(f"[{source}] Export watermark probe failed, collecting {start_date} to {end_date}: {e}")
+                    continue
+                # Never schedule dates outside the planned range (e.g. today's
+                # partial day, or days before the retention start)
+                planned = {day for range_start, range_end in ranges for day in get_date_list(range_start, range_end)}
+                account_ranges[key] = group_consecutive_dates([day for day in changed_dates if day in planned])
+                export_times[key] = latest_export_time
+            elif watermark and watermark.last_finalized_date:
+                range_start = watermark.last_finalized_date + timedelta(days=1)
+                account_ranges[key] = [(range_start, end_date)] if range_start <= end_date else []
 
-        logger.info(f"Saving {len(cost_records)} cost records to database")
+            if account_ranges[key]:
+                described = ', '.join(f"{s} to {e}" for s, e in account_ranges[key])
+                logger.info(f"[{source}] Collecting from watermark: {described}")
+            else:
+                logger.info(f"[{source}] Up to date, nothing to collect")
+        return export_times
+
+    def _skip_finalized_dates(self, account_ranges: Dict[Tuple[str, str], List[Tuple[date, date]]]) -> int:
+        """
+        Remove dates already marked finalized from each account's ranges
+
+        Args:
+            account_ranges: Ranges per (provider, account_id), updated in place
+
+        Returns:
+            Number of account days skipped
+        """
+        planned = [bound for ranges in account_ranges.values() for range_ in ranges for bound in range_]
+        if not planned:
+            return 0
 
         try:
-            with self.db_manager.get_session() as session:
-                # Convert CostRecord objects to dictionaries
-                records_data = [
-                    {
-                        'cloud_provider': record.cloud_provider,
-                        'service_name': record.service_name,
-                        'cost_usd': record.cost_usd,
-                        'usage_date': record.usage_date
-                    }
-                    for record in cost_records
-                ]
+            finalized = self.finalized_dates.load_range(min(planned), max(planned))
+        except Exception as e:
+            logger.warning(f"Could not load finalized dates (run --init-db to create the table): {e}")
+            return 0
+
+        skipped = 0
+        for key, ranges in account_ranges.items():
+            closed = finalized.get(key)
+            if not closed:
+                continue
+            dates = [day for range_start, range_end in ranges for day in get_date_list(range_start, range_end)]
+            open_dates = [day for day in dates if day not in closed]
+            if len(open_dates) < len(dates):
+                skipped += len(dates) - len(open_dates)
+                account_ranges[key] = group_consecutive_dates(open_dates)
+                logger.info(
+                    f"[{_source_label(*key)}] Skipping {len(dates) - len(open_dates)} finalized day(s)"
+                )
+        return skipped
+
+    def _advance_watermarks(
+        self,
+        account_ranges: Dict[Tuple[str, str], List[Tuple[date, date]]],
+        completed_windows: Dict[Tuple[str, str], Dict[Tuple[date, date], int]],
+        watermarks: Dict[Tuple[str, str], Watermark],
+        export_times: Dict[Tuple[str, str], Optional[datetime]],
+        errors: Dict[Tuple[str, str], str]
+    ):
+        """
+        Record how far each account's completed windows have got
+
+        The date watermarks only cover the planned days up to the first
+        window that failed, and the export timestamp (which spans every
+        window of the account) is only stored when none failed. Dates the provider has closed (see the collector's
+        finalized_through()) are marked finalized only for windows that
+        returned provider data: an empty window may just as well be an
+        outage, and a finalized day is never fetched again without
+        --restate. The finalized watermark only moves when the collected
+        ranges continue on from the stored one (or export timestamps cover
+        the gaps), so a custom range never skips over days that were never
+        fetched.
 
-                # Perform upsert (insert with on conflict update)
-                stmt = insert(CloudCost).values(records_data)
-                stmt = stmt.on_conflict_do_update(
-                    index_elements=['cloud_provider', 'service_name', 'usage_date'],
-                    set_={
-                        'cost_usd': stmt.excluded.cost_usd,
-                        'updated_at': stmt.excluded.updated_at
-                    }
+        Args:
+            account_ranges: Ranges collected per (provider, account_id)
+            completed_windows: Record count per completed window and account
+            watermarks: Watermarks as stored before this run
+            export_times: Latest export timestamps seen per account
+            errors: Collection errors per (provider, account_id)
+        """
+        today = date.today()
+        for key, ranges in account_ranges.items():
+            windows = completed_windows.get(key)
+            if not ranges or not windows:
+                continue
+            provider, account_id = key
+            watermark = watermarks.get(key)
+            failed = key in errors
+
+            completed_days = {
+                day for window_start, window_end in windows for day in get_date_list(window_start, window_end)
+            }
+            first_missing = next((
+                day
+                for range_start, range_end in ranges
+                for day in get_date_list(range_start, range_end)
+                if day not in completed_days
+            ), None)
+            if first_missing is None:
+                collected_date = max(range_end for _, range_end in ranges)
+            elif first_missing > ranges[0][0]:
+                collected_date = first_missing - timedelta(days=1)
+            else:
+                collected_date = None
+
+            collector_class = load_collector_class(self._collector_classes[provider])
+            finalized_through = collector_class.finalized_through(self._get_account_config(provider, account_id), today)
+            finalized_date = min(collected_date, finalized_through) if collected_date else None
+            previous = watermark.last_finalized_date if watermark else None
+            contiguous = (
+                (key in export_times and not failed)
+                or previous is None
+                or ranges[0][0] <= previous + timedelta(days=1)
+            )
+
+            try:
+                self.watermarks.advance(
+                    provider,
+                    account_id,
+                    collected_date=collected_date,
+                    finalized_date=finalized_date if contiguous else None,
+                    export_time=None if failed else export_times.get(key)
                 )
+                self.finalized_dates.mark(provider, account_id, [
+                    day
+                    for (window_start, window_end), record_count in completed_windows.get(key, {}).items()
+                    if record_count
+                    for day in get_date_list(window_start, min(window_end, finalized_through))
+                ])
+            except Exception as e:
+                logger.warning(f"[{_source_label(provider, account_id)}] Failed to store collection watermark or finalized dates: {e}")
+
+    def _limit_response_cache(
+        self,
+        account_ranges: Dict[Tuple[str, str], List[Tuple[date, date]]],
+        export_times: Optional[Dict[Tuple[str, str], Optional[datetime]]] = None,
+        restate: bool = False
+    ):
+        """
+        Decide per account which windows of this run may use the response cache
 
-                result = session.execute(stmt)
-                session.commit()
+        Only windows ending on or before the account's finalized_through()
+        are cacheable: later dates still change, and a cached copy would
+        hide the change for the cache TTL. Accounts narrowed by the export
+        probe bypass the cache entirely, since their windows were chosen
+        because they changed and the export timestamp stored afterwards
+        must only cover data fetched from the provider. A restatement must
+        see what the providers report now, so it bypasses the cache too.
 
-                logger.info(f"Successfully saved/updated {len(cost_records)} cost records")
-                return len(cost_records)
+        Args:
+            account_ranges: Ranges per (provider, account_id)
+            export_times: Export timestamps per account narrowed by the probe
+            restate: Whether this run restates finalized dates
+        """
+        self._cache_through = {}
+        if self.response_cache is None or restate:
+            return
 
+        today = date.today()
+        for key in account_ranges:
+            if export_times and key in export_times:
+                continue
+            provider, account_id = key
+            try:
+                collector_class = load_collector_class(self._collector_classes[provider])
+                self._cache_through[key] = collector_class.finalized_through(
+                    self._get_account_config(provider, account_id), today
+                )
+            except Exception as e:
+                logger.warning(f"[{_source_label(provider, account_id)}] Response cache bypassed: {e}")
+
+    def _prepare_partitions(self, account_ranges: Dict[Tuple[str, str], List[Tuple[date, date]]]):
+        """
+        Clip ranges to the partition retention period and create the monthly
+        partitions the run will write to
+
+        Args:
+            account_ranges: Ranges per (provider, account_id), updated in place
+        """
+        retention_start = self.partitions.retention_start()
+        if retention_start is not None:
+            for key, ranges in account_ranges.items():
+                retained = [
+                    (max(range_start, retention_start), range_end)
+                    for range_start, range_end in ranges
+                    if range_end >= retention_start
+                ]
+                if retained != ranges:
+                    logger.info(f"[{_source_label(*key)}] Skipping dates before the retention start {retention_start}")
+                    account_ranges[key] = retained
+
+        planned = [bound for ranges in account_ranges.values() for range_ in ranges for bound in range_]
+        today = date.today()
+        try:
+            self.partitions.ensure_partitions(min(planned, default=today), max(planned, default=today))
         except Exception as e:
-            logger.error(f"Failed to save cost records: {e}")
-            raise
+            logger.warning(f"Failed to create cloud_costs partitions: {e}")
+
+    def _run_window_tasks(
+        self,
+        providers: List[str],
+        account_ranges: Dict[Tuple[str, str], List[Tuple[date, date]]],
+        errors: Dict[Tuple[str, str], str],
+        completed_windows: Optional[Dict[Tuple[str, str], Dict[Tuple[date, date], int]]] = None
+    ) -> Iterator[Tuple[str, str, CostRecords]]:
+        """
+        Collect every (provider, account, date window) task on the shared
+        scheduler and yield each batch of records as soon as it is fetched
+
+        Window tasks hand their collector's batches to this generator through
+        a queue of scheduler_workers entries and block while it is full, so
+        memory is bounded by batches rather than whole windows. A window only
+        counts as completed once the consumer has taken its last batch. A
+        failed window is recorded in errors and does not stop the other
+        windows, accounts or providers. Rows dated outside their window are
+        dropped: partitions only exist for the planned ranges, and a single
+        row without one would fail the write of the whole batch.
+
+        Args:
+            providers: Provider names to collect from
+            account_ranges: Date ranges to collect per (provider, account_id)
+            errors: Dictionary filled with (provider, account_id) -> error message
+            completed_windows: Optional dictionary filled with (provider,
+                account_id) -> {(start_date, end_date): record count} for every
+                window that completed without an error
+
+        Yields:
+            Tuples of (provider, account_id, records)
+        """
+        if not account_ranges:
+            return
+
+        scheduler, window_days = self._create_scheduler(providers)
+        tasks = [
+            task
+            for (provider, account_id), ranges in account_ranges.items()
+            for range_start, range_end in ranges
+            for task in scheduler.plan(provider, range_start, range_end, window_days[provider], account_id)
+        ]
+        logger.info(
+            f"Scheduling {len(tasks)} collection task(s) for {len(account_ranges)} account(s) of "
+            f"{len(providers)} provider(s) on the {self.engine} engine with {scheduler.max_workers} worker(s)"
+        )
+
+        # Batches and task outcomes share one FIFO queue, so a task's outcome
+        # always arrives after its last batch
+        events = queue.Queue(maxsize=scheduler.max_workers)
+        stopped = threading.Event()
+        scheduler_error = []
+
+        def put(event):
+            while not stopped.is_set():
+                try:
+                    events.put(event, timeout=0.5)
+                    return
+                except queue.Full:
+                    pass
+            raise RuntimeError("Collection stopped by the consumer")
+
+        def emit(task: WindowTask, records: CostRecords):
+            put((task, records, None, False))
+
+        if self.engine == 'async':
+            async def collect_window(task: WindowTask, http_session) -> int:
+                return await self._stream_window_async(task, http_session, emit)
+        else:
+            def collect_window(task: WindowTask) -> int:
+                return self._stream_provider_costs(task, emit)
+
+        def run_scheduler():
+            outcomes = scheduler.run(tasks, collect_window)
+            try:
+                for task, _, error in outcomes:
+                    put((task, None, error, True))
+            except Exception as e:
+                if not stopped.is_set():
+                    scheduler_error.append(e)
+            finally:
+                outcomes.close()
+                try:
+                    put(None)
+                except RuntimeError:
+                    pass
+
+        scheduler_thread = threading.Thread(target=run_scheduler, name='window-scheduler', daemon=True)
+        scheduler_thread.start()
+
+        completed = 0
+        window_records: Dict[WindowTask, int] = {}
+        try:
+            while True:
+                event = events.get()
+                if event is None:
+                    break
+                task, records, error, finished = event
+
+                if not finished:
+                    in_window = records_between(records, task.start_date, task.end_date)
+                    if len(in_window) < len(records):
+                        logger.warning(f"{task}: dropped {len(records) - len(in_window)} record(s) dated outside the window")
+                    window_records[task] = window_records.get(task, 0) + len(in_window)
+                    if len(in_window):
+                        yield task.provider, task.account_id, in_window
+                    continue
+
+                completed += 1
+                record_count = window_records.pop(task, 0)
+                if error is not None:
+                    logger.error(f"[{completed}/{len(tasks)}] {task}: ✗ Failed to collect costs: {error}")
+                    errors.setdefault((task.provider, task.account_id), str(error))
+                    continue
+                logger.info(f"[{completed}/{len(tasks)}] {task}: collected {record_count} cost records")
+                if completed_windows is not None:
+                    windows = completed_windows.setdefault((task.provider, task.account_id), {})
+                    windows[(task.start_date, task.end_date)] = record_count
+        finally:
+            # Unblocks and cancels the window tasks if the consumer stopped early
+            stopped.set()
+            scheduler_thread.join()
+
+        if scheduler_error:
+            raise scheduler_error[0]
 
     def aggregate_and_store(
         self,
         start_date: date,
         end_date: date,
-        providers: List[str] = None
+        providers: List[str] = None,
+        incremental: bool = False,
+        restate: bool = False
     ) -> Dict[str, int]:
         """
         Main aggregation method: collect costs and store in database
 
+        Collection watermarks are advanced for the windows collected
+        without errors.
+
         Args:
             start_date: Start date
             end_date: End date
             providers: Optional list of providers to collect from
+            incremental: Narrow each account's range to what its collection
+                         watermarks say may have changed (start_date/end_date
+                         still apply to accounts without watermarks)
+            restate: Re-fetch dates already marked finalized, bypassing the
+                     response cache
 
         Returns:
             Dictionary with statistics
@@ -263,38 +1003,77 @@ class CostAggregator:
             logger.info(f"Providers to process: {providers}")
         logger.info("=" * 60)
 
-        # Collect costs from all providers
-        logger.info("Step 1: Collecting costs from providers...")
-        logger.info("About to call collect_all_costs()...")
-        results = self.collect_all_costs(start_date, end_date, providers)
-        logger.info(f"Step 1 complete: Collected data from {len(results)} provider(s)")
-
-        # Flatten all records
-        logger.info("Step 2: Flattening collected records...")
-        all_records = []
-        for provider, records in results.items():
-            all_records.extend(records)
-            logger.info(f"  - {provider.upper()}: {len(records)} records")
-        logger.info(f"Total records to save: {len(all_records)}")
-
-        # Save to database
-        logger.info("Step 3: Saving records to database...")
-        saved_count = self.save_costs(all_records)
-        logger.info(f"Step 3 complete: Saved {saved_count} record(s) to database")
-
-        # Calculate statistics
+        if providers is None:
+            providers = ['aws', 'gcp', 'azure']
+        known_providers = self._known_providers(providers)
+
+        # Write each (provider, window) result as soon as it completes, while
+        # the scheduler keeps the remaining windows running
+        logger.info("Collecting costs and saving windows as they complete...")
+        write_counts = _empty_write_counts()
+        provider_records = {provider: 0 for provider in known_providers}
+        provider_costs = {provider: Decimal(0) for provider in known_providers}
+        errors = {}
+        completed_windows = {}
+
+        accounts_collected = set()
+
+        account_ranges = self._plan_account_ranges(known_providers, start_date, end_date, errors)
+        watermarks = self._load_watermarks()
+        export_times = {}
+        if incremental and watermarks is not None:
+            export_times = self._narrow_to_watermarks(account_ranges, watermarks, start_date, end_date)
+        finalized_skipped = 0 if restate else self._skip_finalized_dates(account_ranges)
+        self._prepare_partitions(account_ranges)
+        self._limit_response_cache(account_ranges, export_times, restate)
+
+        for provider, account_id, batch in self._run_window_tasks(
+            known_providers, account_ranges, errors, completed_windows
+        ):
+            batch_counts = self.save_costs(batch)
+            for key, value in batch_counts.items():
+                write_counts[key] += value
+            provider_records[provider] += len(batch)
+            provider_costs[provider] += total_cost_usd(batch)
+            accounts_collected.add((provider, account_id))
+
+        self._log_provider_results(known_providers, provider_records, errors)
+        if watermarks is not None:
+            self._advance_watermarks(account_ranges, completed_windows, watermarks, export_times, errors)
+        try:
+            self.partitions.detach_expired(discard_rollups=self._maintain_rollups())
+        except Exception as e:
+            logger.warning(f"Failed to detach expired cloud_costs partitions: {e}")
+
+        # Calculate statistics; a provider with any failed account counts as
+        # failed, one whose accounts were all up to date as succeeded
+        failed_providers = {provider for provider, _ in errors}
+        up_to_date = {key for key, ranges in account_ranges.items() if not ranges}
+        up_to_date_providers = {
+            provider for provider in known_providers
+            if all(key in up_to_date for key in account_ranges if key[0] == provider)
+            and any(key[0] == provider for key in account_ranges)
+        }
+
+        def succeeded(provider: str) -> bool:
+            collected = provider_records[provider] or provider in up_to_date_providers
+            return collected and provider not in failed_providers
+
         stats = {
-            'total_records': len(all_records),
-            'saved_records': saved_count,
-            'providers_succeeded': len([p for p, r in results.items() if r]),
-            'providers_failed': len([p for p, r in results.items() if not r])
+            'total_records': sum(provider_records.values()),
+            **write_counts,
+            'providers_succeeded': len([p for p in known_providers if succeeded(p)]),
+            'providers_failed': len([p for p in known_providers if not succeeded(p)]),
+            'accounts_collected': len(accounts_collected - set(errors)),
+            'accounts_up_to_date': len(up_to_date),
+            'finalized_days_skipped': finalized_skipped,
+            'accounts_failed': len(errors)
         }
 
         # Calculate total cost by provider
-        for provider, records in results.items():
-            total_cost = sum(record.cost_usd for record in records)
-            stats[f'{provider}_cost_usd'] = float(total_cost)
-            stats[f'{provider}_records'] = len(records)
+        for provider in known_providers:
+            stats[f'{provider}_cost_usd'] = float(provider_costs[provider])
+            stats[f'{provider}_records'] = provider_records[provider]
 
         logger.info("=" * 60)
         logger.info("Aggregation statistics:")
@@ -303,8 +1082,26 @@ class CostAggregator:
         logger.info("=" * 60)
         logger.info("Cost aggregation completed successfully")
 
+        for listener in self._run_listeners:
+            try:
+                listener(stats)
+            except Exception as e:
+                logger.warning(f"Aggregation run listener failed: {e}")
+
         return stats
 
+    def add_run_listener(self, listener: Callable[[Dict[str, Any]], None]):
+        """
+        Register a callback run after every aggregate_and_store() call
+
+        Used to refresh in-memory views of the stored data (e.g. the API
+        server's snapshot). Listener errors are logged, never raised.
+
+        Args:
+            listener: Callable receiving the run statistics
+        """
+        self._run_listeners.append(listener)
+
     def test_all_connections(self, providers: List[str] = None) -> Dict[str, bool]:
         """
         Test connections to cloud providers
@@ -314,7 +1111,8 @@ class CostAggregator:
                       If None, test all providers
 
         Returns:
-            Dictionary mapping provider to connection status
+            Dictionary mapping provider to connection status (True only if
+            all of the provider's accounts connect)
         """
         if providers is None:
             providers = ['aws', 'gcp', 'azure']
@@ -329,13 +1127,25 @@ class CostAggregator:
                 continue
             
             try:
-                logger.info(f"Initializing {provider.upper()} collector...")
-                collector = self._get_collector(provider)
-                logger.info(f"Testing {provider.upper()} connection...")
-                results[provider] = collector.test_connection()
-                logger.info(f"{provider.upper()} connection test completed: {results[provider]}")
+                accounts = self.config.get_provider_accounts(provider)
             except Exception as e:
-                logger.error(f"{provider.upper()}: Connection test error: {e}", exc_info=True)
+                logger.error(f"{provider.upper()}: Invalid account configuration: {e}")
                 results[provider] = False
+                continue
+
+            # A provider passes only if every one of its accounts connects
+            results[provider] = True
+            for account in accounts:
+                source = _source_label(provider, account.account_id)
+                try:
+                    logger.info(f"Initializing {source} collector...")
+                    collector = self._get_collector(provider, account.account_id)
+                    logger.info(f"Testing {source} connection...")
+                    connected = collector.test_connection()
+                    logger.info(f"{source} connection test completed: {connected}")
+                except Exception as e:
+                    logger.error(f"{source}: Connection test error: {e}", exc_info=True)
+                    connected = False
+                results[provider] = results[provider] and connected
 
         return results
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Cold-start import benchmark for single-provider runs
+
+Runs `python -X importtime` in a fresh interpreter that imports main.py and
+resolves one provider's collector class, then checks that:
+1. total import time stays under a budget, and
+2. no other provider's SDK was imported along the way.
+
+Usage:
+    python benchmarks/startup_importtime.py --providers aws,gcp --budget-ms 1500
+"""
+import argparse
+import os
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Top-level modules that belong to each provider's SDK
+PROVIDER_SDK_MODULES = {
+    'aws': ['boto3', 'botocore'],
+    'gcp': ['google.cloud.bigquery', 'google.oauth2'],
+    'azure': ['azure'],
+}
+
+IMPORT_SNIPPET = (
+    "import main; "
+    "from collectors import COLLECTOR_CLASS_PATHS, load_collector_class; "
+    "load_collector_class(COLLECTOR_CLASS_PATHS[{provider!r}])"
+)
+
+
+def parse_importtime(stderr: str) -> Tuple[int, Dict[str, int]]:
+    """
+    Parse `-X importtime` output
+
+    Args:
+        stderr: Interpreter stderr containing 'import time:' lines
+
+    Returns:
+        Tuple of (total microseconds across top-level imports,
+                  mapping of module name to cumulative microseconds)
+    """
+    total_us = 0
+    cumulative_by_module = {}
+
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        _, cumulative_us, name = line[len('import time:'):].split('|')
+        module = name.strip()
+        cumulative_by_module[module] = int(cumulative_us)
+        # Top-level imports are not indented beneath a parent
+        if name.startswith(' ') and not name.startswith('  '):
+            total_us += int(cumulative_us)
+
+    return total_us, cumulative_by_module
+
+
+def measure_provider(provider: str) -> Tuple[int, Dict[str, int]]:
+    """
+    Measure cold-start import time for a single-provider run
+
+    Args:
+        provider: Provider name
+
+    Returns:
+        Tuple of (total microseconds, per-module cumulative microseconds)
+    """
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', IMPORT_SNIPPET.format(provider=provider)],
+        cwd=REPO_ROOT,
+        capture_output=True,
+        text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Import failed for {provider}:\n{result.stderr[-2000:]}")
+    return parse_importtime(result.stderr)
+
+
+def foreign_sdk_imports(provider: str, modules: Dict[str, int]) -> List[str]:
+    """List SDK modules of other providers that were imported"""
+    foreign = []
+    for other, prefixes in PROVIDER_SDK_MODULES.items():
+        if other == provider:
+            continue
+        for prefix in prefixes:
+            if prefix in PROVIDER_SDK_MODULES[provider]:
+                continue
+            if any(module == prefix or module.startswith(f"{prefix}.") for module in modules):
+                foreign.append(prefix)
+    return foreign
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Check single-provider cold-start import time')
+    parser.add_argument('--providers', default='aws,gcp,azure', help='Comma-separated providers to measure')
+    parser.add_argument('--budget-ms', type=float, default=1500.0, help='Import time budget per provider run')
+    args = parser.parse_args()
+
+    failed = False
+    for provider in [p.strip().lower() for p in args.providers.split(',')]:
+        total_us, modules = measure_provider(provider)
+        total_ms = total_us / 1000
+        foreign = foreign_sdk_imports(provider, modules)
+
+        status = 'OK'
+        if total_ms > args.budget_ms or foreign:
+            status = 'FAIL'
+            failed = True
+
+        print(f"{provider.upper()}: {total_ms:.0f} ms (budget {args.budget_ms:.0f} ms) - {status}")
+        if foreign:
+            print(f"  imported other providers' SDKs: {', '.join(sorted(set(foreign)))}")
+
+        slowest = sorted(modules.items(), key=lambda item: item[1], reverse=True)[:5]
+        for module, cumulative_us in slowest:
+            print(f"  {cumulative_us / 1000:8.1f} ms  {module}")
+
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1 +1,31 @@
 # Collectors package
+"""
+Collector registry
+
+Collector classes are referenced by dotted path and imported on first use,
+so a run only pays for the cloud SDKs (boto3, google-cloud-bigquery,
+azure-*) of the providers it actually touches.
+"""
+from functools import lru_cache
+from importlib import import_module
+
+COLLECTOR_CLASS_PATHS = {
+    'aws': 'collectors.aws_collector.AWSCollector',
+    'gcp': 'collectors.gcp_collector.GCPCollector',
+    'azure': 'collectors.azure_collector.AzureCollector',
+}
+
+
+@lru_cache(maxsize=None)
+def load_collector_class(dotted_path: str):
+    """
+    Import and return a collector class from its dotted path
+
+    Args:
+        dotted_path: 'package.module.ClassName'
+
+    Returns:
+        The collector class
+    """
+    module_path, class_name = dotted_path.rsplit('.', 1)
+    return getattr(import_module(module_path), class_name)
@@ -1,14 +1,16 @@
 """
 AWS Cost Explorer collector
 """
-from datetime import date
-from typing import List
+from datetime import date, timedelta
+from typing import Iterator, List
 from decimal import Decimal
+from concurrent.futures import ThreadPoolExecutor
 import boto3
 from botocore.exceptions import ClientError, BotoCoreError
 
-from collectors.base_collector import BaseCollector, CostRecord
+from collectors.base_collector import BaseCollector, CostRecord, CostRecords
 from config import AWSConfig
+from utils.date_utils import split_date_range
 
 
 class AWSCollector(BaseCollector):
@@ -23,7 +25,7 @@ class AWSCollector(BaseCollector):
         Args:
             config: AWS configuration
         """
-        super().__init__('aws')
+        super().__init__('aws', config.account_id)
         self.config = config
         self.client = None
         self._initialize_client()
@@ -42,6 +44,29 @@ class AWSCollector(BaseCollector):
             self.logger.error(f"Failed to initialize AWS client: {e}")
             raise
 
+    @classmethod
+    def finalized_through(cls, config: AWSConfig, today: date) -> date:
+        """
+        Latest usage date whose costs AWS will no longer change
+
+        Cost Explorer keeps revising estimated charges (credits, refunds,
+        upfront fees) until the month's invoice is issued, so a day is only
+        final once its month has closed, invoice_close_days into the next.
+
+        Args:
+            config: AWS (account) configuration
+            today: Current date
+
+        Returns:
+            Latest finalized usage date
+        """
+        month_start = today.replace(day=1)
+        if today < month_start + timedelta(days=config.invoice_close_days):
+            # Last month's invoice is still open
+            month_start = (month_start - timedelta(days=1)).replace(day=1)
+        invoice_closed_through = month_start - timedelta(days=1)
+        return min(super().finalized_through(config, today), invoice_closed_through)
+
     def test_connection(self) -> bool:
         """
         Test AWS Cost Explorer API connection
@@ -51,7 +76,6 @@ class AWSCollector(BaseCollector):
         """
         try:
             # Try to get cost for a date range (AWS requires start < end)
-            from datetime import timedelta
             end_date = date.today()
             start_date = end_date - timedelta(days=7)
             self.client.get_cost_and_usage(
@@ -68,63 +92,131 @@ class AWSCollector(BaseCollector):
             self.logger.error(f"AWS connection test failed: {e}")
             return False
 
-    def collect_costs(
+    def iter_cost_batches(
         self,
         start_date: date,
         end_date: date
-    ) -> List[CostRecord]:
+    ) -> Iterator[List[CostRecord]]:
         """
-        Collect AWS costs for the specified date range
+        Collect AWS costs for the specified date range, one batch per window
 
         Args:
             start_date: Start date (inclusive)
             end_date: End date (inclusive)
 
-        Returns:
-            List of CostRecord objects
+        Yields:
+            List of CostRecord objects for each date window, in date order
         """
         self.logger.info(f"Collecting AWS costs from {start_date} to {end_date}")
 
+        # Long ranges are split into windows that are fetched in parallel;
+        # each window follows NextPageToken until Cost Explorer is exhausted
+        windows = split_date_range(start_date, end_date, self.config.window_days)
+        max_workers = max(1, min(self.config.max_workers, len(windows)))
+
         try:
-            # AWS Cost Explorer requires end date to be exclusive (next day)
-            # So we add 1 day to end_date
-            from datetime import timedelta
-            api_end_date = end_date + timedelta(days=1)
+            if len(windows) == 1:
+                yield self._collect_window(*windows[0])
+                return
 
-            response = self.client.get_cost_and_usage(
-                TimePeriod={
-                    'Start': start_date.strftime('%Y-%m-%d'),
-                    'End': api_end_date.strftime('%Y-%m-%d')
-                },
-                Granularity='DAILY',
-                Metrics=['UsageQuantity', 'BlendedCost', 'UnblendedCost'],
-                Filter={
-                    'Not': {
-                        'Dimensions': {
-                            'Key': 'RECORD_TYPE',
-                            'Values': ['Credit', 'Refund']
-                        }
-                    }
-                },
-                GroupBy=[
-                    {
-                        'Type': 'DIMENSION',
-                        'Key': 'SERVICE'
-                    }
-                ]
+            self.logger.info(
+                f"Split date range into {len(windows)} window(s) of up to "
+                f"{self.config.window_days} days, fetching with {max_workers} worker(s)"
             )
-
-            # Parse response and create cost records
-            records = self._parse_response(response)
-
-            self._log_collection_summary(start_date, end_date, records)
-
-            return records
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                # map() preserves window order, so batches stay in date order
+                yield from executor.map(
+                    lambda window: self._collect_window(*window),
+                    windows
+                )
 
         except (ClientError, BotoCoreError) as e:
             self.logger.error(f"Failed to collect AWS costs: {e}")
             raise
 
+    def _collect_window(
+        self,
+        start_date: date,
+        end_date: date
+    ) -> CostRecords:
+        """
+        Collect AWS costs for a single date window, from the response cache
+        or from Cost Explorer
+
+        Args:
+            start_date: Window start date (inclusive)
+            end_date: Window end date (inclusive)
+
+        Returns:
+            Cost records for the window
+        """
+        # AWS Cost Explorer requires end date to be exclusive (next day)
+        # So we add 1 day to end_date
+        api_end_date = end_date + timedelta(days=1)
+
+        request = {
+            'TimePeriod': {
+                'Start': start_date.strftime('%Y-%m-%d'),
+                'End': api_end_date.strftime('%Y-%m-%d')
+            },
+            'Granularity': 'DAILY',
+            'Metrics': ['UsageQuantity', 'BlendedCost', 'UnblendedCost'],
+            'Filter': {
+                'Not': {
+                    'Dimensions': {
+                        'Key': 'RECORD_TYPE',
+                        'Values': ['Credit', 'Refund']
+                    }
+                }
+            },
+            'GroupBy': [
+                {
+                    'Type': 'DIMENSION',
+                    'Key': 'SERVICE'
+                }
+            ]
+        }
+
+        return self._cached_window(
+            start_date,
+            end_date,
+            request,
+            lambda: self._fetch_window_pages(request, start_date, end_date)
+        )
+
+    def _fetch_window_pages(self, request: dict, start_date: date, end_date: date) -> List[CostRecord]:
+        """
+        Run a Cost Explorer request, following NextPageToken
+
+        Args:
+            request: get_cost_and_usage() arguments for the window
+            start_date: Window start date, for logging
+            end_date: Window end date, for logging
+
+        Returns:
+            List of CostRecord objects for the window
+        """
+        request = dict(request)
+        records = []
+        page_count = 0
+
+        while True:
+            response = self.client.get_cost_and_usage(**request)
+            page_count += 1
+
+            # Parse response and create cost records
+            records.extend(self._parse_response(response))
+
+            next_page_token = response.get('NextPageToken')
+            if not next_page_token:
+                break
+            request['NextPageToken'] = next_page_token
+
+        self.logger.debug(
+            f"Fetched {page_count} page(s), {len(records)} record(s) for {start_date} to {end_date}"
+        )
+        return records
+
     def _parse_response(self, response: dict) -> List[CostRecord]:
         """
         Parse AWS Cost Explorer API response
@@ -5,14 +5,35 @@ Supports both:
 2. Azure Sponsorship accounts via cookie-based portal API
 """
 from datetime import date, timedelta
-from typing import List, Dict, Optional
+from typing import Callable, Iterator, List, Dict, Optional, Tuple
 from decimal import Decimal
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import threading
 import requests
+from requests.adapters import HTTPAdapter
 import json
 from json import JSONDecodeError
 
-from collectors.base_collector import BaseCollector, CostRecord
+from collectors.base_collector import BaseCollector, CostRecord, CostRecordBatch, CostRecords
 from config import AzureConfig
+from utils.date_utils import get_date_list, split_date_range
+
+# Throttling backoff for Cost Management queries
+_MAX_THROTTLE_RETRIES = 5
+_THROTTLE_BACKOFF_BASE_SECONDS = 5
+_THROTTLE_BACKOFF_MAX_SECONDS = 120
+_RETRY_AFTER_HEADERS = (
+    'x-ms-ratelimit-microsoft.costmanagement-qpu-retry-after',
+    'x-ms-ratelimit-microsoft.costmanagement-entity-retry-after',
+    'x-ms-ratelimit-microsoft.costmanagement-tenant-retry-after',
+    'Retry-After',
+)
+
+# Cost Management REST endpoint, used directly by the asyncio engine
+_COST_MANAGEMENT_QUERY_URL = 'https://management.azure.com{scope}/providers/Microsoft.CostManagement/query'
+_COST_MANAGEMENT_API_VERSION = '2023-03-01'
+_MANAGEMENT_TOKEN_SCOPE = 'https://management.azure.com/.default'
 
 
 class AzureCollector(BaseCollector):
@@ -28,8 +49,12 @@ class AzureCollector(BaseCollector):
         Args:
             config: Azure configuration
         """
-        super().__init__('azure')
+        super().__init__('azure', config.account_id)
         self.config = config
+        # The raw-response dump is printed once per collector, not once per
+        # scheduled window (see _claim_raw_response_dump)
+        self._raw_response_dumped = False
+        self._raw_response_lock = threading.Lock()
         
         # Determine which method to use
         self.use_cost_management_api = self._should_use_cost_management_api()
@@ -40,6 +65,7 @@ class AzureCollector(BaseCollector):
         else:
             self.logger.info("Using Azure Sponsorship portal API (cookie-based)")
             self.api_url = "https://www.microsoftazuresponsorships.com/Usage/GetSubscriptionData"
+            self.session = self._create_http_session()
     
     def _should_use_cost_management_api(self) -> bool:
         """
@@ -68,6 +94,23 @@ class AzureCollector(BaseCollector):
             self.logger.warning("No valid credentials found. Will attempt Cost Management API first.")
             return True
     
+    def _create_http_session(self) -> requests.Session:
+        """
+        Create a keep-alive HTTP session for the Sponsorship portal API
+
+        The connection pool is sized to the concurrency cap so parallel day
+        requests reuse connections instead of paying a TLS handshake each.
+
+        Returns:
+            Configured requests session
+        """
+        session = requests.Session()
+        pool_size = max(1, self.config.max_workers)
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        session.mount('https://', adapter)
+        session.headers.update(self._get_headers())
+        return session
+
     def _init_cost_management_client(self):
         """Initialize Azure Cost Management API client"""
         try:
@@ -190,10 +233,9 @@ class AzureCollector(BaseCollector):
             }
 
             self.logger.debug(f"Making request to {self.api_url} with params: {params}")
-            headers = self._get_headers()
             
             self.logger.info("Sending HTTP request (timeout: 30s)...")
-            response = requests.get(self.api_url, params=params, headers=headers, timeout=30)
+            response = self.session.get(self.api_url, params=params, timeout=30)
             self.logger.info(f"Received response with status code: {response.status_code}")
 
             if response.status_code == 200:
@@ -215,99 +257,64 @@ class AzureCollector(BaseCollector):
             self.logger.error(f"Azure connection test failed: {e}", exc_info=True)
             return False
 
-    def collect_costs(
+    def iter_cost_batches(
         self,
         start_date: date,
         end_date: date
-    ) -> List[CostRecord]:
+    ) -> Iterator[List[CostRecord]]:
         """
-        Collect Azure costs for the specified date range
+        Collect Azure costs for the specified date range as a stream of batches
 
         Args:
             start_date: Start date (inclusive)
             end_date: End date (inclusive)
 
-        Returns:
-            List of CostRecord objects
+        Yields:
+            List of CostRecord objects per query window (Cost Management API)
+            or per day (Sponsorship portal), in date order
         """
         if self.use_cost_management_api:
-            return self._collect_costs_via_api(start_date, end_date)
+            yield from self._iter_costs_via_api(start_date, end_date)
         else:
-            return self._collect_costs_via_sponsorship(start_date, end_date)
+            yield from self._iter_costs_via_sponsorship(start_date, end_date)
     
-    def _collect_costs_via_api(
+    def _iter_costs_via_api(
         self,
         start_date: date,
         end_date: date
-    ) -> List[CostRecord]:
-        """Collect costs using Azure Cost Management API"""
+    ) -> Iterator[List[CostRecord]]:
+        """
+        Collect costs using Azure Cost Management API, one batch per window
+
+        The range is split into windows of AZURE_QUERY_WINDOW_DAYS that are
+        queried concurrently, so latency is bounded by the slowest window
+        rather than by one query over the whole range.
+        """
         self.logger.info(f"Collecting Azure costs via Cost Management API from {start_date} to {end_date}")
         
         try:
-            from azure.mgmt.costmanagement.models import (
-                QueryDefinition, 
-                QueryTimePeriod, 
-                QueryDataset,
-                QueryAggregation,
-                QueryGrouping
-            )
-            from datetime import datetime, timezone
+            import time
             
             scope = f"/subscriptions/{self.config.subscription_id}"
-            
-            # Convert dates to ISO format strings (matching sample-cost.py)
-            # Start of day for from_date, end of day for to_date
-            from_datetime = datetime.combine(start_date, datetime.min.time()).replace(tzinfo=timezone.utc)
-            to_datetime = datetime.combine(end_date, datetime.max.time()).replace(tzinfo=timezone.utc)
-            from_iso = from_datetime.isoformat()
-            to_iso = to_datetime.isoformat()
-            
-            # Create proper QueryAggregation object
-            aggregation = QueryAggregation(
-                name="PreTaxCost",
-                function="Sum"
-            )
-            
-            # Create proper QueryGrouping object
-            grouping = QueryGrouping(
-                type="Dimension",
-                name="ServiceName"
-            )
-            
-            query_definition = QueryDefinition(
-                type="Usage",  # Changed from "ActualCost" to "Usage" (matching sample-cost.py)
-                timeframe="Custom",
-                time_period=QueryTimePeriod(
-                    from_property=from_iso,  # Using ISO string format
-                    to=to_iso  # Using ISO string format
-                ),
-                dataset=QueryDataset(
-                    granularity="Daily",  # Keeping "Daily" for daily breakdown
-                    aggregation={
-                        "totalCost": aggregation
-                    },
-                    grouping=[grouping]
-                )
-            )
+            windows = split_date_range(start_date, end_date, self.config.query_window_days)
+            max_workers = max(1, min(self.config.max_workers, len(windows)))
             
             self.logger.info("Querying Azure Cost Management API...")
             self.logger.info(f"Scope: {scope}")
             days_range = (end_date - start_date).days + 1
             self.logger.info(f"Date range: {start_date} to {end_date} ({days_range} days)")
-            
-            if days_range > 30:
-                self.logger.warning(f"Large date range ({days_range} days) - this may take 5-15 minutes. Consider using smaller ranges.")
-            
-            import time
-            import threading
+            if len(windows) > 1:
+                self.logger.info(
+                    f"Split into {len(windows)} window(s) of up to {self.config.query_window_days} days, "
+                    f"querying with {max_workers} concurrent request(s)"
+                )
             
             start_time = time.time()
+            stop_progress = threading.Event()
             
             # Show progress indicator
             def show_progress():
-                elapsed = 0
-                while True:
-                    time.sleep(30)  # Update every 30 seconds
+                while not stop_progress.wait(30):  # Update every 30 seconds
                     elapsed = time.time() - start_time
                     if elapsed < 300:  # Show progress for first 5 minutes
                         self.logger.info(f"Still waiting for Azure Cost Management API response... ({elapsed/60:.1f} minutes elapsed)")
@@ -321,29 +328,122 @@ class AzureCollector(BaseCollector):
             progress_thread = threading.Thread(target=show_progress, daemon=True)
             progress_thread.start()
             
-            all_records = []
-            all_results = []
+            record_count = 0
+            try:
+                with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                    # map() yields in submission order, so batches stay in window order
+                    window_results = executor.map(
+                        lambda window: self._collect_api_window(scope, window[0], window[1]),
+                        windows
+                    )
+                    for window_records in window_results:
+                        record_count += len(window_records)
+                        yield window_records
+            finally:
+                stop_progress.set()
+                elapsed_time = time.time() - start_time
+                self.logger.info(f"Azure Cost Management API query completed in {elapsed_time:.2f} seconds ({elapsed_time/60:.2f} minutes)")
+            
+            self.logger.info(f"Collected {record_count} cost records via Cost Management API")
             
+        except Exception as e:
+            self.logger.error(f"Failed to collect Azure costs via Cost Management API: {e}", exc_info=True)
+            raise
+
+    def _build_usage_query(self, start_date: date, end_date: date):
+        """
+        Build a daily, service-grouped Cost Management query definition
+
+        Args:
+            start_date: Start date (inclusive)
+            end_date: End date (inclusive)
+
+        Returns:
+            QueryDefinition for the date range
+        """
+        from azure.mgmt.costmanagement.models import (
+            QueryDefinition, 
+            QueryTimePeriod, 
+            QueryDataset,
+            QueryAggregation,
+            QueryGrouping
+        )
+        from datetime import datetime, timezone
+        
+        # Convert dates to ISO format strings (matching sample-cost.py)
+        # Start of day for from_date, end of day for to_date
+        from_datetime = datetime.combine(start_date, datetime.min.time()).replace(tzinfo=timezone.utc)
+        to_datetime = datetime.combine(end_date, datetime.max.time()).replace(tzinfo=timezone.utc)
+        from_iso = from_datetime.isoformat()
+        to_iso = to_datetime.isoformat()
+        
+        # Create proper QueryAggregation object
+        aggregation = QueryAggregation(
+            name="PreTaxCost",
+            function="Sum"
+        )
+        
+        # Create proper QueryGrouping object
+        grouping = QueryGrouping(
+            type="Dimension",
+            name="ServiceName"
+        )
+        
+        return QueryDefinition(
+            type="Usage",  # Changed from "ActualCost" to "Usage" (matching sample-cost.py)
+            timeframe="Custom",
+            time_period=QueryTimePeriod(
+                from_property=from_iso,  # Using ISO string format
+                to=to_iso  # Using ISO string format
+            ),
+            dataset=QueryDataset(
+                granularity="Daily",  # Keeping "Daily" for daily breakdown
+                aggregation={
+                    "totalCost": aggregation
+                },
+                grouping=[grouping]
+            )
+        )
+
+    def _call_with_backoff(self, operation: Callable, start_date: date, end_date: date):
+        """
+        Run a Cost Management API call, backing off while throttled
+
+        Honours the Retry-After hint Azure sends with 429 responses and falls
+        back to exponential backoff when no hint is present.
+
+        Args:
+            operation: Zero-argument callable performing the request
+            start_date: Window start date, for logging
+            end_date: Window end date, for logging
+
+        Returns:
+            Whatever the operation returns
+        """
+        import time
+
+        attempt = 0
+        while True:
             try:
-                # Make initial query
-                result = self.cost_client.query.usage(scope=scope, parameters=query_definition)
-                all_results.append(result)
-                
-                # Handle pagination - fetch all pages if next_link exists
-                while result and hasattr(result, 'next_link') and result.next_link:
-                    self.logger.info(f"Fetching next page of results... (next_link: {result.next_link[:100]}...)")
-                    # Note: The SDK might handle next_link automatically, but we'll track it
-                    # For now, if next_link exists, we'd need to make another query
-                    # The SDK's query.usage might not support direct next_link, so we break
-                    # and log that pagination might be needed
-                    if result.next_link:
-                        self.logger.warning("Pagination detected (next_link present), but SDK may not support direct pagination")
-                        self.logger.warning("If data seems incomplete, consider using smaller date ranges")
-                    break
-                    
+                return operation()
             except Exception as api_error:
                 error_msg = str(api_error)
-                self.logger.error(f"API call failed: {error_msg}", exc_info=True)
+                throttled = self._is_throttling_error(api_error)
+
+                if throttled and attempt < _MAX_THROTTLE_RETRIES:
+                    delay = self._get_retry_after(api_error) or min(
+                        _THROTTLE_BACKOFF_BASE_SECONDS * (2 ** attempt),
+                        _THROTTLE_BACKOFF_MAX_SECONDS
+                    )
+                    attempt += 1
+                    self.logger.warning(
+                        f"Throttled querying {start_date} to {end_date}; retrying in {delay:.0f}s "
+                        f"(attempt {attempt}/{_MAX_THROTTLE_RETRIES})"
+                    )
+                    time.sleep(delay)
+                    continue
+
+                self.logger.error(f"API call failed for {start_date} to {end_date}: {error_msg}", exc_info=True)
                 
                 # Provide helpful error messages
                 if "AADSTS" in error_msg or "authentication" in error_msg.lower():
@@ -352,287 +452,724 @@ class AzureCollector(BaseCollector):
                     self.logger.error("Permission error - ensure service principal has 'Cost Management Reader' role")
                 elif "not found" in error_msg.lower():
                     self.logger.error("Resource not found - check subscription ID and scope")
-                elif "throttle" in error_msg.lower() or "rate limit" in error_msg.lower():
+                elif throttled:
                     self.logger.error("Rate limit exceeded - wait and retry with smaller date range")
                 
                 raise
-            finally:
-                elapsed_time = time.time() - start_time
-                self.logger.info(f"Azure Cost Management API query completed in {elapsed_time:.2f} seconds ({elapsed_time/60:.2f} minutes)")
-            
-            # Process all results (including paginated ones)
-            for result_idx, result in enumerate(all_results):
-                self.logger.info(f"Processing result page {result_idx + 1}/{len(all_results)}")
-                
-                # Debug: Print the EXACT response - FORCE OUTPUT (only for first result)
-                if result_idx == 0:
-                    print("\n" + "=" * 80, flush=True)
-                    print("EXACT API RESPONSE - FULL DETAILS", flush=True)
-                    print("=" * 80 + "\n", flush=True)
-                    self.logger.info("=" * 80)
-                    self.logger.info("EXACT API RESPONSE - FULL DETAILS")
-                    self.logger.info("=" * 80)
-                    self.logger.info(f"Result type: {type(result)}")
-                    self.logger.info(f"Result class: {result.__class__.__name__}")
-                    
-                    # Print the full result object - FORCE OUTPUT
-                    print("\n--- Full result object (str representation) ---", flush=True)
-                    print(str(result), flush=True)
+
+    @staticmethod
+    def _is_throttling_error(error: Exception) -> bool:
+        """Check whether an API error is a throttling (HTTP 429) response"""
+        if getattr(error, 'status_code', None) == 429:
+            return True
+        error_msg = str(error).lower()
+        return 'throttl' in error_msg or 'rate limit' in error_msg or 'too many requests' in error_msg
+
+    @staticmethod
+    def _get_retry_after(error: Exception) -> Optional[float]:
+        """Extract the server's retry delay in seconds from a throttling error, if any"""
+        response = getattr(error, 'response', None)
+        return AzureCollector._retry_after_from_headers(getattr(response, 'headers', None) or {})
+
+    @staticmethod
+    def _retry_after_from_headers(headers) -> Optional[float]:
+        """Extract the server's retry delay in seconds from response headers, if any"""
+        for header in _RETRY_AFTER_HEADERS:
+            value = headers.get(header)
+            if value:
+                try:
+                    return float(value)
+                except ValueError:
+                    continue
+        return None
+
+    def _collect_api_window(
+        self,
+        scope: str,
+        start_date: date,
+        end_date: date
+    ) -> CostRecords:
+        """
+        Query and parse Cost Management costs for a single date window,
+        unless the response cache already holds it
+
+        Args:
+            scope: Query scope (subscription path)
+            start_date: Window start date (inclusive)
+            end_date: Window end date (inclusive)
+
+        Returns:
+            Cost records for the window
+        """
+        query_definition = self._build_usage_query(start_date, end_date)
+        return self._cached_window(
+            start_date,
+            end_date,
+            self._usage_query_cache_key(query_definition.serialize()),
+            lambda: self._query_api_window(scope, start_date, end_date, query_definition)
+        )
+
+    def _usage_query_cache_key(self, body: Dict) -> Dict:
+        """Describe a Cost Management window query for the response cache"""
+        return {'subscription_id': self.config.subscription_id, 'query': body}
+
+    def _query_api_window(
+        self,
+        scope: str,
+        start_date: date,
+        end_date: date,
+        query_definition
+    ) -> List[CostRecord]:
+        """Run a Cost Management window query, following next_link, and parse the rows"""
+        result = self._call_with_backoff(
+            lambda: self.cost_client.query.usage(scope=scope, parameters=query_definition),
+            start_date,
+            end_date
+        )
+
+        if self._claim_raw_response_dump():
+            self._log_raw_api_response(result, start_date, end_date)
+
+        # Stream every page's rows into the date/service aggregation as it
+        # arrives, following next_link until the result set is exhausted
+        costs_by_date_service = {}
+        rows_data = self._extract_rows(result)
+        next_link = getattr(result, 'next_link', None)
+        page_count = 1
+        row_count = 0
+
+        while True:
+            if rows_data:
+                self.logger.info(
+                    f"Processing {len(rows_data)} rows from API response page {page_count} "
+                    f"({start_date} to {end_date})"
+                )
+                self._aggregate_usage_rows(rows_data, costs_by_date_service)
+                row_count += len(rows_data)
+
+            if not next_link:
+                break
+
+            page_count += 1
+            self.logger.info(f"Fetching page {page_count} of results for {start_date} to {end_date}...")
+            rows_data, next_link = self._call_with_backoff(
+                lambda link=next_link: self._fetch_next_usage_page(link, query_definition),
+                start_date,
+                end_date
+            )
+
+        if row_count == 0:
+            self.logger.warning(f"No rows data found in API response for {start_date} to {end_date}. Possible reasons:")
+            self.logger.warning("1. No costs for the specified date range")
+            self.logger.warning("2. API response structure is different than expected")
+            self.logger.warning("3. Query returned empty results")
+            return []
+
+        self.logger.info(
+            f"Grouped {row_count} rows from {page_count} page(s) into "
+            f"{len(costs_by_date_service)} unique date/service combinations"
+        )
+
+        return self._build_api_records(costs_by_date_service, start_date)
+
+    def _fetch_next_usage_page(self, next_link: str, query_definition) -> Tuple[list, Optional[str]]:
+        """
+        Fetch a follow-up page of a Cost Management query
+
+        The SDK's query.usage() does not accept a skip token, so the next_link
+        URL is POSTed with the original query body through the client's own
+        pipeline (authentication, retries and all).
+
+        Args:
+            next_link: Absolute next-page URL from the previous page
+            query_definition: QueryDefinition of the original query
+
+        Returns:
+            Tuple of (rows, next_link) for the fetched page
+        """
+        from azure.core.rest import HttpRequest
+
+        request = HttpRequest('POST', next_link, json=query_definition.serialize())
+        response = self.cost_client._send_request(request)
+        response.raise_for_status()
+
+        properties = response.json().get('properties') or {}
+        return properties.get('rows') or [], properties.get('nextLink')
+
+    @staticmethod
+    def _extract_rows(result) -> Optional[list]:
+        """Extract the rows list from a Cost Management QueryResult"""
+        if hasattr(result, 'rows') and result.rows:
+            return result.rows
+        elif hasattr(result, 'properties') and hasattr(result.properties, 'rows') and result.properties.rows:
+            return result.properties.rows
+        elif hasattr(result, 'data') and hasattr(result.data, 'rows') and result.data.rows:
+            return result.data.rows
+        return None
+
+    def _claim_raw_response_dump(self) -> bool:
+        """
+        Whether this call should dump the raw API response
+
+        True for the first Cost Management response the collector receives.
+        The collector is shared by every window task of a run (and by every
+        run of the daemon), so a backfill prints the dump once instead of
+        once per scheduled window.
+        """
+        with self._raw_response_lock:
+            if self._raw_response_dumped:
+                return False
+            self._raw_response_dumped = True
+            return True
+
+    def _log_raw_api_response(self, result, start_date: date, end_date: date):
+        """Dump the raw Cost Management API response for troubleshooting"""
+        # Debug: Print the EXACT response - FORCE OUTPUT
+        print("\n" + "=" * 80, flush=True)
+        print("EXACT API RESPONSE - FULL DETAILS", flush=True)
+        print("=" * 80 + "\n", flush=True)
+        self.logger.info("=" * 80)
+        self.logger.info("EXACT API RESPONSE - FULL DETAILS")
+        self.logger.info("=" * 80)
+        self.logger.info(f"Result type: {type(result)}")
+        self.logger.info(f"Result class: {result.__class__.__name__}")
+        
+        # Print the full result object - FORCE OUTPUT
+        print("\n--- Full result object (str representation) ---", flush=True)
+        print(str(result), flush=True)
+        
+        # Log important attributes
+        print("\n--- Checking important attributes ---", flush=True)
+        for attr in ['rows', 'columns', 'next_link']:
+            if hasattr(result, attr):
+                value = getattr(result, attr)
+                print(f"{attr}: {value}", flush=True)
+                print(f"{attr} type: {type(value)}", flush=True)
+                if value is not None and hasattr(value, '__len__'):
+                    print(f"{attr} length: {len(value)}", flush=True)
                     
-                    # Log important attributes
-                    print("\n--- Checking important attributes ---", flush=True)
-                    for attr in ['rows', 'columns', 'next_link']:
-                        if hasattr(result, attr):
-                            value = getattr(result, attr)
-                            print(f"{attr}: {value}", flush=True)
-                            print(f"{attr} type: {type(value)}", flush=True)
-                            if value is not None and hasattr(value, '__len__'):
-                                print(f"{attr} length: {len(value)}", flush=True)
-                                
-                                # If it's rows and empty, provide helpful message
-                                if attr == 'rows' and len(value) == 0:
-                                    print(f"\n⚠️  ROWS IS EMPTY - No cost data found for this date range", flush=True)
-                                    print(f"   This could mean:", flush=True)
-                                    print(f"   1. No costs occurred during {start_date} to {end_date}", flush=True)
-                                    print(f"   2. Cost data hasn't appeared yet (takes 24-48 hours)", flush=True)
-                                    print(f"   3. Try a different date range with known costs", flush=True)
-                
-                # Process results by date and service
-                rows_data = None
-                if hasattr(result, 'rows') and result.rows:
-                    rows_data = result.rows
-                elif hasattr(result, 'properties') and hasattr(result.properties, 'rows') and result.properties.rows:
-                    rows_data = result.properties.rows
-                elif hasattr(result, 'data') and hasattr(result.data, 'rows') and result.data.rows:
-                    rows_data = result.data.rows
+                    # If it's rows and empty, provide helpful message
+                    if attr == 'rows' and len(value) == 0:
+                        print(f"\n⚠️  ROWS IS EMPTY - No cost data found for this date range", flush=True)
+                        print(f"   This could mean:", flush=True)
+                        print(f"   1. No costs occurred during {start_date} to {end_date}", flush=True)
+                        print(f"   2. Cost data hasn't appeared yet (takes 24-48 hours)", flush=True)
+                        print(f"   3. Try a different date range with known costs", flush=True)
+
+    def _aggregate_usage_rows(self, rows_data, costs_by_date_service: Dict):
+        """
+        Add Cost Management rows into a (date_str, service_name) -> cost mapping
+
+        Args:
+            rows_data: Rows from a QueryResult page
+            costs_by_date_service: Mapping updated in place
+        """
+        for idx, row in enumerate(rows_data):
+            try:
+                self.logger.debug(f"Processing row {idx}: {row} (type: {type(row)})")
                 
-                if rows_data:
-                    self.logger.info(f"Processing {len(rows_data)} rows from API response (page {result_idx + 1})")
-                    # Group by date and service
-                    costs_by_date_service = {}
-                    
-                    for idx, row in enumerate(rows_data):
-                        try:
-                            self.logger.debug(f"Processing row {idx}: {row} (type: {type(row)})")
-                            
-                            # Handle different row formats
-                            # With "Daily" granularity and grouping by "ServiceName", format is:
-                            # [cost, date, service_name, currency]
-                            if isinstance(row, (list, tuple)):
-                                if len(row) >= 3:
-                                    # Format: [cost, date, service_name, currency?]
-                                    cost = float(row[0])  # Cost is first
-                                    date_value = row[1]   # Date (can be int like 20251201 or string)
-                                    service_name = str(row[2]) if len(row) > 2 else "Unknown"
-                                    
-                                    # Convert date from integer format (20251201) to string (2025-12-01)
-                                    if isinstance(date_value, int):
-                                        date_str = str(date_value)
-                                        # Format: YYYYMMDD -> YYYY-MM-DD
-                                        if len(date_str) == 8:
-                                            date_str = f"{date_str[:4]}-{date_str[4:6]}-{date_str[6:8]}"
-                                    else:
-                                        date_str = str(date_value)
-                                else:
-                                    self.logger.warning(f"Row {idx} has insufficient columns: {row}")
-                                    continue
-                            elif hasattr(row, '__getitem__'):
-                                # Try to access as dict-like or object
-                                cost = float(row[0]) if len(row) > 0 else 0.0
-                                date_value = row[1] if len(row) > 1 else None
-                                service_name = str(row[2]) if len(row) > 2 else "Unknown"
-                                
-                                # Convert date from integer format
-                                if isinstance(date_value, int):
-                                    date_str = str(date_value)
-                                    if len(date_str) == 8:
-                                        date_str = f"{date_str[:4]}-{date_str[4:6]}-{date_str[6:8]}"
-                                else:
-                                    date_str = str(date_value) if date_value else None
-                            else:
-                                self.logger.warning(f"Row {idx} has unexpected format: {row}")
-                                continue
-                            
-                            if cost > 0:
-                                key = (date_str, service_name)
-                                if key not in costs_by_date_service:
-                                    costs_by_date_service[key] = 0.0
-                                costs_by_date_service[key] += cost
-                                self.logger.debug(f"Added cost: {service_name} on {date_str}: ${cost}")
-                        except Exception as e:
-                            self.logger.warning(f"Error processing row {idx}: {row}. Error: {e}")
-                            continue
-                    
-                    self.logger.info(f"Grouped into {len(costs_by_date_service)} unique date/service combinations")
+                # Handle different row formats
+                # With "Daily" granularity and grouping by "ServiceName", format is:
+                # [cost, date, service_name, currency]
+                if isinstance(row, (list, tuple)):
+                    if len(row) >= 3:
+                        # Format: [cost, date, service_name, currency?]
+                        cost = float(row[0])  # Cost is first
+                        date_value = row[1]   # Date (can be int like 20251201 or string)
+                        service_name = str(row[2]) if len(row) > 2 else "Unknown"
+                        
+                        # Convert date from integer format (20251201) to string (2025-12-01)
+                        if isinstance(date_value, int):
+                            date_str = str(date_value)
+                            # Format: YYYYMMDD -> YYYY-MM-DD
+                            if len(date_str) == 8:
+                                date_str = f"{date_str[:4]}-{date_str[4:6]}-{date_str[6:8]}"
+                        else:
+                            date_str = str(date_value)
+                    else:
+                        self.logger.warning(f"Row {idx} has insufficient columns: {row}")
+                        continue
+                elif hasattr(row, '__getitem__'):
+                    # Try to access as dict-like or object
+                    cost = float(row[0]) if len(row) > 0 else 0.0
+                    date_value = row[1] if len(row) > 1 else None
+                    service_name = str(row[2]) if len(row) > 2 else "Unknown"
                     
-                    # Create CostRecord objects
-                    for (date_str, service_name), total_cost in costs_by_date_service.items():
-                        try:
-                            # Try to parse date - handle different formats
-                            if isinstance(date_str, str):
-                                # Try ISO format first
-                                try:
-                                    usage_date = date.fromisoformat(date_str[:10])
-                                except ValueError:
-                                    # Try other formats
-                                    from datetime import datetime
-                                    usage_date = datetime.strptime(date_str[:10], '%Y-%m-%d').date()
-                            else:
-                                usage_date = date_str if isinstance(date_str, date) else start_date
-                            
-                            record = CostRecord(
-                                cloud_provider='azure',
-                                service_name=service_name,
-                                cost_usd=self._normalize_cost(total_cost),
-                                usage_date=usage_date
-                            )
-                            all_records.append(record)
-                        except (ValueError, TypeError) as e:
-                            self.logger.warning(f"Failed to parse date or cost: {date_str}, {service_name}, {total_cost}. Error: {e}")
-                            continue
+                    # Convert date from integer format
+                    if isinstance(date_value, int):
+                        date_str = str(date_value)
+                        if len(date_str) == 8:
+                            date_str = f"{date_str[:4]}-{date_str[4:6]}-{date_str[6:8]}"
+                    else:
+                        date_str = str(date_value) if date_value else None
                 else:
-                    if result_idx == 0:  # Only log warning for first page
-                        self.logger.warning("No rows data found in API response. Possible reasons:")
-                        self.logger.warning("1. No costs for the specified date range")
-                        self.logger.warning("2. API response structure is different than expected")
-                        self.logger.warning("3. Query returned empty results")
-            
-            self.logger.info(f"Collected {len(all_records)} cost records via Cost Management API")
-            self._log_collection_summary(start_date, end_date, all_records)
-            
-            return all_records
-            
-        except Exception as e:
-            self.logger.error(f"Failed to collect Azure costs via Cost Management API: {e}", exc_info=True)
-            raise
+                    self.logger.warning(f"Row {idx} has unexpected format: {row}")
+                    continue
+                
+                if cost > 0:
+                    key = (date_str, service_name)
+                    if key not in costs_by_date_service:
+                        costs_by_date_service[key] = 0.0
+                    costs_by_date_service[key] += cost
+                    self.logger.debug(f"Added cost: {service_name} on {date_str}: ${cost}")
+            except Exception as e:
+                self.logger.warning(f"Error processing row {idx}: {row}. Error: {e}")
+                continue
+
+    def _build_api_records(self, costs_by_date_service: Dict, start_date: date) -> List[CostRecord]:
+        """
+        Create CostRecord objects from aggregated Cost Management costs
+
+        Args:
+            costs_by_date_service: Mapping of (date_str, service_name) to total cost
+            start_date: Fallback date for entries without a parseable date
+
+        Returns:
+            List of CostRecord objects
+        """
+        records = []
+        for (date_str, service_name), total_cost in costs_by_date_service.items():
+            try:
+                # Try to parse date - handle different formats
+                if isinstance(date_str, str):
+                    # Try ISO format first
+                    try:
+                        usage_date = date.fromisoformat(date_str[:10])
+                    except ValueError:
+                        # Try other formats
+                        from datetime import datetime
+                        usage_date = datetime.strptime(date_str[:10], '%Y-%m-%d').date()
+                else:
+                    usage_date = date_str if isinstance(date_str, date) else start_date
+                
+                record = CostRecord(
+                    cloud_provider='azure',
+                    service_name=service_name,
+                    cost_usd=self._normalize_cost(total_cost),
+                    usage_date=usage_date
+                )
+                records.append(record)
+            except (ValueError, TypeError) as e:
+                self.logger.warning(f"Failed to parse date or cost: {date_str}, {service_name}, {total_cost}. Error: {e}")
+                continue
+
+        return records
     
-    def _collect_costs_via_sponsorship(
+    def _iter_costs_via_sponsorship(
         self,
         start_date: date,
         end_date: date
-    ) -> List[CostRecord]:
-        """Collect costs using Sponsorship portal API (cookie-based)"""
+    ) -> Iterator[List[CostRecord]]:
+        """Collect costs using Sponsorship portal API (cookie-based), one batch per day"""
         self.logger.info(f"Collecting Azure Sponsorship costs from {start_date} to {end_date}")
         
-        # Calculate total days to process
-        total_days = (end_date - start_date).days + 1
-        self.logger.info(f"Will process {total_days} day(s) of data")
+        # Azure API returns aggregated data for entire range
+        # So we need to call it separately for each day
+        days = get_date_list(start_date, end_date)
+        total_days = len(days)
+        max_workers = max(1, min(self.config.max_workers, total_days))
+        self.logger.info(f"Will process {total_days} day(s) of data with {max_workers} concurrent request(s)")
 
         try:
-            all_records = []
-            current_date = start_date
-            day_count = 0
-
-            # Azure API returns aggregated data for entire range
-            # So we need to call it separately for each day
-            while current_date <= end_date:
-                day_count += 1
-                self.logger.info(f"[{day_count}/{total_days}] Fetching Azure costs for {current_date}...")
+            record_count = 0
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                # map() yields in submission order, so batches stay in date order
+                daily_results = executor.map(
+                    self._fetch_sponsorship_day,
+                    days,
+                    range(1, total_days + 1),
+                    [total_days] * total_days
+                )
+                for daily_records in daily_results:
+                    record_count += len(daily_records)
+                    yield daily_records
 
-                params = {
-                    'startDate': current_date.strftime('%Y-%m-%d'),
-                    'endDate': current_date.strftime('%Y-%m-%d'),
-                    'subscriptionGuid': self.config.subscription_id
-                }
+            self.logger.info(f"Finished processing all {total_days} day(s)")
+            self.logger.info(f"Returning {record_count} total cost record(s)")
 
-                self.logger.debug(f"Request parameters: startDate={params['startDate']}, endDate={params['endDate']}")
-                headers = self._get_headers()
-                
-                self.logger.info(f"[{day_count}/{total_days}] Sending HTTP request to Azure API (timeout: 60s)...")
-                response = requests.get(self.api_url, params=params, headers=headers, timeout=60)
-                self.logger.info(f"[{day_count}/{total_days}] Received response: HTTP {response.status_code}")
+        except Exception as e:
+            self.logger.error(f"Failed to collect Azure Sponsorship costs: {e}", exc_info=True)
+            raise
+
+    def _fetch_sponsorship_day(
+        self,
+        current_date: date,
+        day_count: int,
+        total_days: int
+    ) -> List[CostRecord]:
+        """
+        Fetch and parse Sponsorship portal costs for a single day
+
+        Args:
+            current_date: Day to fetch
+            day_count: 1-based position of the day, for progress logging
+            total_days: Total number of days being fetched
+
+        Returns:
+            Cost records for the day
+        """
+        self.logger.info(f"[{day_count}/{total_days}] Fetching Azure costs for {current_date}...")
+
+        params = {
+            'startDate': current_date.strftime('%Y-%m-%d'),
+            'endDate': current_date.strftime('%Y-%m-%d'),
+            'subscriptionGuid': self.config.subscription_id
+        }
+
+        self.logger.debug(f"Request parameters: startDate={params['startDate']}, endDate={params['endDate']}")
+
+        return self._cached_window(
+            current_date,
+            current_date,
+            {'url': self.api_url, 'params': params},
+            lambda: self._request_sponsorship_day(params, current_date, day_count, total_days)
+        )
+
+    def _request_sponsorship_day(
+        self,
+        params: Dict[str, str],
+        current_date: date,
+        day_count: int,
+        total_days: int
+    ) -> List[CostRecord]:
+        """Send one day's Sponsorship portal request and parse the response"""
+        self.logger.info(f"[{day_count}/{total_days}] Sending HTTP request to Azure API (timeout: 60s)...")
+        response = self.session.get(self.api_url, params=params, timeout=60)
+        self.logger.info(f"[{day_count}/{total_days}] Received response: HTTP {response.status_code}")
+
+        return self._parse_sponsorship_http_response(
+            response.status_code,
+            response.headers.get('Content-Type', ''),
+            response.text,
+            current_date,
+            day_count,
+            total_days
+        )
 
-                if response.status_code != 200:
+    def _parse_sponsorship_http_response(
+        self,
+        status_code: int,
+        content_type: str,
+        text: str,
+        current_date: date,
+        day_count: int,
+        total_days: int
+    ) -> List[CostRecord]:
+        """
+        Validate and parse a Sponsorship portal HTTP response for a single day
+
+        Shared by the blocking and asyncio request paths.
+
+        Args:
+            status_code: HTTP status code
+            content_type: Content-Type response header
+            text: Response body
+            current_date: Day the response is for
+            day_count: 1-based position of the day, for progress logging
+            total_days: Total number of days being fetched
+
+        Returns:
+            List of CostRecord objects for the day
+
+        Raises:
+            RuntimeError: On a non-200 status, a login page (expired cookies) or
+                a body that is not a JSON object; an empty result would let the
+                day be finalized without its costs
+        """
+        if status_code != 200:
+            self.logger.error(
+                f"[{day_count}/{total_days}] Azure API returned status {status_code} for {current_date}"
+            )
+            if text:
+                self.logger.error(f"Response body: {text[:500]}")
+            raise RuntimeError(f"Azure Sponsorship API returned status {status_code} for {current_date}")
+
+        # Check if response is valid JSON before parsing
+        self.logger.info(f"[{day_count}/{total_days}] Parsing response data for {current_date}...")
+        content_type = content_type.lower()
+        try:
+            # Check content type
+            if 'json' not in content_type:
+                # Check if it's a login page (cookies expired)
+                if 'text/html' in content_type and ('sign in' in text.lower() or 'login' in text.lower()):
                     self.logger.error(
-                        f"[{day_count}/{total_days}] Azure API returned status {response.status_code} for {current_date}"
+                        f"[{day_count}/{total_days}] ⚠️  AZURE COOKIES EXPIRED OR INVALID!"
                     )
-                    if response.text:
-                        self.logger.error(f"Response body: {response.text[:500]}")
-                    current_date += timedelta(days=1)
-                    continue
+                    self.logger.error(
+                        "The Azure Sponsorship API returned a login page instead of data."
+                    )
+                    self.logger.error(
+                        "Your AZURE_SPONSORSHIP_COOKIES have expired. Please refresh them:"
+                    )
+                    self.logger.error(
+                        "1. Go to https://www.microsoftazuresponsorships.com/Usage"
+                    )
+                    self.logger.error(
+                        "2. Open DevTools (F12) → Network tab"
+                    )
+                    self.logger.error(
+                        "3. Refresh the page and find any API request"
+                    )
+                    self.logger.error(
+                        "4. Copy the 'Cookie' header value"
+                    )
+                    self.logger.error(
+                        "5. Update AZURE_SPONSORSHIP_COOKIES in your .env file"
+                    )
+                else:
+                    self.logger.warning(
+                        f"[{day_count}/{total_days}] Unexpected content type: {content_type}. "
+                        f"Response text preview: {text[:200]}"
+                    )
+            
+            data = json.loads(text)
+        except (JSONDecodeError, ValueError) as json_error:
+            if 'text/html' in content_type:
+                self.logger.error(
+                    f"[{day_count}/{total_days}] ⚠️  Received HTML instead of JSON - Cookies may have expired!"
+                )
+                self.logger.error(
+                    "Please refresh your AZURE_SPONSORSHIP_COOKIES (see instructions above)"
+                )
+            else:
+                self.logger.error(
+                    f"[{day_count}/{total_days}] Failed to parse JSON response for {current_date}: {json_error}"
+                )
+                self.logger.error(f"Response status: {status_code}")
+                self.logger.error(f"Response text (first 500 chars): {text[:500]}")
+            raise RuntimeError(
+                f"Azure Sponsorship API returned an unreadable response for {current_date}: {json_error}"
+            ) from json_error
+        
+        # Validate that we got expected data structure
+        if not isinstance(data, dict):
+            self.logger.warning(
+                f"[{day_count}/{total_days}] Unexpected response format for {current_date}. "
+                f"Expected dict, got {type(data)}"
+            )
+            raise RuntimeError(
+                f"Azure Sponsorship API returned {type(data).__name__} instead of an object for {current_date}"
+            )
+        
+        daily_records = self._parse_sponsorship_response(data, current_date)
+        self.logger.info(f"[{day_count}/{total_days}] Parsed {len(daily_records)} record(s) for {current_date}")
+        self.logger.info(f"[{day_count}/{total_days}] Completed processing for {current_date}")
+        return daily_records
 
-                # Check if response is valid JSON before parsing
-                self.logger.info(f"[{day_count}/{total_days}] Parsing response data for {current_date}...")
-                try:
-                    # Check content type
-                    content_type = response.headers.get('Content-Type', '').lower()
-                    if 'json' not in content_type:
-                        # Check if it's a login page (cookies expired)
-                        if 'text/html' in content_type and ('sign in' in response.text.lower() or 'login' in response.text.lower()):
-                            self.logger.error(
-                                f"[{day_count}/{total_days}] ⚠️  AZURE COOKIES EXPIRED OR INVALID!"
-                            )
-                            self.logger.error(
-                                "The Azure Sponsorship API returned a login page instead of data."
-                            )
-                            self.logger.error(
-                                "Your AZURE_SPONSORSHIP_COOKIES have expired. Please refresh them:"
-                            )
-                            self.logger.error(
-                                "1. Go to https://www.microsoftazuresponsorships.com/Usage"
-                            )
-                            self.logger.error(
-                                "2. Open DevTools (F12) → Network tab"
-                            )
-                            self.logger.error(
-                                "3. Refresh the page and find any API request"
-                            )
-                            self.logger.error(
-                                "4. Copy the 'Cookie' header value"
-                            )
-                            self.logger.error(
-                                "5. Update AZURE_SPONSORSHIP_COOKIES in your .env file"
-                            )
-                        else:
-                            self.logger.warning(
-                                f"[{day_count}/{total_days}] Unexpected content type: {content_type}. "
-                                f"Response text preview: {response.text[:200]}"
-                            )
-                    
-                    data = response.json()
-                except (JSONDecodeError, ValueError) as json_error:
-                    content_type = response.headers.get('Content-Type', '').lower()
-                    if 'text/html' in content_type:
-                        self.logger.error(
-                            f"[{day_count}/{total_days}] ⚠️  Received HTML instead of JSON - Cookies may have expired!"
-                        )
-                        self.logger.error(
-                            "Please refresh your AZURE_SPONSORSHIP_COOKIES (see instructions above)"
-                        )
-                    else:
-                        self.logger.error(
-                            f"[{day_count}/{total_days}] Failed to parse JSON response for {current_date}: {json_error}"
-                        )
-                        self.logger.error(f"Response status: {response.status_code}")
-                        self.logger.error(f"Response text (first 500 chars): {response.text[:500]}")
-                    current_date += timedelta(days=1)
-                    continue
-                
-                # Validate that we got expected data structure
-                if not isinstance(data, dict):
+    async def collect_costs_async(
+        self,
+        start_date: date,
+        end_date: date,
+        http_session=None
+    ) -> CostRecords:
+        """
+        Collect Azure costs from an asyncio event loop
+
+        With a shared aiohttp session, Sponsorship days and Cost Management
+        windows are requested concurrently on the loop (up to AZURE_MAX_WORKERS
+        at a time) instead of on worker threads. Without one, this falls back
+        to the blocking collector.
+
+        Args:
+            start_date: Start date (inclusive)
+            end_date: End date (inclusive)
+            http_session: Shared aiohttp.ClientSession
+
+        Returns:
+            CostRecordBatch with all collected records
+        """
+        if http_session is None:
+            return await super().collect_costs_async(start_date, end_date)
+
+        if self.use_cost_management_api:
+            batches = await self._collect_via_api_async(http_session, start_date, end_date)
+        else:
+            batches = await self._collect_via_sponsorship_async(http_session, start_date, end_date)
+
+        records = CostRecordBatch()
+        for batch in batches:
+            records.extend(batch, account_id=self.account_id)
+
+        self._log_collection_summary(start_date, end_date, records)
+        return records
+
+    async def _collect_via_api_async(
+        self,
+        http_session,
+        start_date: date,
+        end_date: date
+    ) -> List[List[CostRecord]]:
+        """Query Cost Management windows concurrently over the REST API, one batch per window"""
+        scope = f"/subscriptions/{self.config.subscription_id}"
+        url = _COST_MANAGEMENT_QUERY_URL.format(scope=scope)
+        windows = split_date_range(start_date, end_date, self.config.query_window_days)
+        limit = asyncio.Semaphore(max(1, self.config.max_workers))
+        self.logger.info(
+            f"Collecting Azure costs via Cost Management REST API from {start_date} to {end_date} "
+            f"({len(windows)} window(s))"
+        )
+
+        async def collect_window(window_start: date, window_end: date) -> List[CostRecord]:
+            async with limit:
+                return await self._collect_api_window_async(http_session, url, window_start, window_end)
+
+        return await asyncio.gather(*(collect_window(window_start, window_end) for window_start, window_end in windows))
+
+    async def _collect_api_window_async(
+        self,
+        http_session,
+        url: str,
+        start_date: date,
+        end_date: date
+    ) -> CostRecords:
+        """
+        Query and parse Cost Management costs for a single window, following nextLink
+
+        Async counterpart of _collect_api_window().
+        """
+        body = self._build_usage_query(start_date, end_date).serialize()
+        return await self._cached_window_async(
+            start_date,
+            end_date,
+            self._usage_query_cache_key(body),
+            lambda: self._query_api_window_async(http_session, url, body, start_date, end_date)
+        )
+
+    async def _query_api_window_async(
+        self,
+        http_session,
+        url: str,
+        body: Dict,
+        start_date: date,
+        end_date: date
+    ) -> List[CostRecord]:
+        """Async counterpart of _query_api_window()"""
+        costs_by_date_service = {}
+        page_url = url
+        params = {'api-version': _COST_MANAGEMENT_API_VERSION}
+        page_count = 0
+        row_count = 0
+
+        while page_url:
+            page_count += 1
+            properties = await self._post_usage_query_async(http_session, page_url, params, body, start_date, end_date)
+            rows_data = properties.get('rows') or []
+            if rows_data:
+                self.logger.info(
+                    f"Processing {len(rows_data)} rows from API response page {page_count} "
+                    f"({start_date} to {end_date})"
+                )
+                self._aggregate_usage_rows(rows_data, costs_by_date_service)
+                row_count += len(rows_data)
+
+            # nextLink already carries the api-version and skip token
+            page_url = properties.get('nextLink')
+            params = None
+
+        if row_count == 0:
+            self.logger.warning(f"No rows data found in API response for {start_date} to {end_date}")
+            return []
+
+        self.logger.info(
+            f"Grouped {row_count} rows from {page_count} page(s) into "
+            f"{len(costs_by_date_service)} unique date/service combinations"
+        )
+        return self._build_api_records(costs_by_date_service, start_date)
+
+    async def _post_usage_query_async(
+        self,
+        http_session,
+        url: str,
+        params: Optional[Dict[str, str]],
+        body: Dict,
+        start_date: date,
+        end_date: date
+    ) -> Dict:
+        """
+        POST a Cost Management query page, backing off while throttled
+
+        Async counterpart of _call_with_backoff(): honours Retry-After on 429
+        responses and falls back to exponential backoff.
+
+        Returns:
+            The response's properties object (columns, rows, nextLink)
+        """
+        loop = asyncio.get_running_loop()
+        attempt = 0
+
+        while True:
+            # azure-identity caches the token, so this only blocks on refresh
+            token = await loop.run_in_executor(None, self.credential.get_token, _MANAGEMENT_TOKEN_SCOPE)
+            headers = {'Authorization': f'Bearer {token.token}'}
+
+            async with http_session.post(url, params=params, json=body, headers=headers) as response:
+                if response.status == 429 and attempt < _MAX_THROTTLE_RETRIES:
+                    delay = self._retry_after_from_headers(response.headers) or min(
+                        _THROTTLE_BACKOFF_BASE_SECONDS * (2 ** attempt),
+                        _THROTTLE_BACKOFF_MAX_SECONDS
+                    )
+                    attempt += 1
                     self.logger.warning(
-                        f"[{day_count}/{total_days}] Unexpected response format for {current_date}. "
-                        f"Expected dict, got {type(data)}"
+                        f"Throttled querying {start_date} to {end_date}; retrying in {delay:.0f}s "
+                        f"(attempt {attempt}/{_MAX_THROTTLE_RETRIES})"
                     )
-                    current_date += timedelta(days=1)
-                    continue
-                
-                daily_records = self._parse_sponsorship_response(data, current_date)
-                self.logger.info(f"[{day_count}/{total_days}] Parsed {len(daily_records)} record(s) for {current_date}")
-                all_records.extend(daily_records)
+                else:
+                    if response.status >= 400:
+                        text = await response.text()
+                        self.logger.error(
+                            f"API call failed for {start_date} to {end_date}: HTTP {response.status} {text[:500]}"
+                        )
+                        response.raise_for_status()
+                    return (await response.json()).get('properties') or {}
 
-                current_date += timedelta(days=1)
-                self.logger.info(f"[{day_count}/{total_days}] Completed processing for {current_date - timedelta(days=1)}")
+            await asyncio.sleep(delay)
 
-            self.logger.info(f"Finished processing all {total_days} day(s)")
-            self._log_collection_summary(start_date, end_date, all_records)
-            self.logger.info(f"Returning {len(all_records)} total cost record(s)")
+    async def _collect_via_sponsorship_async(
+        self,
+        http_session,
+        start_date: date,
+        end_date: date
+    ) -> List[List[CostRecord]]:
+        """Fetch Sponsorship portal days concurrently on the event loop, one batch per day"""
+        import aiohttp
 
-            return all_records
+        days = get_date_list(start_date, end_date)
+        total_days = len(days)
+        limit = asyncio.Semaphore(max(1, self.config.max_workers))
+        headers = self._get_headers()
+        timeout = aiohttp.ClientTimeout(total=60)
+        self.logger.info(
+            f"Collecting Azure Sponsorship costs from {start_date} to {end_date} "
+            f"({total_days} day(s), up to {self.config.max_workers} concurrent request(s))"
+        )
 
-        except Exception as e:
-            self.logger.error(f"Failed to collect Azure Sponsorship costs: {e}", exc_info=True)
-            raise
+        async def fetch_day(current_date: date, day_count: int) -> CostRecords:
+            params = {
+                'startDate': current_date.strftime('%Y-%m-%d'),
+                'endDate': current_date.strftime('%Y-%m-%d'),
+                'subscriptionGuid': self.config.subscription_id
+            }
+            return await self._cached_window_async(
+                current_date,
+                current_date,
+                {'url': self.api_url, 'params': params},
+                lambda: request_day(params, current_date, day_count)
+            )
+
+        async def request_day(params: Dict[str, str], current_date: date, day_count: int) -> List[CostRecord]:
+            async with limit:
+                self.logger.info(f"[{day_count}/{total_days}] Fetching Azure costs for {current_date}...")
+                async with http_session.get(self.api_url, params=params, headers=headers, timeout=timeout) as response:
+                    status_code = response.status
+                    content_type = response.headers.get('Content-Type', '')
+                    text = await response.text()
+            self.logger.info(f"[{day_count}/{total_days}] Received response: HTTP {status_code}")
+
+            return self._parse_sponsorship_http_response(
+                status_code, content_type, text, current_date, day_count, total_days
+            )
+
+        return await asyncio.gather(*(fetch_day(current_date, day_count) for day_count, current_date in enumerate(days, 1)))
 
     def _get_headers(self) -> Dict[str, str]:
         """
@@ -2,83 +2,565 @@
 Base collector class for cloud cost collection
 """
 from abc import ABC, abstractmethod
-from datetime import date
-from decimal import Decimal
-from typing import List, Dict
+from array import array
+from datetime import date, datetime, timedelta
+from decimal import Decimal, ROUND_HALF_EVEN
+from typing import Any, Awaitable, Callable, List, Dict, Iterable, Iterator, Optional, Tuple, Union
+import asyncio
 import logging
+import sys
 
 logger = logging.getLogger(__name__)
 
 
+# Costs are stored as fixed-point integers with 4 decimal places,
+# matching the NUMERIC(15, 4) cost_usd column
+COST_SCALE = 4
+_COST_QUANTUM = Decimal(1).scaleb(-COST_SCALE)
+
+
 class CostRecord:
     """
     Standardized cost record format for all cloud providers
     """
 
+    __slots__ = ('cloud_provider', 'service_name', 'cost_usd', 'usage_date', 'account_id')
+
     def __init__(
         self,
         cloud_provider: str,
         service_name: str,
         cost_usd: Decimal,
-        usage_date: date
+        usage_date: date,
+        account_id: str = ''
     ):
         self.cloud_provider = cloud_provider
         self.service_name = service_name
         self.cost_usd = cost_usd
         self.usage_date = usage_date
+        self.account_id = account_id
 
     def to_dict(self) -> Dict:
         """Convert to dictionary format"""
         return {
             'cloud_provider': self.cloud_provider,
+            'account_id': self.account_id,
             'service_name': self.service_name,
             'cost_usd': float(self.cost_usd),
             'usage_date': self.usage_date
         }
 
     def __repr__(self):
+        account = f"{self.account_id}, " if self.account_id else ''
         return (
-            f"<CostRecord({self.cloud_provider}, {self.service_name}, "
+            f"<CostRecord({self.cloud_provider}, {account}{self.service_name}, "
             f"${self.cost_usd}, {self.usage_date})>"
         )
 
 
+class CostRecordBatch:
+    """
+    Columnar container for many cost records
+
+    Provider, account and service names are dictionary-encoded (each
+    distinct string is stored once), usage dates are stored as day ordinals
+    and costs as fixed-point integers, all in compact arrays. A row costs ~19 bytes
+    instead of a full CostRecord object, which matters for SKU-level
+    imports with millions of rows.
+
+    Iterating yields CostRecord objects, so a batch can be used wherever a
+    list of records is expected.
+    """
+
+    def __init__(self, records: Iterable[CostRecord] = ()):
+        self._providers: List[str] = []
+        self._provider_index: Dict[str, int] = {}
+        self._services: List[str] = []
+        self._service_index: Dict[str, int] = {}
+        self._accounts: List[str] = []
+        self._account_index: Dict[str, int] = {}
+        self._provider_codes = array('B')
+        self._account_codes = array('H')
+        self._service_codes = array('I')
+        self._date_ordinals = array('i')
+        self._cost_units = array('q')
+        for record in records:
+            self.append_record(record)
+
+    @staticmethod
+    def _encode(value: str, values: List[str], index: Dict[str, int]) -> int:
+        code = index.get(value)
+        if code is None:
+            code = len(values)
+            value = sys.intern(value)
+            values.append(value)
+            index[value] = code
+        return code
+
+    @staticmethod
+    def to_cost_units(cost_usd: Decimal) -> int:
+        """Convert a USD amount to fixed-point integer units"""
+        return int(Decimal(cost_usd).quantize(_COST_QUANTUM, rounding=ROUND_HALF_EVEN).scaleb(COST_SCALE))
+
+    @staticmethod
+    def from_cost_units(units: int) -> Decimal:
+        """Convert fixed-point integer units back to a USD Decimal"""
+        return Decimal(units).scaleb(-COST_SCALE)
+
+    def append(
+        self,
+        cloud_provider: str,
+        service_name: str,
+        cost_usd: Decimal,
+        usage_date: date,
+        account_id: str = ''
+    ):
+        """Append a single row without creating a CostRecord"""
+        self._provider_codes.append(self._encode(cloud_provider, self._providers, self._provider_index))
+        self._account_codes.append(self._encode(account_id, self._accounts, self._account_index))
+        self._service_codes.append(self._encode(service_name, self._services, self._service_index))
+        self._date_ordinals.append(usage_date.toordinal())
+        self._cost_units.append(self.to_cost_units(cost_usd))
+
+    def append_record(self, record: CostRecord, account_id: Optional[str] = None):
+        """Append a CostRecord, optionally assigning it to account_id"""
+        self.append(
+            record.cloud_provider,
+            record.service_name,
+            record.cost_usd,
+            record.usage_date,
+            record.account_id if account_id is None else account_id
+        )
+
+    def extend(self, records: 'CostRecords', account_id: Optional[str] = None):
+        """
+        Append records from a list of CostRecords or another batch
+
+        Another batch is merged column-wise without materializing records.
+
+        Args:
+            records: Records to append
+            account_id: If given, assign every appended row to this account
+        """
+        if not isinstance(records, CostRecordBatch):
+            for record in records:
+                self.append_record(record, account_id)
+            return
+
+        provider_map = [self._encode(value, self._providers, self._provider_index) for value in records._providers]
+        service_map = [self._encode(value, self._services, self._service_index) for value in records._services]
+        self._provider_codes.extend(provider_map[code] for code in records._provider_codes)
+        if account_id is None:
+            account_map = [self._encode(value, self._accounts, self._account_index) for value in records._accounts]
+            self._account_codes.extend(account_map[code] for code in records._account_codes)
+        else:
+            account_code = self._encode(account_id, self._accounts, self._account_index)
+            self._account_codes.extend([account_code] * len(records))
+        self._service_codes.extend(service_map[code] for code in records._service_codes)
+        self._date_ordinals.extend(records._date_ordinals)
+        self._cost_units.extend(records._cost_units)
+
+    def extend_columns(
+        self,
+        cloud_provider: str,
+        service_names: Iterable[str],
+        cost_units: Iterable[int],
+        usage_dates: Iterable[date],
+        account_id: str = ''
+    ):
+        """
+        Append column-wise data for a single provider account
+
+        Args:
+            cloud_provider: Provider of every appended row
+            service_names: Service name per row
+            cost_units: Fixed-point cost per row (see to_cost_units)
+            usage_dates: Usage date per row
+            account_id: Account of every appended row
+        """
+        start = len(self._service_codes)
+        provider_code = self._encode(cloud_provider, self._providers, self._provider_index)
+        self._service_codes.extend(
+            self._encode(service_name, self._services, self._service_index) for service_name in service_names
+        )
+        self._cost_units.extend(cost_units)
+        self._date_ordinals.extend(usage_date.toordinal() for usage_date in usage_dates)
+        added = len(self._service_codes) - start
+        if not (len(self._cost_units) == len(self._date_ordinals) == start + added):
+            raise ValueError("extend_columns() requires columns of equal length")
+        self._provider_codes.extend([provider_code] * added)
+        self._account_codes.extend([self._encode(account_id, self._accounts, self._account_index)] * added)
+
+    def between(self, start_date: date, end_date: date) -> 'CostRecordBatch':
+        """
+        Rows whose usage date falls within a date range
+
+        Args:
+            start_date: Start date (inclusive)
+            end_date: End date (inclusive)
+
+        Returns:
+            This batch if every row is within the range, otherwise a new batch
+            with the rows that are
+        """
+        first, last = start_date.toordinal(), end_date.toordinal()
+        keep = [index for index, ordinal in enumerate(self._date_ordinals) if first <= ordinal <= last]
+        if len(keep) == len(self):
+            return self
+
+        clipped = CostRecordBatch()
+        clipped._providers, clipped._provider_index = list(self._providers), dict(self._provider_index)
+        clipped._accounts, clipped._account_index = list(self._accounts), dict(self._account_index)
+        clipped._services, clipped._service_index = list(self._services), dict(self._service_index)
+        for source, target in (
+            (self._provider_codes, clipped._provider_codes),
+            (self._account_codes, clipped._account_codes),
+            (self._service_codes, clipped._service_codes),
+            (self._date_ordinals, clipped._date_ordinals),
+            (self._cost_units, clipped._cost_units)
+        ):
+            target.extend(source[index] for index in keep)
+        return clipped
+
+    def __len__(self) -> int:
+        return len(self._cost_units)
+
+    def __iter__(self) -> Iterator[CostRecord]:
+        providers = self._providers
+        accounts = self._accounts
+        services = self._services
+        for provider_code, account_code, service_code, ordinal, units in zip(
+            self._provider_codes, self._account_codes, self._service_codes, self._date_ordinals, self._cost_units
+        ):
+            yield CostRecord(
+                cloud_provider=providers[provider_code],
+                service_name=services[service_code],
+                cost_usd=self.from_cost_units(units),
+                usage_date=date.fromordinal(ordinal),
+                account_id=accounts[account_code]
+            )
+
+    def total_cost(self) -> Decimal:
+        """Sum of all costs, computed on the integer column"""
+        return self.from_cost_units(sum(self._cost_units))
+
+    def service_names(self) -> set:
+        """Distinct service names present in the batch"""
+        return {self._services[code] for code in set(self._service_codes)}
+
+    def __repr__(self):
+        return f"<CostRecordBatch({len(self)} records, {len(self._services)} services)>"
+
+
+CostRecords = Union[List[CostRecord], CostRecordBatch]
+
+
+def total_cost_usd(records: CostRecords) -> Decimal:
+    """
+    Sum the cost of a list of records or a CostRecordBatch
+
+    Args:
+        records: Cost records
+
+    Returns:
+        Total cost in USD
+    """
+    if isinstance(records, CostRecordBatch):
+        return records.total_cost()
+    return sum((record.cost_usd for record in records), Decimal(0))
+
+
+def records_between(records: CostRecords, start_date: date, end_date: date) -> CostRecords:
+    """
+    Records of a list or CostRecordBatch whose usage date falls within a date range
+
+    Args:
+        records: Cost records
+        start_date: Start date (inclusive)
+        end_date: End date (inclusive)
+
+    Returns:
+        Records within the range, of the same type as records
+    """
+    if isinstance(records, CostRecordBatch):
+        return records.between(start_date, end_date)
+    return [record for record in records if start_date <= record.usage_date <= end_date]
+
+
+def unique_service_names(records: CostRecords) -> set:
+    """
+    Distinct service names of a list of records or a CostRecordBatch
+
+    Args:
+        records: Cost records
+
+    Returns:
+        Set of service names
+    """
+    if isinstance(records, CostRecordBatch):
+        return records.service_names()
+    return {record.service_name for record in records}
+
+
 class BaseCollector(ABC):
     """
     Abstract base class for cloud cost collectors
     """
 
-    def __init__(self, provider_name: str):
+    # Whether billing rows carry export timestamps, so changed dates can be
+    # found with find_changed_dates() instead of re-reading a date window
+    supports_export_watermark = False
+
+    # Shared collectors.response_cache.ResponseCache, assigned by the
+    # aggregator; None disables response caching
+    response_cache = None
+
+    # Latest date a window may end on to be read from or written to the
+    # response cache; later dates may still change. None bypasses the cache.
+    # Set by the aggregator for each run.
+    cache_through: Optional[date] = None
+
+    @classmethod
+    def finalized_through(cls, config: Any, today: date) -> date:
+        """
+        Latest usage date whose costs the provider will no longer change
+
+        Defaults to a fixed settling lag of config.settle_days; providers
+        with stricter finalization rules override this.
+
+        Args:
+            config: Provider (account) configuration
+            today: Current date
+
+        Returns:
+            Latest finalized usage date
+        """
+        return today - timedelta(days=config.settle_days)
+
+    def __init__(self, provider_name: str, account_id: str = ''):
         """
         Initialize collector
 
         Args:
             provider_name: Cloud provider name ('aws', 'gcp', 'azure')
+            account_id: Account this collector reads ('' for single-account setups);
+                        stamped on every record collect_costs() returns
         """
         self.provider_name = provider_name
-        self.logger = logging.getLogger(f"{__name__}.{provider_name}")
+        self.account_id = account_id
+        logger_name = f"{__name__}.{provider_name}"
+        if account_id:
+            logger_name = f"{logger_name}.{account_id}"
+        self.logger = logging.getLogger(logger_name)
 
-    @abstractmethod
     def collect_costs(
         self,
         start_date: date,
         end_date: date
-    ) -> List[CostRecord]:
+    ) -> CostRecords:
         """
         Collect costs for the specified date range
 
+        Materializes every batch from iter_cost_batches() into one
+        CostRecordBatch, assigning each row to this collector's account;
+        prefer iter_cost_batches() for large ranges.
+
+        Args:
+            start_date: Start date (inclusive)
+            end_date: End date (inclusive)
+
+        Returns:
+            CostRecordBatch with all collected records
+
+        Raises:
+            Exception: If collection fails
+        """
+        records = CostRecordBatch()
+        for batch in self.iter_cost_batches(start_date, end_date):
+            records.extend(batch, account_id=self.account_id)
+
+        self._log_collection_summary(start_date, end_date, records)
+        return records
+
+    async def collect_costs_async(
+        self,
+        start_date: date,
+        end_date: date,
+        http_session: Optional[Any] = None
+    ) -> CostRecords:
+        """
+        Collect costs for the specified date range from an asyncio event loop
+
+        The default runs the blocking collect_costs() on the loop's default
+        executor, which the async engine bounds. Collectors with a native
+        async HTTP path override this.
+
         Args:
             start_date: Start date (inclusive)
             end_date: End date (inclusive)
+            http_session: Shared aiohttp.ClientSession, if the engine has one
+
+        Returns:
+            Cost records (list of CostRecord or CostRecordBatch)
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.collect_costs, start_date, end_date)
+
+    def _window_cacheable(self, end_date: date) -> bool:
+        """Whether a window ending on end_date may be served from or stored in the response cache"""
+        return (
+            self.response_cache is not None
+            and self.cache_through is not None
+            and end_date <= self.cache_through
+        )
+
+    def _read_cached_window(self, start_date: date, end_date: date, query: Any) -> Optional[CostRecordBatch]:
+        """
+        Look up a window's records in the response cache
+
+        Args:
+            start_date: Window start date (inclusive)
+            end_date: Window end date (inclusive)
+            query: JSON-serializable description of the request fetching the window
+
+        Returns:
+            Cached records, or None if there is no usable entry
+        """
+        if not self._window_cacheable(end_date):
+            return None
+        records = self.response_cache.get(self.provider_name, self.account_id, start_date, end_date, query)
+        if records is not None:
+            self.logger.info(f"Using cached response for {start_date} to {end_date} ({len(records)} records)")
+        return records
+
+    def _write_cached_window(self, start_date: date, end_date: date, query: Any, records: CostRecords):
+        """Store a freshly fetched window's records in the response cache"""
+        if self._window_cacheable(end_date):
+            self.response_cache.put(self.provider_name, self.account_id, start_date, end_date, query, records)
+
+    def _cached_window(
+        self,
+        start_date: date,
+        end_date: date,
+        query: Any,
+        fetch: Callable[[], CostRecords]
+    ) -> CostRecords:
+        """
+        Return a window's records from the response cache, or fetch and cache them
+
+        Args:
+            start_date: Window start date (inclusive)
+            end_date: Window end date (inclusive)
+            query: JSON-serializable description of the request (part of the cache key)
+            fetch: Fetches the window from the provider on a miss
 
         Returns:
-            List of CostRecord objects
+            Cost records for the window
+        """
+        cached = self._read_cached_window(start_date, end_date, query)
+        if cached is not None:
+            return cached
+        records = fetch()
+        self._write_cached_window(start_date, end_date, query, records)
+        return records
+
+    def _iter_cached_window(
+        self,
+        start_date: date,
+        end_date: date,
+        query: Any,
+        fetch: Callable[[], Iterator[CostRecords]]
+    ) -> Iterator[CostRecords]:
+        """
+        Streaming counterpart of _cached_window()
+
+        Batches are yielded as they arrive; the window is cached once the
+        stream has been fully consumed.
+        """
+        if not self._window_cacheable(end_date):
+            yield from fetch()
+            return
+
+        cached = self._read_cached_window(start_date, end_date, query)
+        if cached is not None:
+            yield cached
+            return
+
+        window_records = CostRecordBatch()
+        for batch in fetch():
+            window_records.extend(batch)
+            yield batch
+        self._write_cached_window(start_date, end_date, query, window_records)
+
+    async def _cached_window_async(
+        self,
+        start_date: date,
+        end_date: date,
+        query: Any,
+        fetch: Callable[[], Awaitable[CostRecords]]
+    ) -> CostRecords:
+        """
+        Async counterpart of _cached_window(); cache I/O runs on the loop's executor
+        """
+        if not self._window_cacheable(end_date):
+            return await fetch()
+
+        loop = asyncio.get_running_loop()
+        cached = await loop.run_in_executor(None, self._read_cached_window, start_date, end_date, query)
+        if cached is not None:
+            return cached
+        records = await fetch()
+        await loop.run_in_executor(None, self._write_cached_window, start_date, end_date, query, records)
+        return records
+
+    @abstractmethod
+    def iter_cost_batches(
+        self,
+        start_date: date,
+        end_date: date
+    ) -> Iterator[CostRecords]:
+        """
+        Collect costs for the specified date range as a stream of batches
+
+        Batches are yielded as soon as they are fetched (e.g. per date window
+        or result page), so consumers can write them while later batches are
+        still being downloaded.
+
+        Args:
+            start_date: Start date (inclusive)
+            end_date: End date (inclusive)
+
+        Yields:
+            Lists of CostRecord objects or CostRecordBatch instances
 
         Raises:
             Exception: If collection fails
         """
         pass
 
+    def find_changed_dates(
+        self,
+        since: Optional[datetime],
+        start_date: date,
+        end_date: date
+    ) -> Tuple[List[date], Optional[datetime]]:
+        """
+        Find usage dates with billing rows exported after a watermark
+
+        Only available when supports_export_watermark is True.
+
+        Args:
+            since: Export timestamp watermark (exclusive), or None on the first
+                   run, in which case every date from start_date to end_date
+                   counts as changed
+            start_date: Start of the requested range (inclusive)
+            end_date: End of the requested range (inclusive)
+
+        Returns:
+            Tuple of (changed usage dates, latest export timestamp seen or None)
+        """
+        raise NotImplementedError(f"{self.provider_name} billing data has no export timestamps")
+
     @abstractmethod
     def test_connection(self) -> bool:
         """
@@ -105,7 +587,7 @@ class BaseCollector(ABC):
         self,
         start_date: date,
         end_date: date,
-        records: List[CostRecord]
+        records: CostRecords
     ):
         """
         Log summary of collected costs
@@ -113,10 +595,10 @@ class BaseCollector(ABC):
         Args:
             start_date: Start date
             end_date: End date
-            records: List of cost records
+            records: List of cost records or a CostRecordBatch
         """
-        total_cost = sum(record.cost_usd for record in records)
-        unique_services = len(set(record.service_name for record in records))
+        total_cost = total_cost_usd(records)
+        unique_services = len(unique_service_names(records))
 
         self.logger.info(
             f"{self.provider_name.upper()}: Collected {len(records)} records "
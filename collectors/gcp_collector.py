@@ -1,8 +1,8 @@
 """
 GCP BigQuery Billing Export collector
 """
-from datetime import date, timedelta
-from typing import List
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Iterator, List, Optional, Tuple
 from decimal import Decimal
 import os
 
@@ -10,8 +10,103 @@ from google.cloud import bigquery
 from google.oauth2 import service_account
 from google.api_core.exceptions import GoogleAPIError
 
-from collectors.base_collector import BaseCollector, CostRecord
+from collectors.base_collector import BaseCollector, CostRecordBatch, COST_SCALE
 from config import GCPConfig
+from utils.date_utils import get_date_list
+
+# Query BigQuery billing export for daily service-level costs
+# This query properly handles CUD costs, savings programs, and credits
+# Costs take a few hours to show up in BigQuery export, might take longer than 24 hours
+_COST_QUERY_TEMPLATE = """
+    WITH
+      spend_cud_fee_skus AS (
+      SELECT
+        *
+      FROM
+        UNNEST(['5515-81A8-03A2']) AS fee_sku_id ),
+      cost_data AS (
+      SELECT
+        *,
+      IF
+        (sku.id IN (
+          SELECT
+            *
+          FROM
+            spend_cud_fee_skus), cost, 0) AS `spend_cud_fee_cost`,
+        cost - IFNULL(cost_at_effective_price_default, cost) AS `spend_cud_savings`,
+        IFNULL(cost_at_effective_price_default, cost) - cost_at_list AS `negotiated_savings`,
+        IFNULL( (
+          SELECT
+            SUM(CAST(c.amount AS NUMERIC))
+          FROM
+            UNNEST(credits) c
+          WHERE
+            c.type IN ('FEE_UTILIZATION_OFFSET')), 0) AS `cud_credits`,
+        IFNULL( (
+          SELECT
+            SUM(CAST(c.amount AS NUMERIC))
+          FROM
+            UNNEST(credits) c
+          WHERE
+            c.type IN ('SUSTAINED_USAGE_DISCOUNT', 'DISCOUNT')), 0) AS `other_savings`
+      FROM
+        `{table}`
+      WHERE
+        _PARTITIONTIME >= @partition_start
+        AND cost_type != 'tax'
+        AND cost_type != 'adjustment'
+        -- Bounds are Pacific midnights, matching the usage_date grouping, so
+        -- a window never returns a partial sum for a day outside it
+        AND usage_start_time >= TIMESTAMP(@start_date, 'US/Pacific')
+        AND usage_start_time < TIMESTAMP(DATE_ADD(@end_date, INTERVAL 1 DAY), 'US/Pacific'))
+    SELECT
+      DATE(TIMESTAMP_TRUNC(usage_start_time, Day, 'US/Pacific')) AS usage_date,
+      service.description AS service_name,
+      SUM(CAST(cost AS NUMERIC)) + SUM(CAST(cud_credits AS NUMERIC)) + SUM(CAST(other_savings AS NUMERIC))
+        AS cost_usd
+    FROM
+      cost_data
+    GROUP BY
+      usage_date,
+      service_name
+    HAVING
+      ABS(cost_usd) > 0.01
+    ORDER BY
+      usage_date DESC,
+      cost_usd DESC
+"""
+
+
+# Usage dates within the requested range with rows exported after a
+# watermark. The export table is partitioned by export day, so only
+# partitions since the watermark are read.
+_CHANGED_DATES_QUERY_TEMPLATE = """
+    SELECT
+      DATE(TIMESTAMP_TRUNC(usage_start_time, Day, 'US/Pacific')) AS usage_date,
+      MAX(export_time) AS latest_export_time
+    FROM
+      `{table}`
+    WHERE
+      _PARTITIONTIME >= TIMESTAMP_TRUNC(@since, DAY)
+      AND export_time > @since
+      AND usage_start_time >= TIMESTAMP(@start_date, 'US/Pacific')
+      AND usage_start_time < TIMESTAMP(DATE_ADD(@end_date, INTERVAL 1 DAY), 'US/Pacific')
+      AND cost_type != 'tax'
+      AND cost_type != 'adjustment'
+    GROUP BY
+      usage_date
+"""
+
+# Latest export timestamp in partitions from @partition_start on, used to
+# seed the watermark on the first run
+_LATEST_EXPORT_QUERY_TEMPLATE = """
+    SELECT
+      MAX(export_time) AS latest_export_time
+    FROM
+      `{table}`
+    WHERE
+      _PARTITIONTIME >= @partition_start
+"""
 
 
 class GCPCollector(BaseCollector):
@@ -23,6 +118,8 @@ class GCPCollector(BaseCollector):
     2. BigQuery dataset with billing data
     """
 
+    supports_export_watermark = True
+
     def __init__(self, config: GCPConfig):
         """
         Initialize GCP collector
@@ -30,10 +127,13 @@ class GCPCollector(BaseCollector):
         Args:
             config: GCP configuration
         """
-        super().__init__('gcp')
+        super().__init__('gcp', config.account_id)
         self.config = config
         self.client = None
+        self.bqstorage_client = None
         self._initialize_client()
+        # SQL text is fixed per collector; date windows are bound as parameters
+        self._cost_query = _COST_QUERY_TEMPLATE.format(table=self._billing_export_table())
 
     def _initialize_client(self):
         """Initialize GCP BigQuery client"""
@@ -53,6 +153,40 @@ class GCPCollector(BaseCollector):
             self.logger.error(f"Failed to initialize GCP BigQuery client: {e}")
             raise
 
+        self.bqstorage_client = self._initialize_storage_client(credentials)
+
+    def _initialize_storage_client(self, credentials):
+        """
+        Initialize the optional BigQuery Storage Read API client
+
+        Requires google-cloud-bigquery-storage and pyarrow; without them (or
+        with GCP_USE_STORAGE_API=false) results are downloaded over REST.
+
+        Args:
+            credentials: Service account credentials shared with the BigQuery client
+
+        Returns:
+            BigQueryReadClient, or None if unavailable
+        """
+        if not self.config.use_storage_api:
+            return None
+        try:
+            from google.cloud import bigquery_storage
+            import pyarrow  # noqa: F401 - required by to_arrow_iterable
+        except ImportError:
+            self.logger.debug(
+                "BigQuery Storage API not available, using REST downloads. Install with: "
+                "pip install google-cloud-bigquery-storage pyarrow"
+            )
+            return None
+        try:
+            client = bigquery_storage.BigQueryReadClient(credentials=credentials)
+            self.logger.info("GCP BigQuery Storage Read client initialized")
+            return client
+        except Exception as e:
+            self.logger.warning(f"Failed to initialize BigQuery Storage client, using REST downloads: {e}")
+            return None
+
     def test_connection(self) -> bool:
         """
         Test GCP BigQuery connection
@@ -100,11 +234,168 @@ class GCPCollector(BaseCollector):
             )
             return False
 
-    def collect_costs(
+    def _billing_export_table(self) -> str:
+        """
+        Resolve the billing export table the cost query reads from
+
+        When the billing account is known its export table is referenced
+        directly; BigQuery never caches results of wildcard-table queries,
+        so this is what lets identical windows hit the result cache.
+
+        Returns:
+            Fully qualified table reference
+        """
+        dataset = f"{self.config.project_id}.{self.config.bigquery_dataset}"
+        if not self.config.billing_account_id:
+            return f"{dataset}.gcp_billing_export_v1_*"
+        # Export tables are named gcp_billing_export_v1_<ACCOUNT_ID with '-' replaced by '_'>
+        suffix = self.config.billing_account_id.replace('-', '_')
+        return f"{dataset}.gcp_billing_export_v1_{suffix}"
+
+    def _build_query_job_config(self, start_date: date, end_date: date) -> bigquery.QueryJobConfig:
+        """
+        Bind a date window to the cost query's parameters
+
+        Args:
+            start_date: Start date (inclusive)
+            end_date: End date (inclusive)
+
+        Returns:
+            QueryJobConfig with the usage dates and the partition lower bound as query parameters
+        """
+        # Usage days are US/Pacific, so the first row of the range is exported
+        # after this UTC midnight; the margin covers clock skew
+        start_time = datetime.combine(start_date, time.min, tzinfo=timezone.utc)
+        margin = timedelta(days=self.config.partition_margin_days)
+
+        return bigquery.QueryJobConfig(
+            query_parameters=[
+                bigquery.ScalarQueryParameter('start_date', 'DATE', start_date),
+                bigquery.ScalarQueryParameter('end_date', 'DATE', end_date),
+                bigquery.ScalarQueryParameter('partition_start', 'TIMESTAMP', start_time - margin),
+            ],
+            use_query_cache=True
+        )
+
+    def find_changed_dates(
         self,
+        since: Optional[datetime],
         start_date: date,
         end_date: date
-    ) -> List[CostRecord]:
+    ) -> Tuple[List[date], Optional[datetime]]:
+        """
+        Find usage dates within a range with billing rows exported after a watermark
+
+        Args:
+            since: export_time watermark (exclusive), or None on the first run
+            start_date: Start of the requested range (inclusive)
+            end_date: End of the requested range (inclusive)
+
+        Returns:
+            Tuple of (changed usage dates, latest export_time seen or None)
+        """
+        table = self._billing_export_table()
+
+        if since is None:
+            # First run: collect the requested range and remember how far the
+            # export had got, scanning only partitions from the range onwards
+            partition_start = datetime.combine(start_date, time.min, tzinfo=timezone.utc) - timedelta(
+                days=self.config.partition_margin_days
+            )
+            job_config = bigquery.QueryJobConfig(query_parameters=[
+                bigquery.ScalarQueryParameter('partition_start', 'TIMESTAMP', partition_start)
+            ])
+            query_job = self.client.query(_LATEST_EXPORT_QUERY_TEMPLATE.format(table=table), job_config=job_config)
+            rows = list(query_job.result())
+            self._log_query_cost(query_job)
+            latest = rows[0].latest_export_time if rows else None
+            return get_date_list(start_date, end_date), latest
+
+        job_config = bigquery.QueryJobConfig(query_parameters=[
+            bigquery.ScalarQueryParameter('since', 'TIMESTAMP', since),
+            bigquery.ScalarQueryParameter('start_date', 'DATE', start_date),
+            bigquery.ScalarQueryParameter('end_date', 'DATE', end_date)
+        ])
+        query_job = self.client.query(_CHANGED_DATES_QUERY_TEMPLATE.format(table=table), job_config=job_config)
+        rows = list(query_job.result())
+        self._log_query_cost(query_job)
+
+        changed_dates = [row.usage_date for row in rows]
+        latest = max((row.latest_export_time for row in rows), default=None)
+        self.logger.info(f"{len(changed_dates)} usage date(s) have billing rows exported after {since}")
+        return changed_dates, latest
+
+    def _iter_row_batches(self, results) -> Iterator[CostRecordBatch]:
+        """
+        Convert query results to cost records page by page over the REST API
+
+        Args:
+            results: RowIterator from a finished query job
+
+        Yields:
+            CostRecordBatch per result page
+        """
+        for page in results.pages:
+            records = CostRecordBatch()
+            for row in page:
+                records.append(
+                    cloud_provider='gcp',
+                    service_name=row.service_name or 'Unknown',
+                    cost_usd=self._normalize_cost(float(row.cost_usd)),
+                    usage_date=row.usage_date
+                )
+            yield records
+
+    def _iter_arrow_batches(self, results) -> Iterator[CostRecordBatch]:
+        """
+        Convert query results to cost records from Arrow record batches
+        streamed through the BigQuery Storage Read API
+
+        Null filling and conversion of costs to fixed-point units run
+        column-wise in Arrow; no per-row CostRecord objects are created.
+
+        Args:
+            results: RowIterator from a finished query job
+
+        Yields:
+            CostRecordBatch per Arrow record batch
+        """
+        import pyarrow as pa
+        import pyarrow.compute as pc
+
+        scale = float(10 ** COST_SCALE)
+        for batch in results.to_arrow_iterable(bqstorage_client=self.bqstorage_client):
+            costs = pc.cast(batch.column('cost_usd'), pa.float64())
+            cost_units = pc.cast(pc.round(pc.multiply(costs, scale)), pa.int64())
+
+            records = CostRecordBatch()
+            records.extend_columns(
+                cloud_provider='gcp',
+                service_names=pc.fill_null(batch.column('service_name'), 'Unknown').to_pylist(),
+                cost_units=cost_units.to_pylist(),
+                usage_dates=batch.column('usage_date').to_pylist()
+            )
+            yield records
+
+    def _log_query_cost(self, query_job):
+        """
+        Log bytes processed/billed for a finished query job
+
+        Args:
+            query_job: Completed BigQuery QueryJob
+        """
+        bytes_processed = query_job.total_bytes_processed or 0
+        bytes_billed = query_job.total_bytes_billed or 0
+        self.logger.info(
+            f"BigQuery scanned {bytes_processed / 1024 ** 2:.1f} MiB "
+            f"(billed {bytes_billed / 1024 ** 2:.1f} MiB, cache hit: {bool(query_job.cache_hit)})"
+        )
+
+    def iter_cost_batches(
+        self,
+        start_date: date,
+        end_date: date
+    ) -> Iterator[CostRecordBatch]:
         """
         Collect GCP costs for the specified date range from BigQuery
 
@@ -112,11 +403,41 @@ class GCPCollector(BaseCollector):
             start_date: Start date (inclusive)
             end_date: End date (inclusive)
 
-        Returns:
-            List of CostRecord objects
+        Yields:
+            CostRecordBatch per downloaded Arrow record batch or result page
+            (nothing if there is no export data)
         """
         self.logger.info(f"Collecting GCP costs from {start_date} to {end_date}")
 
+        # The SQL names the export table(s); the margin changes which
+        # partitions (and so which late rows) the query sees
+        cache_query = {'sql': self._cost_query, 'partition_margin_days': self.config.partition_margin_days}
+        yield from self._iter_cached_window(
+            start_date,
+            end_date,
+            cache_query,
+            lambda: self._iter_export_batches(start_date, end_date)
+        )
+
+    def _iter_export_batches(
+        self,
+        start_date: date,
+        end_date: date
+    ) -> Iterator[CostRecordBatch]:
+        """
+        Query the billing export for a date range and stream the results
+
+        Args:
+            start_date: Start date (inclusive)
+            end_date: End date (inclusive)
+
+        Yields:
+            CostRecordBatch per downloaded Arrow record batch or result page
+            (nothing if there is no export data)
+
+        Raises:
+            GoogleAPIError: If the dataset, export table or query is unavailable
+        """
         try:
             # First, verify the dataset exists
             dataset_id = f"{self.config.project_id}.{self.config.bigquery_dataset}"
@@ -179,96 +500,44 @@ class GCPCollector(BaseCollector):
                         "Make sure billing export is enabled and configured correctly. "
                         "See: https://cloud.google.com/billing/docs/how-to/export-data-bigquery"
                     )
-                    return []
-                else:
-                    # Re-raise if it's a different error
-                    raise
-
-            # Query BigQuery billing export for daily service-level costs
-            # This query properly handles CUD costs, savings programs, and credits
-            # Costs take a few hours to show up in BigQuery export, might take longer than 24 hours
-
-            # Format dates for the query (YYYY-MM-DD format with timezone)
-            start_datetime = f"{start_date.strftime('%Y-%m-%d')}T00:00:00Z"
-            # Add one day to end_date for exclusive upper bound
-            end_datetime = f"{(end_date + timedelta(days=1)).strftime('%Y-%m-%d')}T00:00:00Z"
+                # Fail the window so it is neither finalized nor watermarked
+                raise
 
-            query = f"""
-                WITH
-                  spend_cud_fee_skus AS (
-                  SELECT
-                    *
-                  FROM
-                    UNNEST(['5515-81A8-03A2']) AS fee_sku_id ),
-                  cost_data AS (
-                  SELECT
-                    *,
-                  IF
-                    (sku.id IN (
-                      SELECT
-                        *
-                      FROM
-                        spend_cud_fee_skus), cost, 0) AS `spend_cud_fee_cost`,
-                    cost - IFNULL(cost_at_effective_price_default, cost) AS `spend_cud_savings`,
-                    IFNULL(cost_at_effective_price_default, cost) - cost_at_list AS `negotiated_savings`,
-                    IFNULL( (
-                      SELECT
-                        SUM(CAST(c.amount AS NUMERIC))
-                      FROM
-                        UNNEST(credits) c
-                      WHERE
-                        c.type IN ('FEE_UTILIZATION_OFFSET')), 0) AS `cud_credits`,
-                    IFNULL( (
-                      SELECT
-                        SUM(CAST(c.amount AS NUMERIC))
-                      FROM
-                        UNNEST(credits) c
-                      WHERE
-                        c.type IN ('SUSTAINED_USAGE_DISCOUNT', 'DISCOUNT')), 0) AS `other_savings`
-                  FROM
-                    `{self.config.project_id}.{self.config.bigquery_dataset}.gcp_billing_export_v1_*`
-                  WHERE
-                    cost_type != 'tax'
-                    AND cost_type != 'adjustment'
-                    AND usage_start_time >= TIMESTAMP('{start_datetime}')
-                    AND usage_start_time < TIMESTAMP('{end_datetime}'))
-                SELECT
-                  DATE(TIMESTAMP_TRUNC(usage_start_time, Day, 'US/Pacific')) AS usage_date,
-                  service.description AS service_name,
-                  SUM(CAST(cost AS NUMERIC)) + SUM(CAST(cud_credits AS NUMERIC)) + SUM(CAST(other_savings AS NUMERIC))
-                    AS cost_usd
-                FROM
-                  cost_data
-                GROUP BY
-                  usage_date,
-                  service_name
-                HAVING
-                  ABS(cost_usd) > 0.01
-                ORDER BY
-                  usage_date DESC,
-                  cost_usd DESC
-            """
+            # The export tables are partitioned by export day. Rows for a usage
+            # day never land in earlier partitions, so a lower _PARTITIONTIME
+            # bound (with a margin for clock skew) prunes the history. There
+            # is no upper bound: late credits and corrections can arrive weeks
+            # after the usage day, and the partitions after the range are the
+            # recent (small) ones, so they are always scanned.
+            job_config = self._build_query_job_config(start_date, end_date)
 
-            self.logger.debug(f"Executing BigQuery query: {query}")
+            self.logger.debug(f"Executing BigQuery query for {start_date} to {end_date}: {self._cost_query}")
 
             # Execute query
-            query_job = self.client.query(query)
+            query_job = self.client.query(self._cost_query, job_config=job_config)
             results = query_job.result()
+            self._log_query_cost(query_job)
 
-            # Parse results
-            records = []
-            for row in results:
-                record = CostRecord(
-                    cloud_provider='gcp',
-                    service_name=row.service_name or 'Unknown',
-                    cost_usd=self._normalize_cost(float(row.cost_usd)),
-                    usage_date=row.usage_date
-                )
-                records.append(record)
-
-            self._log_collection_summary(start_date, end_date, records)
+            # Parse results, preferring the Storage Read API's Arrow batches
+            if self.bqstorage_client is not None:
+                yielded_batches = 0
+                try:
+                    for batch in self._iter_arrow_batches(results):
+                        yielded_batches += 1
+                        yield batch
+                    return
+                except Exception as storage_error:
+                    # Batches already handed out cannot be taken back, so only
+                    # fall back to REST if nothing has been yielded yet
+                    if yielded_batches:
+                        raise
+                    self.logger.warning(
+                        f"BigQuery Storage API download failed, falling back to REST: {storage_error}"
+                    )
+                    # A partially consumed iterator cannot be resumed; fetch a fresh one
+                    results = query_job.result()
 
-            return records
+            yield from self._iter_row_batches(results)
 
         except GoogleAPIError as e:
             error_msg = str(e)
@@ -295,7 +564,6 @@ class GCPCollector(BaseCollector):
                     "  2. Check that export is enabled and pointing to the correct BigQuery dataset\n"
                     "  3. Wait for billing data to appear (usually within 24-48 hours)"
                 )
-                return []
             elif "does not match any table" in error_msg or "not match any table" in error_msg:
                 self.logger.warning(
                     "GCP billing export tables not found matching pattern 'gcp_billing_export_v1_*'. "
@@ -327,8 +595,9 @@ class GCPCollector(BaseCollector):
                     "Make sure billing export is enabled and configured correctly. "
                     "See: https://cloud.google.com/billing/docs/how-to/export-data-bigquery"
                 )
-            # Return empty list instead of failing completely
-            return []
+            # Yielding nothing would look like a day without costs and let the
+            # window be finalized; fail it so the next run fetches it again
+            raise
         except Exception as e:
             self.logger.error(f"Failed to collect GCP costs: {e}")
             raise
@@ -0,0 +1,208 @@
+"""
+On-disk cache of collector API responses
+
+Each entry holds the cost records parsed from one provider account's query
+window, keyed by a hash of (provider, account, window, query), so reruns and
+retries of recently fetched windows skip the network (and Cost Explorer's
+per-request charge). Entries live in one SQLite file, expire after a TTL and
+are evicted least recently used once the cache grows past its size limit.
+"""
+from contextlib import contextmanager
+from datetime import date
+from typing import Any, Iterator, Optional
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import zlib
+
+from collectors.base_collector import CostRecordBatch, CostRecords
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'cloud_cost_aggregator', 'responses')
+
+_CREATE_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    provider TEXT NOT NULL,
+    account_id TEXT NOT NULL,
+    start_date TEXT NOT NULL,
+    end_date TEXT NOT NULL,
+    payload BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+)
+"""
+
+
+class ResponseCache:
+    """
+    SQLite-backed cache of parsed query windows, shared by all collectors
+
+    Cache errors are logged and treated as misses; they never fail a
+    collection. Empty windows are not cached, since several collectors
+    return nothing on soft failures (e.g. expired Sponsorship cookies).
+    """
+
+    def __init__(self, cache_dir: Optional[str], ttl_seconds: int, max_bytes: int):
+        """
+        Initialize response cache
+
+        Args:
+            cache_dir: Directory of the cache file (default: DEFAULT_CACHE_DIR)
+            ttl_seconds: Seconds an entry stays valid
+            max_bytes: Total payload size above which entries are evicted
+        """
+        cache_dir = os.path.expanduser(cache_dir or DEFAULT_CACHE_DIR)
+        self.path = os.path.join(cache_dir, 'responses.sqlite3')
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._write_lock = threading.Lock()
+
+        os.makedirs(cache_dir, mode=0o700, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute(_CREATE_TABLE_SQL)
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_responses_accessed_at ON responses(accessed_at)')
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Open a connection for one transaction; one per call keeps the cache usable from any thread"""
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def make_key(provider: str, account_id: str, start_date: date, end_date: date, query: Any) -> str:
+        """
+        Hash a window and the query that fetched it into a cache key
+
+        Args:
+            provider: Provider name
+            account_id: Account ('' for single-account setups)
+            start_date: Window start date (inclusive)
+            end_date: Window end date (inclusive)
+            query: JSON-serializable description of the request
+
+        Returns:
+            Hex digest identifying the entry
+        """
+        identity = json.dumps(
+            [provider, account_id, start_date.isoformat(), end_date.isoformat(), query],
+            sort_keys=True,
+            default=str
+        )
+        return hashlib.sha256(identity.encode('utf-8')).hexdigest()
+
+    def get(
+        self,
+        provider: str,
+        account_id: str,
+        start_date: date,
+        end_date: date,
+        query: Any
+    ) -> Optional[CostRecordBatch]:
+        """
+        Read a window's records if cached and not expired
+
+        Returns:
+            CostRecordBatch, or None on a miss, expiry or unreadable entry
+        """
+        key = self.make_key(provider, account_id, start_date, end_date, query)
+        now = time.time()
+        try:
+            with self._connect() as conn:
+                row = conn.execute(
+                    'SELECT payload FROM responses WHERE key = ? AND created_at > ?',
+                    (key, now - self.ttl_seconds)
+                ).fetchone()
+                if row is None:
+                    return None
+                conn.execute('UPDATE responses SET accessed_at = ? WHERE key = ?', (now, key))
+            return self._decode(provider, row[0])
+        except (sqlite3.Error, ValueError, zlib.error) as e:
+            logger.debug(f"Response cache read failed for {provider} {start_date}..{end_date}: {e}")
+            return None
+
+    def put(
+        self,
+        provider: str,
+        account_id: str,
+        start_date: date,
+        end_date: date,
+        query: Any,
+        records: CostRecords
+    ):
+        """Store a window's records, then drop expired and over-budget entries"""
+        if not records:
+            return
+
+        key = self.make_key(provider, account_id, start_date, end_date, query)
+        payload = self._encode(records)
+        now = time.time()
+        try:
+            with self._write_lock, self._connect() as conn:
+                conn.execute(
+                    'INSERT OR REPLACE INTO responses '
+                    '(key, provider, account_id, start_date, end_date, payload, size, created_at, accessed_at) '
+                    'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                    (key, provider, account_id, start_date.isoformat(), end_date.isoformat(),
+                     payload, len(payload), now, now)
+                )
+                conn.execute('DELETE FROM responses WHERE created_at <= ?', (now - self.ttl_seconds,))
+                self._evict(conn)
+        except sqlite3.Error as e:
+            logger.debug(f"Response cache write failed for {provider} {start_date}..{end_date}: {e}")
+
+    def _evict(self, conn: sqlite3.Connection):
+        """Delete least recently used entries until the cache fits max_bytes"""
+        total = conn.execute('SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        evicted = []
+        for key, size in conn.execute('SELECT key, size FROM responses ORDER BY accessed_at'):
+            if total <= self.max_bytes:
+                break
+            evicted.append((key,))
+            total -= size
+        conn.executemany('DELETE FROM responses WHERE key = ?', evicted)
+        logger.debug(f"Evicted {len(evicted)} response cache entr(ies)")
+
+    @staticmethod
+    def _encode(records: CostRecords) -> bytes:
+        """Serialize records as compressed JSON columns (service, day ordinal, cost units)"""
+        services = {}
+        rows = [
+            [
+                services.setdefault(record.service_name, len(services)),
+                record.usage_date.toordinal(),
+                CostRecordBatch.to_cost_units(record.cost_usd)
+            ]
+            for record in records
+        ]
+        document = {'services': list(services), 'rows': rows}
+        return zlib.compress(json.dumps(document, separators=(',', ':')).encode('utf-8'))
+
+    @staticmethod
+    def _decode(provider: str, payload: bytes) -> CostRecordBatch:
+        """Rebuild a CostRecordBatch from an encoded payload"""
+        document = json.loads(zlib.decompress(payload))
+        services = document['services']
+        rows = document['rows']
+        records = CostRecordBatch()
+        records.extend_columns(
+            provider,
+            (services[row[0]] for row in rows),
+            (row[2] for row in rows),
+            (date.fromordinal(row[1]) for row in rows)
+        )
+        return records
@@ -3,9 +3,12 @@ Configuration management for cloud cost aggregator
 Loads settings from environment variables
 """
 import os
-from dataclasses import dataclass
+import json
+import re
+from dataclasses import dataclass, fields, replace
+from functools import cached_property
+from typing import List, Optional
 from dotenv import load_dotenv
-from utils.aws_ssm import get_ssm_parameter
 
 # Load environment variables from .env file
 load_dotenv()
@@ -20,6 +23,9 @@ class DatabaseConfig:
     name: str
     user: str
     password: str
+    partition_months_ahead: int = 3  # Monthly cloud_costs partitions created ahead of today
+    partition_retention_months: int = 0  # Months of partitions kept attached (0 = keep all)
+    partition_archive_schema: str = ''  # Schema detached partitions are moved to ('' = leave in place)
 
     @property
     def url(self) -> str:
@@ -33,6 +39,12 @@ class AWSConfig:
     access_key_id: str
     secret_access_key: str
     region: str
+    window_days: int = 30  # Days per Cost Explorer request window
+    max_workers: int = 4  # Concurrent Cost Explorer requests
+    requests_per_second: float = 5.0  # Collection windows started per second (0 = unlimited)
+    settle_days: int = 3  # Days after which a usage date's costs are treated as final
+    invoice_close_days: int = 5  # Days into a month after which last month's invoice is closed
+    account_id: str = ''  # Stored in cloud_costs.account_id ('' for single-account setups)
 
 
 @dataclass
@@ -42,6 +54,13 @@ class GCPConfig:
     project_id: str
     credentials_path: str
     bigquery_dataset: str  # BigQuery dataset for billing export (e.g., "billing_export")
+    partition_margin_days: int = 5  # Export partitions scanned before the requested range
+    use_storage_api: bool = True  # Download results via BigQuery Storage API when installed
+    window_days: int = 30  # Days per BigQuery cost query
+    max_workers: int = 2  # Concurrent BigQuery cost queries
+    requests_per_second: float = 0.0  # Collection windows started per second (0 = unlimited)
+    settle_days: int = 3  # Days after which a usage date's costs are treated as final
+    account_id: str = ''  # Stored in cloud_costs.account_id ('' for single-account setups)
 
 
 @dataclass
@@ -52,6 +71,11 @@ class AzureConfig:
     client_secret: str
     subscription_id: str
     sponsorship_cookies: str  # Cookies for Azure Sponsorship portal
+    max_workers: int = 4  # Concurrent Azure API requests
+    query_window_days: int = 30  # Days per Cost Management query window
+    requests_per_second: float = 1.0  # Collection windows started per second (0 = unlimited)
+    settle_days: int = 3  # Days after which a usage date's costs are treated as final
+    account_id: str = ''  # Stored in cloud_costs.account_id ('' for single-account setups)
 
 
 @dataclass
@@ -60,19 +84,187 @@ class AppConfig:
     log_level: str
     lookback_days: int
     backfill_days: int
+    db_batch_size: int = 1000  # Records per upsert statement/commit
+    scheduler_workers: int = 8  # Shared pool size for (provider, window) collection tasks
+    async_http_connections: int = 32  # Connection pool of the async engine's HTTP session
+    response_cache_dir: str = ''  # Collector response cache location ('' = ~/.cache/cloud_cost_aggregator/responses)
+    response_cache_ttl_seconds: int = 21600  # Seconds a cached window stays valid (0 disables the cache)
+    response_cache_max_mb: int = 256  # Cache size above which least recently used windows are evicted
+    report_cache_size: int = 256  # Report results kept in the in-process LRU cache (0 disables it)
+    serve_host: str = '127.0.0.1'  # Interface the API server (main.py serve) listens on
+    serve_port: int = 8080  # Port the API server listens on
+    serve_refresh_seconds: int = 60  # Interval of the API server's data change checks (0 disables)
+    serve_snapshot_days: int = 400  # Days of history the API server keeps in memory (0 = all)
+    daemon_interval_minutes: int = 720  # Minutes between daemon runs, counted from midnight (max 1440)
+    daemon_offset_minutes: int = 120  # Shift of the daemon schedule from midnight (720/120 = 02:00 and 14:00)
+    daemon_jitter_seconds: int = 300  # Random delay added to each daemon run
+    daemon_run_on_start: bool = True  # Collect once when the daemon starts
+    daemon_serve: bool = True  # Run the HTTP read API (with /status) inside the daemon
 
 
 class Config:
     """
     Main configuration class
+
+    Each section is resolved on first access, so importing this module never
+    touches the network; the Azure section (which fetches secrets from AWS
+    SSM) is only loaded when something actually needs it.
     """
 
-    def __init__(self):
-        self.database = self._load_database_config()
-        self.aws = self._load_aws_config()
-        self.gcp = self._load_gcp_config()
-        self.azure = self._load_azure_config()
-        self.app = self._load_app_config()
+    @cached_property
+    def database(self) -> DatabaseConfig:
+        return self._load_database_config()
+
+    @cached_property
+    def aws(self) -> AWSConfig:
+        return self._load_aws_config()
+
+    @cached_property
+    def gcp(self) -> GCPConfig:
+        return self._load_gcp_config()
+
+    @cached_property
+    def azure(self) -> AzureConfig:
+        return self._load_azure_config()
+
+    @cached_property
+    def app(self) -> AppConfig:
+        return self._load_app_config()
+
+    @cached_property
+    def aws_accounts(self) -> List[AWSConfig]:
+        return self._load_accounts('aws')
+
+    @cached_property
+    def gcp_accounts(self) -> List[GCPConfig]:
+        return self._load_accounts('gcp')
+
+    @cached_property
+    def azure_accounts(self) -> List[AzureConfig]:
+        return self._load_accounts('azure')
+
+    def get_provider_config(self, provider: str):
+        """
+        Resolve the configuration section for a cloud provider
+
+        Args:
+            provider: Provider name ('aws', 'gcp', 'azure')
+
+        Returns:
+            Provider configuration dataclass
+        """
+        if provider not in ('aws', 'gcp', 'azure'):
+            raise ValueError(f"Unknown provider: {provider}")
+        return getattr(self, provider)
+
+    def get_provider_accounts(self, provider: str) -> list:
+        """
+        Resolve every configured account of a cloud provider
+
+        Args:
+            provider: Provider name ('aws', 'gcp', 'azure')
+
+        Returns:
+            List of provider configuration dataclasses, one per account
+        """
+        if provider not in ('aws', 'gcp', 'azure'):
+            raise ValueError(f"Unknown provider: {provider}")
+        return getattr(self, f'{provider}_accounts')
+
+    def _load_accounts(self, provider: str) -> list:
+        """
+        Load a provider's accounts from <PROVIDER>_ACCOUNTS
+
+        The variable holds a JSON list of objects, each overriding fields of
+        the provider's base configuration and naming its account_id, e.g.
+        AWS_ACCOUNTS='[{"account_id": "prod", "access_key_id": "...",
+        "secret_access_key": "..."}]'. Without it, the base configuration is
+        the only account. Values are converted to the field's type (numbers
+        and "true"/"false" may be given as strings).
+        """
+        base = self.get_provider_config(provider)
+        env_name = f'{provider.upper()}_ACCOUNTS'
+        raw = os.getenv(env_name, '').strip()
+        if not raw:
+            return [base]
+
+        try:
+            entries = json.loads(raw)
+        except ValueError as e:
+            raise ValueError(f"{env_name} is not valid JSON: {e}")
+        if not isinstance(entries, list) or not all(isinstance(entry, dict) for entry in entries):
+            raise ValueError(f"{env_name} must be a JSON list of objects")
+
+        field_types = {field.name: field.type for field in fields(base)}
+        accounts = []
+        seen = set()
+        for entry in entries:
+            account_id = entry.get('account_id')
+            if not account_id:
+                raise ValueError(f"Every {env_name} entry needs an account_id")
+            account_id = self._coerce_account_value(env_name, account_id, 'account_id', account_id, str)
+            if account_id in seen:
+                raise ValueError(f"Duplicate account_id in {env_name}: {account_id}")
+            unknown = set(entry) - set(field_types)
+            if unknown:
+                raise ValueError(f"Unknown {env_name} field(s) for {account_id}: {', '.join(sorted(unknown))}")
+            seen.add(account_id)
+            accounts.append(replace(base, **{
+                key: self._coerce_account_value(env_name, account_id, key, value, field_types[key])
+                for key, value in entry.items()
+            }))
+
+        logger.info(f"Loaded {len(accounts)} {provider.upper()} account(s) from {env_name}")
+        return accounts
+
+    @staticmethod
+    def _coerce_account_value(env_name: str, account_id: str, key: str, value, field_type):
+        """
+        Convert one <PROVIDER>_ACCOUNTS value to its configuration field's type
+
+        Args:
+            env_name: Variable the value came from, for error messages
+            account_id: Account the value belongs to, for error messages
+            key: Field name
+            value: Value parsed from JSON
+            field_type: Type of the configuration field (str, int, float or bool)
+
+        Returns:
+            Converted value
+
+        Raises:
+            ValueError: If the value cannot be converted
+        """
+        try:
+            if field_type is bool:
+                if isinstance(value, bool):
+                    return value
+                if isinstance(value, str) and value.lower() in ('true', 'false'):
+                    return value.lower() == 'true'
+            elif field_type is int:
+                if isinstance(value, int) and not isinstance(value, bool):
+                    return value
+                if isinstance(value, str):
+                    return int(value)
+            elif field_type is float:
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    return float(value)
+                if isinstance(value, str):
+                    return float(value)
+            elif field_type is str:
+                # Numeric IDs (e.g. AWS account numbers) are often written unquoted
+                if isinstance(value, str):
+                    return value
+                if isinstance(value, int) and not isinstance(value, bool):
+                    return str(value)
+            else:
+                return value
+        except ValueError:
+            pass
+        raise ValueError(
+            f"{env_name} field {key!r} for account {account_id!r} must be "
+            f"{'true/false' if field_type is bool else field_type.__name__}, got {value!r}"
+        )
 
     @staticmethod
     def _load_database_config() -> DatabaseConfig:
@@ -82,7 +274,10 @@ class Config:
             port=int(os.getenv('DB_PORT', '5432')),
             name=os.getenv('DB_NAME', 'cloud_costs'),
             user=os.getenv('DB_USER', 'postgres'),
-            password=os.getenv('DB_PASSWORD', '')
+            password=os.getenv('DB_PASSWORD', ''),
+            partition_months_ahead=int(os.getenv('DB_PARTITION_MONTHS_AHEAD', '3')),
+            partition_retention_months=int(os.getenv('DB_PARTITION_RETENTION_MONTHS', '0')),
+            partition_archive_schema=os.getenv('DB_PARTITION_ARCHIVE_SCHEMA', '')
         )
 
     @staticmethod
@@ -91,7 +286,13 @@ class Config:
         return AWSConfig(
             access_key_id=os.getenv('AWS_ACCESS_KEY_ID', ''),
             secret_access_key=os.getenv('AWS_SECRET_ACCESS_KEY', ''),
-            region=os.getenv('AWS_REGION', 'us-east-1')
+            region=os.getenv('AWS_REGION', 'us-east-1'),
+            window_days=int(os.getenv('AWS_CE_WINDOW_DAYS', '30')),
+            max_workers=int(os.getenv('AWS_CE_MAX_WORKERS', '4')),
+            requests_per_second=float(os.getenv('AWS_CE_REQUESTS_PER_SECOND', '5')),
+            settle_days=int(os.getenv('AWS_SETTLE_DAYS', '3')),
+            invoice_close_days=int(os.getenv('AWS_INVOICE_CLOSE_DAYS', '5')),
+            account_id=os.getenv('AWS_ACCOUNT_ID', '')
         )
 
     @staticmethod
@@ -101,12 +302,22 @@ class Config:
             billing_account_id=os.getenv('GCP_BILLING_ACCOUNT_ID', ''),
             project_id=os.getenv('GCP_PROJECT_ID', ''),
             credentials_path=os.getenv('GCP_CREDENTIALS_PATH', ''),
-            bigquery_dataset=os.getenv('GCP_BIGQUERY_DATASET', 'billing_export')
+            bigquery_dataset=os.getenv('GCP_BIGQUERY_DATASET', 'billing_export'),
+            partition_margin_days=int(os.getenv('GCP_PARTITION_MARGIN_DAYS', '5')),
+            use_storage_api=os.getenv('GCP_USE_STORAGE_API', 'true').lower() == 'true',
+            window_days=int(os.getenv('GCP_WINDOW_DAYS', '30')),
+            max_workers=int(os.getenv('GCP_MAX_WORKERS', '2')),
+            requests_per_second=float(os.getenv('GCP_REQUESTS_PER_SECOND', '0')),
+            settle_days=int(os.getenv('GCP_SETTLE_DAYS', '3')),
+            account_id=os.getenv('GCP_ACCOUNT_ID', '')
         )
 
     @staticmethod
     def _load_azure_config() -> AzureConfig:
         """Load Azure configuration from environment and AWS SSM"""
+        # Deferred so boto3 is only imported when the Azure section is needed
+        from utils.aws_ssm import get_ssm_parameter
+
         # Fetch sponsorship cookies from AWS Systems Manager
         sponsorship_cookies = ''
         logger.info("Fetching AZURE_SPONSORSHIP_COOKIES from AWS SSM Parameter Store")
@@ -122,7 +333,12 @@ class Config:
             client_id=os.getenv('AZURE_CLIENT_ID', ''),
             client_secret=os.getenv('AZURE_CLIENT_SECRET', ''),
             subscription_id=os.getenv('AZURE_SUBSCRIPTION_ID', ''),
-            sponsorship_cookies=sponsorship_cookies
+            sponsorship_cookies=sponsorship_cookies,
+            max_workers=int(os.getenv('AZURE_MAX_WORKERS', '4')),
+            query_window_days=int(os.getenv('AZURE_QUERY_WINDOW_DAYS', '30')),
+            requests_per_second=float(os.getenv('AZURE_REQUESTS_PER_SECOND', '1')),
+            settle_days=int(os.getenv('AZURE_SETTLE_DAYS', '3')),
+            account_id=os.getenv('AZURE_ACCOUNT_ID', '')
         )
 
     @staticmethod
@@ -131,44 +347,106 @@ class Config:
         return AppConfig(
             log_level=os.getenv('LOG_LEVEL', 'INFO'),
             lookback_days=int(os.getenv('LOOKBACK_DAYS', '2')),
-            backfill_days=int(os.getenv('BACKFILL_DAYS', '90'))
+            backfill_days=int(os.getenv('BACKFILL_DAYS', '90')),
+            db_batch_size=int(os.getenv('DB_BATCH_SIZE', '1000')),
+            scheduler_workers=int(os.getenv('SCHEDULER_WORKERS', '8')),
+            async_http_connections=int(os.getenv('ASYNC_HTTP_CONNECTIONS', '32')),
+            response_cache_dir=os.getenv('RESPONSE_CACHE_DIR', ''),
+            response_cache_ttl_seconds=int(os.getenv('RESPONSE_CACHE_TTL_SECONDS', '21600')),
+            response_cache_max_mb=int(os.getenv('RESPONSE_CACHE_MAX_MB', '256')),
+            report_cache_size=int(os.getenv('REPORT_CACHE_SIZE', '256')),
+            serve_host=os.getenv('SERVE_HOST', '127.0.0.1'),
+            serve_port=int(os.getenv('SERVE_PORT', '8080')),
+            serve_refresh_seconds=int(os.getenv('SERVE_REFRESH_SECONDS', '60')),
+            serve_snapshot_days=int(os.getenv('SERVE_SNAPSHOT_DAYS', '400')),
+            daemon_interval_minutes=int(os.getenv('DAEMON_INTERVAL_MINUTES', '720')),
+            daemon_offset_minutes=int(os.getenv('DAEMON_OFFSET_MINUTES', '120')),
+            daemon_jitter_seconds=int(os.getenv('DAEMON_JITTER_SECONDS', '300')),
+            daemon_run_on_start=os.getenv('DAEMON_RUN_ON_START', 'true').lower() == 'true',
+            daemon_serve=os.getenv('DAEMON_SERVE', 'true').lower() == 'true'
         )
 
-    def validate(self) -> list[str]:
+    def validate(self, providers: Optional[List[str]] = None) -> list[str]:
         """
         Validate configuration and return list of errors
 
+        Args:
+            providers: Providers whose sections should be validated.
+                      If None, validate all providers; pass [] to validate
+                      only the database section
+
         Returns:
             List of validation error messages (empty if valid)
         """
+        if providers is None:
+            providers = ['aws', 'gcp', 'azure']
+
         errors = []
 
         # Validate database config
         if not self.database.password:
             errors.append("DB_PASSWORD is required")
+        archive_schema = self.database.partition_archive_schema
+        if archive_schema and not re.fullmatch(r'[A-Za-z_][A-Za-z0-9_]*', archive_schema):
+            errors.append("DB_PARTITION_ARCHIVE_SCHEMA must be a plain SQL identifier")
+
+        # Validate every account of each requested provider (loading the
+        # Azure section fetches its secrets from SSM)
+        for provider in ('aws', 'gcp', 'azure'):
+            if provider not in providers:
+                continue
+            try:
+                accounts = self.get_provider_accounts(provider)
+            except ValueError as e:
+                errors.append(str(e))
+                continue
+            for account in accounts:
+                # Multi-account errors name the account they belong to
+                suffix = f" (account {account.account_id})" if len(accounts) > 1 else ''
+                errors.extend(f"{error}{suffix}" for error in getattr(self, f'_validate_{provider}')(account))
+
+        return errors
 
-        # Validate AWS config
-        if not self.aws.access_key_id or not self.aws.secret_access_key:
+    @staticmethod
+    def _validate_aws(aws: AWSConfig) -> list[str]:
+        """Validate one AWS account configuration"""
+        errors = []
+        if not aws.access_key_id or not aws.secret_access_key:
             errors.append("AWS credentials (AWS_ACCESS_KEY_ID, AWS_SECRET_ACCESS_KEY) are required")
+        return errors
 
-        # Validate GCP config
-        if not self.gcp.billing_account_id:
+    @staticmethod
+    def _validate_gcp(gcp: GCPConfig) -> list[str]:
+        """Validate one GCP account configuration"""
+        errors = []
+        if not gcp.billing_account_id:
             errors.append("GCP_BILLING_ACCOUNT_ID is required")
-        if not self.gcp.project_id:
+        if not gcp.project_id:
             errors.append("GCP_PROJECT_ID is required")
-        if not self.gcp.credentials_path:
+        if not gcp.credentials_path:
             errors.append("GCP_CREDENTIALS_PATH is required")
+        return errors
+
+    @staticmethod
+    def _validate_azure(azure: AzureConfig) -> list[str]:
+        """
+        Validate one Azure account configuration
+
+        Returns:
+            List of validation error messages (empty if valid)
+        """
+        errors = []
 
         # Validate Azure config
         # For paid accounts: need service principal credentials
         # For sponsorship accounts: need cookies
         has_service_principal = (
-            self.azure.tenant_id and 
-            self.azure.client_id and 
-            self.azure.client_secret and 
-            self.azure.subscription_id
+            azure.tenant_id and 
+            azure.client_id and 
+            azure.client_secret and 
+            azure.subscription_id
         )
-        has_cookies = bool(self.azure.sponsorship_cookies)
+        has_cookies = bool(azure.sponsorship_cookies)
         
         if not has_service_principal and not has_cookies:
             errors.append(
@@ -179,17 +457,17 @@ class Config:
             )
         elif has_service_principal:
             # Validate all service principal fields are present
-            if not self.azure.tenant_id:
+            if not azure.tenant_id:
                 errors.append("AZURE_TENANT_ID is required for paid accounts")
-            if not self.azure.client_id:
+            if not azure.client_id:
                 errors.append("AZURE_CLIENT_ID is required for paid accounts")
-            if not self.azure.client_secret:
+            if not azure.client_secret:
                 errors.append("AZURE_CLIENT_SECRET is required for paid accounts")
-            if not self.azure.subscription_id:
+            if not azure.subscription_id:
                 errors.append("AZURE_SUBSCRIPTION_ID is required")
         elif has_cookies:
             # For sponsorship, subscription_id is still needed
-            if not self.azure.subscription_id:
+            if not azure.subscription_id:
                 errors.append("AZURE_SUBSCRIPTION_ID is required for sponsorship accounts")
 
         return errors
@@ -0,0 +1,166 @@
+"""
+Long-running collection daemon
+
+Keeps one CostAggregator (collectors with their SDK clients and
+credentials), the database pool and the response cache alive between runs,
+so a scheduled run only pays for the provider API calls. Runs follow a
+cron-like schedule: every interval_minutes counted from local midnight plus
+offset_minutes (e.g. 720 and 120 for 02:00 and 14:00), each delayed by a
+random jitter so deployments sharing credentials do not hit the provider
+APIs at the same moment.
+"""
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Optional
+import logging
+import random
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+def next_slot(after: datetime, interval_minutes: int, offset_minutes: int = 0) -> datetime:
+    """
+    First scheduled time strictly after a moment
+
+    Slots restart at every midnight, like cron's */n: with a 420 minute
+    interval they fall at 00:00, 07:00, 14:00 and 21:00 each day.
+
+    Args:
+        after: Moment to look after
+        interval_minutes: Minutes between slots
+        offset_minutes: Shift of all slots from midnight
+
+    Returns:
+        Next slot time
+
+    Examples:
+        >>> next_slot(datetime(2025, 1, 1, 3, 0), 720, 120)
+        datetime(2025, 1, 1, 14, 0)
+    """
+    interval = timedelta(minutes=max(1, interval_minutes))
+    offset = timedelta(minutes=offset_minutes % max(1, interval_minutes))
+    midnight = after.replace(hour=0, minute=0, second=0, microsecond=0)
+    for day in (midnight, midnight + timedelta(days=1)):
+        slot = day + offset
+        while slot < day + timedelta(days=1):
+            if slot > after:
+                return slot
+            slot += interval
+    return midnight + timedelta(days=2) + offset
+
+
+class CollectionDaemon:
+    """
+    Runs a collection callable on schedule until stopped, tracking run status
+    """
+
+    def __init__(
+        self,
+        run_collection: Callable[[], Dict[str, Any]],
+        interval_minutes: int = 720,
+        offset_minutes: int = 0,
+        jitter_seconds: int = 300,
+        run_on_start: bool = True
+    ):
+        """
+        Initialize the daemon
+
+        Args:
+            run_collection: Performs one collection run and returns its statistics
+            interval_minutes: Minutes between scheduled runs (at most 1440)
+            offset_minutes: Shift of the schedule from midnight
+            jitter_seconds: Upper bound of the random delay added to each run
+            run_on_start: Run once immediately instead of waiting for the first slot
+        """
+        self.run_collection = run_collection
+        # Slots restart at midnight, so runs are at least daily
+        self.interval_minutes = min(max(1, interval_minutes), 1440)
+        self.offset_minutes = offset_minutes
+        self.jitter_seconds = max(0, jitter_seconds)
+        self.run_on_start = run_on_start
+        self._stopped = threading.Event()
+        self._status_lock = threading.Lock()
+        self._status: Dict[str, Any] = {
+            'state': 'starting',
+            'started_at': datetime.now().isoformat(),
+            'runs': 0,
+            'failed_runs': 0,
+            'consecutive_failures': 0,
+            'next_run_at': None,
+            'last_run': None
+        }
+
+    def status(self) -> Dict[str, Any]:
+        """Snapshot of the daemon state and the last run's outcome"""
+        with self._status_lock:
+            return dict(self._status)
+
+    def _update_status(self, **changes):
+        with self._status_lock:
+            self._status.update(changes)
+
+    def stop(self):
+        """Stop after the current run (or immediately while waiting); safe from signal handlers"""
+        self._stopped.set()
+
+    def run_forever(self):
+        """Run collections on schedule until stop() is called"""
+        logger.info(
+            f"Collection daemon started: every {self.interval_minutes} minute(s) from midnight "
+            f"+{self.offset_minutes % self.interval_minutes} minute(s), jitter up to {self.jitter_seconds}s"
+        )
+        slot: Optional[datetime] = None if self.run_on_start else next_slot(
+            datetime.now(), self.interval_minutes, self.offset_minutes
+        )
+
+        while not self._stopped.is_set():
+            if slot is not None:
+                run_at = slot + timedelta(seconds=random.uniform(0, self.jitter_seconds))
+                self._update_status(state='idle', next_run_at=run_at.isoformat())
+                logger.info(f"Next collection run at {run_at:%Y-%m-%d %H:%M:%S}")
+                if self._stopped.wait(max(0.0, (run_at - datetime.now()).total_seconds())):
+                    break
+
+            self._run_once()
+
+            now = datetime.now()
+            scheduled = next_slot(slot or now, self.interval_minutes, self.offset_minutes)
+            slot = next_slot(now, self.interval_minutes, self.offset_minutes)
+            if scheduled < slot:
+                # No overlapping runs: slots that passed during a long run are dropped
+                logger.warning(f"Collection run overran its schedule; skipped slot(s) from {scheduled:%H:%M}")
+
+        self._update_status(state='stopped', next_run_at=None)
+        logger.info("Collection daemon stopped")
+
+    def _run_once(self):
+        """Run one collection and record its outcome; failures never stop the daemon"""
+        started_at = datetime.now()
+        began = time.perf_counter()
+        self._update_status(state='running', next_run_at=None)
+
+        try:
+            stats = self.run_collection()
+            error = None
+        except Exception as e:
+            logger.error(f"Collection run failed: {e}", exc_info=True)
+            stats = None
+            error = str(e)
+
+        duration = time.perf_counter() - began
+        with self._status_lock:
+            self._status['runs'] += 1
+            if error is None:
+                self._status['consecutive_failures'] = 0
+            else:
+                self._status['failed_runs'] += 1
+                self._status['consecutive_failures'] += 1
+            self._status['last_run'] = {
+                'started_at': started_at.isoformat(),
+                'duration_seconds': round(duration, 3),
+                'succeeded': error is None,
+                'error': error,
+                'stats': stats
+            }
+        logger.info(f"Collection run {'completed' if error is None else 'failed'} in {duration:.1f}s")
@@ -0,0 +1,17 @@
+-- Add the account_id dimension to an existing cloud_costs table
+--
+-- Existing rows keep account_id = '', which is what single-account setups
+-- (no <PROVIDER>_ACCOUNTS / <PROVIDER>_ACCOUNT_ID) continue to write.
+--
+-- Usage: psql -d cloud_costs -f database/migrations/001_add_account_id.sql
+
+BEGIN;
+
+ALTER TABLE cloud_costs
+    ADD COLUMN IF NOT EXISTS account_id VARCHAR(100) NOT NULL DEFAULT '';
+
+ALTER TABLE cloud_costs DROP CONSTRAINT IF EXISTS unique_cost_record;
+ALTER TABLE cloud_costs
+    ADD CONSTRAINT unique_cost_record UNIQUE (cloud_provider, account_id, service_name, usage_date);
+
+COMMIT;
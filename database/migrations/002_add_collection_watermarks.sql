@@ -0,0 +1,18 @@
+-- Add the collection_watermarks table to an existing database
+--
+-- Running --init-db creates it as well; existing cloud_costs rows are left
+-- untouched. Until an account has watermarks, runs collect its full
+-- lookback window.
+--
+-- Usage: psql -d cloud_costs -f database/migrations/002_add_collection_watermarks.sql
+
+CREATE TABLE IF NOT EXISTS collection_watermarks (
+    cloud_provider VARCHAR(10) NOT NULL,
+    account_id VARCHAR(100) NOT NULL DEFAULT '',
+    last_collected_date DATE,
+    last_finalized_date DATE,
+    last_export_time TIMESTAMP WITH TIME ZONE,
+    updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+
+    PRIMARY KEY (cloud_provider, account_id)
+);
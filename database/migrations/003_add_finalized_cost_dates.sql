@@ -0,0 +1,15 @@
+-- Add the finalized_cost_dates table to an existing database
+--
+-- Running --init-db creates it as well. Dates are marked finalized as runs
+-- collect them, so existing data is re-fetched once before being skipped.
+--
+-- Usage: psql -d cloud_costs -f database/migrations/003_add_finalized_cost_dates.sql
+
+CREATE TABLE IF NOT EXISTS finalized_cost_dates (
+    cloud_provider VARCHAR(10) NOT NULL,
+    account_id VARCHAR(100) NOT NULL DEFAULT '',
+    usage_date DATE NOT NULL,
+    finalized_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+
+    PRIMARY KEY (cloud_provider, account_id, usage_date)
+);
@@ -0,0 +1,102 @@
+-- Convert an existing cloud_costs table into a table range-partitioned by
+-- month of usage_date
+--
+-- The data is copied into monthly partitions (cloud_costs_YYYY_MM) in one
+-- transaction, so the table is locked for the duration of the copy. Run
+-- after 001_add_account_id.sql.
+--
+-- Usage: psql -d cloud_costs -f database/migrations/004_partition_cloud_costs.sql
+
+BEGIN;
+
+-- Views and the old table's dependent objects are recreated below
+DROP VIEW IF EXISTS daily_cost_summary;
+DROP VIEW IF EXISTS service_cost_summary;
+DROP TRIGGER IF EXISTS update_cloud_costs_updated_at ON cloud_costs;
+DROP INDEX IF EXISTS idx_cloud_costs_usage_date;
+DROP INDEX IF EXISTS idx_cloud_costs_provider;
+DROP INDEX IF EXISTS idx_cloud_costs_service;
+DROP INDEX IF EXISTS idx_cloud_costs_provider_date;
+
+ALTER TABLE cloud_costs RENAME TO cloud_costs_unpartitioned;
+ALTER TABLE cloud_costs_unpartitioned RENAME CONSTRAINT unique_cost_record TO unique_cost_record_unpartitioned;
+ALTER SEQUENCE cloud_costs_id_seq RENAME TO cloud_costs_unpartitioned_id_seq;
+
+CREATE TABLE cloud_costs (
+    id SERIAL,
+    cloud_provider VARCHAR(10) NOT NULL CHECK (cloud_provider IN ('aws', 'gcp', 'azure')),
+    account_id VARCHAR(100) NOT NULL DEFAULT '',
+    service_name VARCHAR(255) NOT NULL,
+    cost_usd NUMERIC(15, 4) NOT NULL DEFAULT 0.0,
+    usage_date DATE NOT NULL,
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+
+    PRIMARY KEY (id, usage_date),
+    CONSTRAINT unique_cost_record UNIQUE (cloud_provider, account_id, service_name, usage_date)
+) PARTITION BY RANGE (usage_date);
+
+-- One partition per month from the oldest row through three months ahead
+DO $$
+DECLARE
+    month_start DATE;
+BEGIN
+    FOR month_start IN
+        SELECT generate_series(
+            date_trunc('month', LEAST(MIN(usage_date), CURRENT_DATE)),
+            date_trunc('month', GREATEST(MAX(usage_date), CURRENT_DATE)) + INTERVAL '3 months',
+            INTERVAL '1 month'
+        )::date
+        FROM cloud_costs_unpartitioned
+    LOOP
+        EXECUTE format(
+            'CREATE TABLE IF NOT EXISTS %I PARTITION OF cloud_costs FOR VALUES FROM (%L) TO (%L)',
+            'cloud_costs_' || to_char(month_start, 'YYYY_MM'),
+            month_start,
+            (month_start + INTERVAL '1 month')::date
+        );
+    END LOOP;
+END $$;
+
+INSERT INTO cloud_costs (id, cloud_provider, account_id, service_name, cost_usd, usage_date, created_at, updated_at)
+SELECT id, cloud_provider, account_id, service_name, cost_usd, usage_date, created_at, updated_at
+FROM cloud_costs_unpartitioned;
+
+SELECT setval('cloud_costs_id_seq', COALESCE((SELECT MAX(id) FROM cloud_costs), 0) + 1, false);
+
+DROP TABLE cloud_costs_unpartitioned;
+
+CREATE INDEX idx_cloud_costs_usage_date ON cloud_costs(usage_date);
+CREATE INDEX idx_cloud_costs_provider ON cloud_costs(cloud_provider);
+CREATE INDEX idx_cloud_costs_service ON cloud_costs(service_name);
+CREATE INDEX idx_cloud_costs_provider_date ON cloud_costs(cloud_provider, usage_date);
+
+CREATE TRIGGER update_cloud_costs_updated_at
+    BEFORE UPDATE ON cloud_costs
+    FOR EACH ROW
+    EXECUTE FUNCTION update_updated_at_column();
+
+CREATE OR REPLACE VIEW daily_cost_summary AS
+SELECT
+    usage_date,
+    cloud_provider,
+    SUM(cost_usd) as total_cost_usd,
+    COUNT(DISTINCT service_name) as service_count
+FROM cloud_costs
+GROUP BY usage_date, cloud_provider
+ORDER BY usage_date DESC, cloud_provider;
+
+CREATE OR REPLACE VIEW service_cost_summary AS
+SELECT
+    cloud_provider,
+    service_name,
+    SUM(cost_usd) as total_cost_usd,
+    COUNT(*) as day_count,
+    AVG(cost_usd) as avg_daily_cost_usd,
+    MIN(usage_date) as first_date,
+    MAX(usage_date) as last_date
+FROM cloud_costs
+GROUP BY cloud_provider, service_name
+ORDER BY total_cost_usd DESC;
+
+COMMIT;
@@ -0,0 +1,27 @@
+-- Add the cost rollup tables to an existing database
+--
+-- Running --init-db creates them as well. Writes only add the changes they
+-- make, so fill the tables from existing data once afterwards:
+--
+--   python main.py --rebuild-rollups
+--
+-- Usage: psql -d cloud_costs -f database/migrations/005_add_cost_rollups.sql
+
+CREATE TABLE IF NOT EXISTS cost_rollup_daily_provider (
+    usage_date DATE NOT NULL,
+    cloud_provider VARCHAR(10) NOT NULL,
+    total_cost_usd NUMERIC(18, 4) NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+
+    PRIMARY KEY (usage_date, cloud_provider)
+);
+
+CREATE TABLE IF NOT EXISTS cost_rollup_monthly_service (
+    usage_month DATE NOT NULL,
+    cloud_provider VARCHAR(10) NOT NULL,
+    service_name VARCHAR(255) NOT NULL,
+    total_cost_usd NUMERIC(18, 4) NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+
+    PRIMARY KEY (usage_month, cloud_provider, service_name)
+);
@@ -0,0 +1,12 @@
+-- Add the report indexes to an existing database
+--
+-- Running --init-db creates them as well. On a partitioned cloud_costs the
+-- index is built on every partition; expect writes to block while it runs.
+--
+-- Usage: psql -d cloud_costs -f database/migrations/006_add_report_indexes.sql
+
+CREATE INDEX IF NOT EXISTS idx_cloud_costs_report
+    ON cloud_costs(usage_date, cloud_provider, service_name) INCLUDE (cost_usd);
+
+CREATE INDEX IF NOT EXISTS idx_cloud_costs_updated_at
+    ON cloud_costs(updated_at);
@@ -3,7 +3,7 @@ SQLAlchemy ORM models for cloud cost data
 """
 from datetime import datetime
 from decimal import Decimal
-from sqlalchemy import Column, Integer, String, Numeric, Date, DateTime, CheckConstraint, UniqueConstraint
+from sqlalchemy import Column, Integer, String, Numeric, Date, DateTime, CheckConstraint, Index, UniqueConstraint
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.sql import func
 
@@ -13,14 +13,18 @@ Base = declarative_base()
 class CloudCost(Base):
     """
     Model for storing cloud cost data from AWS, GCP, and Azure
+
+    The table is range-partitioned by usage_date, one partition per month
+    (see database.partitions), so the primary key includes usage_date.
     """
     __tablename__ = 'cloud_costs'
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     cloud_provider = Column(String(10), nullable=False)
+    account_id = Column(String(100), nullable=False, default='', server_default='')
     service_name = Column(String(255), nullable=False)
     cost_usd = Column(Numeric(15, 4), nullable=False, default=0.0)
-    usage_date = Column(Date, nullable=False)
+    usage_date = Column(Date, primary_key=True, nullable=False)
     created_at = Column(DateTime, nullable=False, default=datetime.utcnow, server_default=func.now())
     updated_at = Column(DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow, server_default=func.now())
 
@@ -31,14 +35,24 @@ class CloudCost(Base):
             name='check_cloud_provider'
         ),
         UniqueConstraint(
-            'cloud_provider', 'service_name', 'usage_date',
+            'cloud_provider', 'account_id', 'service_name', 'usage_date',
             name='unique_cost_record'
         ),
+        # Covering index for range reports: index-only scans for totals by
+        # provider and service (see reports)
+        Index(
+            'idx_cloud_costs_report',
+            'usage_date', 'cloud_provider', 'service_name',
+            postgresql_include=['cost_usd']
+        ),
+        # Keeps the report cache's MAX(updated_at) watermark a single index lookup
+        Index('idx_cloud_costs_updated_at', 'updated_at'),
+        {'postgresql_partition_by': 'RANGE (usage_date)'},
     )
 
     def __repr__(self):
         return (
-            f"<CloudCost(id={self.id}, provider={self.cloud_provider}, "
+            f"<CloudCost(id={self.id}, provider={self.cloud_provider}, account={self.account_id}, "
             f"service={self.service_name}, cost=${self.cost_usd}, date={self.usage_date})>"
         )
 
@@ -47,9 +61,93 @@ class CloudCost(Base):
         return {
             'id': self.id,
             'cloud_provider': self.cloud_provider,
+            'account_id': self.account_id,
             'service_name': self.service_name,
             'cost_usd': float(self.cost_usd) if self.cost_usd else 0.0,
             'usage_date': self.usage_date.isoformat() if self.usage_date else None,
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None,
         }
+
+
+class CollectionWatermark(Base):
+    """
+    Per provider account progress of cost collection
+
+    Lets daily runs fetch only what may have changed: dates after
+    last_finalized_date and, for providers with export timestamps (GCP),
+    rows exported after last_export_time.
+    """
+    __tablename__ = 'collection_watermarks'
+
+    cloud_provider = Column(String(10), primary_key=True)
+    account_id = Column(String(100), primary_key=True, default='', server_default='')
+    last_collected_date = Column(Date, nullable=True)
+    last_finalized_date = Column(Date, nullable=True)
+    last_export_time = Column(DateTime(timezone=True), nullable=True)
+    updated_at = Column(DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow, server_default=func.now())
+
+    def __repr__(self):
+        return (
+            f"<CollectionWatermark(provider={self.cloud_provider}, account={self.account_id}, "
+            f"finalized={self.last_finalized_date}, export_time={self.last_export_time})>"
+        )
+
+
+class FinalizedCostDate(Base):
+    """
+    Usage dates whose billing a provider has closed for an account
+
+    Costs for these dates are not re-fetched unless a restatement is forced.
+    """
+    __tablename__ = 'finalized_cost_dates'
+
+    cloud_provider = Column(String(10), primary_key=True)
+    account_id = Column(String(100), primary_key=True, default='', server_default='')
+    usage_date = Column(Date, primary_key=True)
+    finalized_at = Column(DateTime, nullable=False, default=datetime.utcnow, server_default=func.now())
+
+    def __repr__(self):
+        return (
+            f"<FinalizedCostDate(provider={self.cloud_provider}, account={self.account_id}, "
+            f"date={self.usage_date})>"
+        )
+
+
+class DailyProviderCost(Base):
+    """
+    Rollup of cloud_costs: total cost per provider per usage day
+
+    Maintained incrementally by the aggregator's writes (see
+    database.rollups); rebuild with --rebuild-rollups.
+    """
+    __tablename__ = 'cost_rollup_daily_provider'
+
+    usage_date = Column(Date, primary_key=True)
+    cloud_provider = Column(String(10), primary_key=True)
+    total_cost_usd = Column(Numeric(18, 4), nullable=False, default=0, server_default='0')
+    updated_at = Column(DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow, server_default=func.now())
+
+    def __repr__(self):
+        return f"<DailyProviderCost(date={self.usage_date}, provider={self.cloud_provider}, total=${self.total_cost_usd})>"
+
+
+class MonthlyServiceCost(Base):
+    """
+    Rollup of cloud_costs: total cost per provider service per usage month
+
+    usage_month is the first day of the month.
+    """
+    __tablename__ = 'cost_rollup_monthly_service'
+
+    usage_month = Column(Date, primary_key=True)
+    cloud_provider = Column(String(10), primary_key=True)
+    service_name = Column(String(255), primary_key=True)
+    total_cost_usd = Column(Numeric(18, 4), nullable=False, default=0, server_default='0')
+    updated_at = Column(DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow, server_default=func.now())
+
+    def __repr__(self):
+        return (
+            f"<MonthlyServiceCost(month={self.usage_month:%Y-%m}, provider={self.cloud_provider}, "
+            f"service={self.service_name}, total=${self.total_cost_usd})>"
+        )
@@ -0,0 +1,196 @@
+"""
+Monthly range partitions of the cloud_costs table
+
+cloud_costs is partitioned by usage_date, one partition per month named
+cloud_costs_YYYY_MM. Queries for a month only touch that month's partition,
+and retiring old data is a DETACH instead of a large DELETE.
+"""
+from datetime import date
+from typing import List, Optional, Tuple
+import logging
+import re
+
+from sqlalchemy import text
+
+from database.connection import DatabaseManager
+from database.rollups import CostRollups
+from utils.date_utils import add_months, month_start
+
+logger = logging.getLogger(__name__)
+
+PARENT_TABLE = 'cloud_costs'
+_PARTITION_NAME_PATTERN = re.compile(rf'^{PARENT_TABLE}_(\d{{4}})_(\d{{2}})$')
+
+_IS_PARTITIONED_SQL = text("""
+    SELECT 1
+    FROM pg_partitioned_table pt
+    JOIN pg_class c ON c.oid = pt.partrelid
+    WHERE c.relname = :table AND pg_table_is_visible(c.oid)
+""")
+
+_LIST_PARTITIONS_SQL = text("""
+    SELECT child.relname
+    FROM pg_inherits i
+    JOIN pg_class parent ON parent.oid = i.inhparent
+    JOIN pg_class child ON child.oid = i.inhrelid
+    WHERE parent.relname = :table AND pg_table_is_visible(parent.oid)
+""")
+
+
+class PartitionManager:
+    """
+    Creates upcoming monthly partitions and detaches expired ones
+    """
+
+    def __init__(
+        self,
+        db_manager: DatabaseManager,
+        months_ahead: int = 3,
+        retention_months: int = 0,
+        archive_schema: str = ''
+    ):
+        """
+        Initialize partition manager
+
+        Args:
+            db_manager: Database manager instance
+            months_ahead: Partitions kept ready after the current month
+            retention_months: Months kept attached, counting the current one
+                              (0 = never detach)
+            archive_schema: Schema detached partitions are moved to ('' = leave
+                            them in place as standalone tables)
+        """
+        self.db_manager = db_manager
+        self.months_ahead = max(0, months_ahead)
+        self.retention_months = max(0, retention_months)
+        self.archive_schema = archive_schema
+
+    @staticmethod
+    def partition_name(month: date) -> str:
+        """Name of the partition holding a month, e.g. cloud_costs_2025_01"""
+        return f"{PARENT_TABLE}_{month.year:04d}_{month.month:02d}"
+
+    def retention_start(self, today: Optional[date] = None) -> Optional[date]:
+        """
+        First usage date still inside the retention period
+
+        Returns:
+            First day of the oldest retained month, or None without retention
+        """
+        if not self.retention_months:
+            return None
+        return add_months(today or date.today(), -(self.retention_months - 1))
+
+    def is_partitioned(self) -> bool:
+        """Whether cloud_costs is a partitioned table (databases created before partitioning are not)"""
+        with self.db_manager.get_session() as session:
+            return session.execute(_IS_PARTITIONED_SQL, {'table': PARENT_TABLE}).first() is not None
+
+    def list_partitions(self) -> List[Tuple[str, date]]:
+        """
+        List attached monthly partitions
+
+        Returns:
+            (partition name, first day of its month) tuples in month order
+        """
+        with self.db_manager.get_session() as session:
+            names = session.execute(_LIST_PARTITIONS_SQL, {'table': PARENT_TABLE}).scalars().all()
+
+        partitions = []
+        for name in names:
+            match = _PARTITION_NAME_PATTERN.match(name)
+            if match:
+                partitions.append((name, date(int(match.group(1)), int(match.group(2)), 1)))
+        return sorted(partitions, key=lambda partition: partition[1])
+
+    def ensure_partitions(self, start_date: date, end_date: date, today: Optional[date] = None) -> int:
+        """
+        Create the monthly partitions covering a date range and the months ahead
+
+        Args:
+            start_date: First usage date that will be written
+            end_date: Last usage date that will be written
+            today: Current date (default: today)
+
+        Returns:
+            Number of partitions created
+        """
+        if not self.is_partitioned():
+            logger.debug(f"{PARENT_TABLE} is not partitioned; skipping partition management")
+            return 0
+
+        today = today or date.today()
+        first_month = month_start(min(start_date, today))
+        retention_start = self.retention_start(today)
+        if retention_start is not None:
+            # Expired months are detached, never recreated
+            first_month = max(first_month, retention_start)
+        last_month = max(month_start(end_date), add_months(today, self.months_ahead))
+        existing = {month for _, month in self.list_partitions()}
+
+        created = 0
+        month = first_month
+        with self.db_manager.get_session() as session:
+            while month <= last_month:
+                if month not in existing:
+                    session.execute(text(
+                        f"CREATE TABLE IF NOT EXISTS {self.partition_name(month)} "
+                        f"PARTITION OF {PARENT_TABLE} "
+                        f"FOR VALUES FROM ('{month.isoformat()}') TO ('{add_months(month, 1).isoformat()}')"
+                    ))
+                    created += 1
+                month = add_months(month, 1)
+
+        if created:
+            logger.info(f"Created {created} {PARENT_TABLE} partition(s) from {first_month:%Y-%m} to {last_month:%Y-%m}")
+        return created
+
+    def detach_expired(self, today: Optional[date] = None, discard_rollups: bool = False) -> List[str]:
+        """
+        Detach partitions older than the retention period
+
+        Detached partitions keep their data as standalone tables, moved to
+        archive_schema if one is configured, and can be dropped or
+        re-attached by hand (followed by --rebuild-rollups).
+
+        Args:
+            today: Current date (default: today)
+            discard_rollups: Also delete the rollup rows of the detached
+                             months in the same transaction (requires the
+                             rollup tables)
+
+        Returns:
+            Names of the detached partitions
+        """
+        cutoff = self.retention_start(today)
+        if cutoff is None or not self.is_partitioned():
+            return []
+
+        expired = [name for name, month in self.list_partitions() if month < cutoff]
+        if not expired:
+            return []
+
+        with self.db_manager.get_session() as session:
+            if self.archive_schema:
+                session.execute(text(f'CREATE SCHEMA IF NOT EXISTS "{self.archive_schema}"'))
+            for name in expired:
+                session.execute(text(f"ALTER TABLE {PARENT_TABLE} DETACH PARTITION {name}"))
+                if self.archive_schema:
+                    session.execute(text(f'ALTER TABLE {name} SET SCHEMA "{self.archive_schema}"'))
+            if discard_rollups:
+                # Reports read the rollups, which must not outlive the detached rows
+                CostRollups.discard_before(session, cutoff)
+
+        destination = f" into schema {self.archive_schema}" if self.archive_schema else ''
+        logger.info(f"Detached {len(expired)} {PARENT_TABLE} partition(s) before {cutoff:%Y-%m}{destination}: {', '.join(expired)}")
+        return expired
+
+    @classmethod
+    def from_config(cls, db_manager: DatabaseManager, database_config) -> 'PartitionManager':
+        """Build a partition manager from DatabaseConfig settings"""
+        return cls(
+            db_manager,
+            months_ahead=database_config.partition_months_ahead,
+            retention_months=database_config.partition_retention_months,
+            archive_schema=database_config.partition_archive_schema
+        )
@@ -0,0 +1,178 @@
+"""
+Pre-aggregated cost rollups - daily per-provider and monthly per-service totals
+
+The rollup tables are kept in step with cloud_costs by adding the cost
+change of every row a write inserts or updates, in the same transaction as
+the write, so dashboards read a handful of rows per month instead of
+scanning cloud_costs.
+"""
+from collections import defaultdict
+from datetime import date
+from decimal import Decimal
+from typing import Dict, Iterable, Tuple
+import logging
+
+from sqlalchemy import inspect, text
+from sqlalchemy.dialects.postgresql import insert
+
+from database.connection import ROLLUP_WRITE_LOCK_SQL, DatabaseManager
+from database.models import DailyProviderCost, MonthlyServiceCost
+from utils.date_utils import month_start
+
+logger = logging.getLogger(__name__)
+
+# (cloud_provider, service_name, usage_date, cost change)
+CostDelta = Tuple[str, str, date, Decimal]
+
+_REBUILD_STATEMENTS = (
+    # Block concurrent writes so the rebuilt totals match cloud_costs exactly
+    "LOCK TABLE cloud_costs IN SHARE MODE",
+    "DELETE FROM cost_rollup_daily_provider",
+    "DELETE FROM cost_rollup_monthly_service",
+)
+
+_REBUILD_DAILY_SQL = """
+    INSERT INTO cost_rollup_daily_provider (usage_date, cloud_provider, total_cost_usd)
+    SELECT usage_date, cloud_provider, SUM(cost_usd)
+    FROM cloud_costs
+    GROUP BY usage_date, cloud_provider
+"""
+
+_REBUILD_MONTHLY_SQL = """
+    INSERT INTO cost_rollup_monthly_service (usage_month, cloud_provider, service_name, total_cost_usd)
+    SELECT date_trunc('month', usage_date)::date, cloud_provider, service_name, SUM(cost_usd)
+    FROM cloud_costs
+    GROUP BY 1, 2, 3
+"""
+
+
+class CostRollups:
+    """
+    Maintains the cost_rollup_daily_provider and cost_rollup_monthly_service tables
+    """
+
+    def __init__(self, db_manager: DatabaseManager):
+        """
+        Initialize rollup maintenance
+
+        Args:
+            db_manager: Database manager instance
+        """
+        self.db_manager = db_manager
+
+    def available(self) -> bool:
+        """Whether the rollup tables exist (they are created by --init-db)"""
+        inspector = inspect(self.db_manager.engine)
+        return all(
+            inspector.has_table(model.__tablename__)
+            for model in (DailyProviderCost, MonthlyServiceCost)
+        )
+
+    @staticmethod
+    def lock_writes(session):
+        """
+        Serialize rollup-maintaining writes until the caller's transaction ends
+
+        Must be taken before reading the costs a write replaces, so a
+        concurrent writer (e.g. the daemon and a one-shot run on the same
+        dates) cannot change them before the write and make the rollups drift.
+
+        Args:
+            session: Session of the write transaction
+        """
+        session.execute(text(ROLLUP_WRITE_LOCK_SQL))
+
+    @staticmethod
+    def apply_deltas(session, deltas: Iterable[CostDelta]) -> int:
+        """
+        Add cost changes to the rollup totals within the caller's transaction
+
+        Args:
+            session: Session of the transaction that wrote the changes
+            deltas: Cost change per written cloud_costs row
+
+        Returns:
+            Number of rollup rows touched
+        """
+        daily: Dict[Tuple[date, str], Decimal] = defaultdict(Decimal)
+        monthly: Dict[Tuple[date, str, str], Decimal] = defaultdict(Decimal)
+        for cloud_provider, service_name, usage_date, delta in deltas:
+            if delta:
+                daily[(usage_date, cloud_provider)] += delta
+                monthly[(month_start(usage_date), cloud_provider, service_name)] += delta
+
+        if daily:
+            stmt = insert(DailyProviderCost).values([
+                {'usage_date': usage_date, 'cloud_provider': cloud_provider, 'total_cost_usd': total}
+                for (usage_date, cloud_provider), total in daily.items()
+            ])
+            session.execute(stmt.on_conflict_do_update(
+                index_elements=['usage_date', 'cloud_provider'],
+                set_={
+                    'total_cost_usd': DailyProviderCost.total_cost_usd + stmt.excluded.total_cost_usd,
+                    'updated_at': stmt.excluded.updated_at
+                }
+            ))
+
+        if monthly:
+            stmt = insert(MonthlyServiceCost).values([
+                {
+                    'usage_month': usage_month,
+                    'cloud_provider': cloud_provider,
+                    'service_name': service_name,
+                    'total_cost_usd': total
+                }
+                for (usage_month, cloud_provider, service_name), total in monthly.items()
+            ])
+            session.execute(stmt.on_conflict_do_update(
+                index_elements=['usage_month', 'cloud_provider', 'service_name'],
+                set_={
+                    'total_cost_usd': MonthlyServiceCost.total_cost_usd + stmt.excluded.total_cost_usd,
+                    'updated_at': stmt.excluded.updated_at
+                }
+            ))
+
+        return len(daily) + len(monthly)
+
+    @staticmethod
+    def discard_before(session, cutoff: date) -> int:
+        """
+        Delete the rollup rows of usage dates before a cutoff within the caller's transaction
+
+        Used when the cloud_costs partitions holding those dates are detached,
+        so the rollups keep matching cloud_costs.
+
+        Args:
+            session: Session of the transaction detaching the partitions
+            cutoff: First usage date to keep (the first day of a month)
+
+        Returns:
+            Number of rollup rows deleted
+        """
+        daily_rows = session.execute(
+            DailyProviderCost.__table__.delete().where(DailyProviderCost.usage_date < cutoff)
+        ).rowcount
+        monthly_rows = session.execute(
+            MonthlyServiceCost.__table__.delete().where(MonthlyServiceCost.usage_month < month_start(cutoff))
+        ).rowcount
+        return daily_rows + monthly_rows
+
+    def rebuild(self) -> Tuple[int, int]:
+        """
+        Recompute both rollup tables from cloud_costs
+
+        Repairs drift (e.g. rows edited by hand) and fills the tables for
+        data loaded before they existed. Months in detached partitions are
+        no longer part of cloud_costs and drop out of the rollups.
+
+        Returns:
+            Tuple of (daily rows, monthly rows) written
+        """
+        with self.db_manager.get_session() as session:
+            for statement in _REBUILD_STATEMENTS:
+                session.execute(text(statement))
+            daily_rows = session.execute(text(_REBUILD_DAILY_SQL)).rowcount
+            monthly_rows = session.execute(text(_REBUILD_MONTHLY_SQL)).rowcount
+
+        logger.info(f"Rebuilt cost rollups: {daily_rows} daily provider row(s), {monthly_rows} monthly service row(s)")
+        return daily_rows, monthly_rows
@@ -1,27 +1,103 @@
 -- Cloud Cost Aggregator Database Schema
 
--- Drop table if exists (for clean setup)
+-- Drop tables if exist (for clean setup)
 DROP TABLE IF EXISTS cloud_costs;
+DROP TABLE IF EXISTS collection_watermarks;
+DROP TABLE IF EXISTS finalized_cost_dates;
+DROP TABLE IF EXISTS cost_rollup_daily_provider;
+DROP TABLE IF EXISTS cost_rollup_monthly_service;
 
--- Create cloud_costs table with upsert support
+-- Create cloud_costs table with upsert support, range-partitioned by month
+-- of usage_date (keys of a partitioned table must include usage_date)
 CREATE TABLE cloud_costs (
-    id SERIAL PRIMARY KEY,
+    id SERIAL,
     cloud_provider VARCHAR(10) NOT NULL CHECK (cloud_provider IN ('aws', 'gcp', 'azure')),
+    account_id VARCHAR(100) NOT NULL DEFAULT '',
     service_name VARCHAR(255) NOT NULL,
     cost_usd NUMERIC(15, 4) NOT NULL DEFAULT 0.0,
     usage_date DATE NOT NULL,
     created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
 
+    PRIMARY KEY (id, usage_date),
+
     -- Unique constraint for upsert logic
-    CONSTRAINT unique_cost_record UNIQUE (cloud_provider, service_name, usage_date)
-);
+    CONSTRAINT unique_cost_record UNIQUE (cloud_provider, account_id, service_name, usage_date)
+) PARTITION BY RANGE (usage_date);
+
+-- Create monthly partitions (cloud_costs_YYYY_MM) for the last 90 days and
+-- the next 3 months; the aggregator creates further ones as it needs them
+DO $$
+DECLARE
+    month_start DATE;
+BEGIN
+    FOR month_start IN
+        SELECT generate_series(
+            date_trunc('month', CURRENT_DATE - 90),
+            date_trunc('month', CURRENT_DATE) + INTERVAL '3 months',
+            INTERVAL '1 month'
+        )::date
+    LOOP
+        EXECUTE format(
+            'CREATE TABLE IF NOT EXISTS %I PARTITION OF cloud_costs FOR VALUES FROM (%L) TO (%L)',
+            'cloud_costs_' || to_char(month_start, 'YYYY_MM'),
+            month_start,
+            (month_start + INTERVAL '1 month')::date
+        );
+    END LOOP;
+END $$;
 
 -- Create indexes for better query performance
 CREATE INDEX idx_cloud_costs_usage_date ON cloud_costs(usage_date);
 CREATE INDEX idx_cloud_costs_provider ON cloud_costs(cloud_provider);
 CREATE INDEX idx_cloud_costs_service ON cloud_costs(service_name);
 CREATE INDEX idx_cloud_costs_provider_date ON cloud_costs(cloud_provider, usage_date);
+-- Covering index for range reports (index-only scans) and the report cache watermark
+CREATE INDEX idx_cloud_costs_report ON cloud_costs(usage_date, cloud_provider, service_name) INCLUDE (cost_usd);
+CREATE INDEX idx_cloud_costs_updated_at ON cloud_costs(updated_at);
+
+-- Create collection_watermarks table: how far each provider account has been collected
+CREATE TABLE collection_watermarks (
+    cloud_provider VARCHAR(10) NOT NULL,
+    account_id VARCHAR(100) NOT NULL DEFAULT '',
+    last_collected_date DATE,
+    last_finalized_date DATE,
+    last_export_time TIMESTAMP WITH TIME ZONE,
+    updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+
+    PRIMARY KEY (cloud_provider, account_id)
+);
+
+-- Create finalized_cost_dates table: usage dates whose billing is closed
+CREATE TABLE finalized_cost_dates (
+    cloud_provider VARCHAR(10) NOT NULL,
+    account_id VARCHAR(100) NOT NULL DEFAULT '',
+    usage_date DATE NOT NULL,
+    finalized_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+
+    PRIMARY KEY (cloud_provider, account_id, usage_date)
+);
+
+-- Create rollup tables: totals kept in step with cloud_costs by every write
+CREATE TABLE cost_rollup_daily_provider (
+    usage_date DATE NOT NULL,
+    cloud_provider VARCHAR(10) NOT NULL,
+    total_cost_usd NUMERIC(18, 4) NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+
+    PRIMARY KEY (usage_date, cloud_provider)
+);
+
+-- usage_month is the first day of the month
+CREATE TABLE cost_rollup_monthly_service (
+    usage_month DATE NOT NULL,
+    cloud_provider VARCHAR(10) NOT NULL,
+    service_name VARCHAR(255) NOT NULL,
+    total_cost_usd NUMERIC(18, 4) NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+
+    PRIMARY KEY (usage_month, cloud_provider, service_name)
+);
 
 -- Create a function to automatically update the updated_at timestamp
 CREATE OR REPLACE FUNCTION update_updated_at_column()
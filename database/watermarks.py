@@ -0,0 +1,185 @@
+"""
+Collection watermarks - how far each provider account has been collected,
+and which usage dates have been finalized
+"""
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Dict, Iterable, Optional, Set, Tuple
+import logging
+
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert
+
+from database.connection import DatabaseManager
+from database.models import CollectionWatermark, FinalizedCostDate
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Watermark:
+    """Collection progress of one provider account"""
+    provider: str
+    account_id: str
+    last_collected_date: Optional[date]
+    last_finalized_date: Optional[date]
+    last_export_time: Optional[datetime]
+
+
+class WatermarkStore:
+    """
+    Reads and advances rows of the collection_watermarks table
+
+    Watermarks only ever move forward: advance() keeps the greater of the
+    stored and the new value for every column.
+    """
+
+    def __init__(self, db_manager: DatabaseManager):
+        """
+        Initialize watermark store
+
+        Args:
+            db_manager: Database manager instance
+        """
+        self.db_manager = db_manager
+
+    def load_all(self) -> Dict[Tuple[str, str], Watermark]:
+        """
+        Load every stored watermark
+
+        Returns:
+            Dictionary mapping (provider, account_id) to its watermark
+        """
+        with self.db_manager.get_session() as session:
+            rows = session.query(CollectionWatermark).all()
+            return {
+                (row.cloud_provider, row.account_id): Watermark(
+                    provider=row.cloud_provider,
+                    account_id=row.account_id,
+                    last_collected_date=row.last_collected_date,
+                    last_finalized_date=row.last_finalized_date,
+                    last_export_time=row.last_export_time
+                )
+                for row in rows
+            }
+
+    def advance(
+        self,
+        provider: str,
+        account_id: str,
+        collected_date: Optional[date] = None,
+        finalized_date: Optional[date] = None,
+        export_time: Optional[datetime] = None
+    ):
+        """
+        Move a provider account's watermarks forward
+
+        Values that are None, or older than what is stored, leave the stored
+        value unchanged.
+
+        Args:
+            provider: Provider name
+            account_id: Account ('' for single-account setups)
+            collected_date: Latest usage date collected
+            finalized_date: Latest usage date that no longer needs re-fetching
+            export_time: Latest billing export timestamp seen
+        """
+        stmt = insert(CollectionWatermark).values(
+            cloud_provider=provider,
+            account_id=account_id,
+            last_collected_date=collected_date,
+            last_finalized_date=finalized_date,
+            last_export_time=export_time
+        )
+        # GREATEST ignores NULLs, so missing values never move a watermark back
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['cloud_provider', 'account_id'],
+            set_={
+                'last_collected_date': func.greatest(
+                    CollectionWatermark.last_collected_date, stmt.excluded.last_collected_date
+                ),
+                'last_finalized_date': func.greatest(
+                    CollectionWatermark.last_finalized_date, stmt.excluded.last_finalized_date
+                ),
+                'last_export_time': func.greatest(
+                    CollectionWatermark.last_export_time, stmt.excluded.last_export_time
+                ),
+                'updated_at': func.now()
+            }
+        )
+
+        with self.db_manager.get_session() as session:
+            session.execute(stmt)
+
+        logger.debug(
+            f"Advanced {provider}/{account_id or '-'} watermark: collected={collected_date}, "
+            f"finalized={finalized_date}, export_time={export_time}"
+        )
+
+
+class FinalizedDateStore:
+    """
+    Reads and records rows of the finalized_cost_dates table
+    """
+
+    def __init__(self, db_manager: DatabaseManager):
+        """
+        Initialize finalized date store
+
+        Args:
+            db_manager: Database manager instance
+        """
+        self.db_manager = db_manager
+
+    def load_range(self, start_date: date, end_date: date) -> Dict[Tuple[str, str], Set[date]]:
+        """
+        Load finalized usage dates within a date range
+
+        Args:
+            start_date: Start date (inclusive)
+            end_date: End date (inclusive)
+
+        Returns:
+            Dictionary mapping (provider, account_id) to its finalized dates
+        """
+        finalized = {}
+        with self.db_manager.get_session() as session:
+            rows = session.query(
+                FinalizedCostDate.cloud_provider,
+                FinalizedCostDate.account_id,
+                FinalizedCostDate.usage_date
+            ).filter(
+                FinalizedCostDate.usage_date >= start_date,
+                FinalizedCostDate.usage_date <= end_date
+            )
+            for provider, account_id, usage_date in rows:
+                finalized.setdefault((provider, account_id), set()).add(usage_date)
+        return finalized
+
+    def mark(self, provider: str, account_id: str, usage_dates: Iterable[date]) -> int:
+        """
+        Record usage dates as finalized; already finalized dates are kept as is
+
+        Args:
+            provider: Provider name
+            account_id: Account ('' for single-account setups)
+            usage_dates: Dates to mark
+
+        Returns:
+            Number of dates given
+        """
+        rows = [
+            {'cloud_provider': provider, 'account_id': account_id, 'usage_date': usage_date}
+            for usage_date in sorted(set(usage_dates))
+        ]
+        if not rows:
+            return 0
+
+        stmt = insert(FinalizedCostDate).values(rows).on_conflict_do_nothing(
+            index_elements=['cloud_provider', 'account_id', 'usage_date']
+        )
+        with self.db_manager.get_session() as session:
+            session.execute(stmt)
+
+        logger.debug(f"Marked {len(rows)} {provider}/{account_id or '-'} date(s) finalized")
+        return len(rows)
@@ -3,17 +3,34 @@
 Cloud Cost Aggregator - Main entry point
 Collects and aggregates cloud costs from AWS, GCP, and Azure
 """
+import time
+
+# Measured before the heavier imports below so startup time covers them
+_STARTUP_BEGIN = time.perf_counter()
+
 import argparse
+import json
+import signal
 import sys
-from datetime import date
+from datetime import date, timedelta
+from typing import Any, Dict, Optional, Tuple
+import threading
 
 from config import config
 from database.connection import DatabaseManager, build_database_url
-from aggregator import CostAggregator
-from utils.logger import setup_logger
+from database.partitions import PartitionManager
+from database.rollups import CostRollups
+from aggregator import CostAggregator, ENGINES, WRITE_MODES
+from reports import CostReports, DEFAULT_REPORT_DAYS
+from server import CostApiServer
+from daemon import CollectionDaemon
+from utils.logger import get_logger, setup_logger
 from utils.date_utils import get_date_range, parse_date_string
 
 
+COMMANDS = ('collect', 'report', 'serve', 'daemon')
+
+
 def parse_arguments():
     """
     Parse command line arguments
@@ -25,6 +42,17 @@ def parse_arguments():
         description='Cloud Cost Aggregator - Collect costs from AWS, GCP, and Azure'
     )
 
+    parser.add_argument(
+        'command',
+        nargs='?',
+        default='collect',
+        choices=COMMANDS,
+        help=(
+            'collect: collect and store costs (default); report: print cost totals from the database; '
+            'serve: run the HTTP read API; daemon: collect on a schedule in a long-running process'
+        )
+    )
+
     parser.add_argument(
         '--backfill',
         action='store_true',
@@ -67,6 +95,55 @@ def parse_arguments():
         help='Initialize database tables and exit'
     )
 
+    parser.add_argument(
+        '--rebuild-rollups',
+        action='store_true',
+        help='Recompute the cost rollup tables from cloud_costs and exit'
+    )
+
+    parser.add_argument(
+        '--write-mode',
+        type=str,
+        default='upsert',
+        choices=WRITE_MODES,
+        help='Database write path: batched upserts or COPY bulk load for large backfills (default: upsert)'
+    )
+
+    parser.add_argument(
+        '--engine',
+        type=str,
+        default='thread',
+        choices=ENGINES,
+        help='Collection engine: thread pool, or one asyncio event loop with aiohttp for Azure (default: thread)'
+    )
+
+    parser.add_argument(
+        '--no-watermarks',
+        action='store_true',
+        help='Collect the full lookback window instead of resuming from collection watermarks'
+    )
+
+    parser.add_argument(
+        '--restate',
+        action='store_true',
+        help='Re-fetch the requested range including days whose billing is already finalized'
+    )
+
+    parser.add_argument(
+        '--top',
+        type=int,
+        default=10,
+        help='Number of services listed by report (default: 10)'
+    )
+
+    parser.add_argument(
+        '--format',
+        type=str,
+        default='text',
+        choices=['text', 'json'],
+        help='Output format of report (default: text)'
+    )
+
     parser.add_argument(
         '--log-level',
         type=str,
@@ -92,10 +169,18 @@ def main():
     logger.info("=" * 60)
     logger.info("Cloud Cost Aggregator")
     logger.info("=" * 60)
+    logger.info(f"Startup completed in {(time.perf_counter() - _STARTUP_BEGIN) * 1000:.0f} ms")
 
-    # Validate configuration
+    # Validate configuration - only the sections this run needs, so e.g.
+    # --init-db or AWS-only runs never fetch Azure secrets from SSM
     logger.info("Validating configuration...")
-    errors = config.validate()
+    if args.init_db or args.rebuild_rollups or args.command in ('report', 'serve'):
+        validate_providers = []
+    elif args.providers:
+        validate_providers = [p.strip().lower() for p in args.providers.split(',')]
+    else:
+        validate_providers = None
+    errors = config.validate(providers=validate_providers)
     if errors:
         logger.error("Configuration validation failed:")
         for error in errors:
@@ -113,17 +198,37 @@ def main():
     if args.init_db:
         logger.info("Initializing database tables...")
         db_manager.create_tables()
+        # Partitions for the backfill window and the months ahead; later runs
+        # create the ones they need
+        PartitionManager.from_config(db_manager, config.database).ensure_partitions(
+            date.today() - timedelta(days=config.app.backfill_days),
+            date.today()
+        )
         logger.info("Database initialized successfully")
         sys.exit(0)
 
+    # Handle --rebuild-rollups flag
+    if args.rebuild_rollups:
+        logger.info("Rebuilding cost rollup tables...")
+        CostRollups(db_manager).rebuild()
+        sys.exit(0)
+
     # Test database connection
     if not db_manager.test_connection():
         logger.error("Database connection failed. Please check your configuration.")
         sys.exit(1)
 
+    # Handle report command - reads the database only, no collectors
+    if args.command == 'report':
+        sys.exit(run_report(args, db_manager))
+
+    # Handle serve command - answers from memory, reads the database on refresh
+    if args.command == 'serve':
+        sys.exit(run_server(db_manager))
+
     # Initialize aggregator
     logger.info("Creating CostAggregator instance...")
-    aggregator = CostAggregator(config, db_manager)
+    aggregator = CostAggregator(config, db_manager, write_mode=args.write_mode, engine=args.engine)
     logger.info("CostAggregator instance created successfully")
 
     # Handle --test-connections flag
@@ -147,23 +252,67 @@ def main():
 
         sys.exit(0 if all_passed else 1)
 
-    # Parse date range
-    start_date = None
-    end_date = None
+    # Handle daemon command - keeps the aggregator and database pool warm
+    if args.command == 'daemon':
+        sys.exit(run_daemon(args, db_manager, aggregator))
 
-    if args.start_date:
-        try:
-            start_date = parse_date_string(args.start_date)
-        except ValueError:
-            logger.error(f"Invalid start date format: {args.start_date}. Use YYYY-MM-DD")
-            sys.exit(1)
+    try:
+        parse_date_args(args)
+    except ValueError as e:
+        logger.error(str(e))
+        db_manager.close()
+        sys.exit(1)
 
-    if args.end_date:
+    try:
+        collect(args, aggregator)
+    except Exception as e:
+        logger.error(f"Aggregation failed: {e}", exc_info=True)
+        sys.exit(1)
+    finally:
+        # Cleanup
+        db_manager.close()
+
+
+def parse_date_args(args) -> Tuple[Optional[date], Optional[date]]:
+    """
+    Parse the command line's --start-date and --end-date
+
+    Args:
+        args: Parsed arguments
+
+    Returns:
+        Tuple of (start_date, end_date); None where not given
+
+    Raises:
+        ValueError: If a date is not in YYYY-MM-DD format
+    """
+    dates = []
+    for name, value in (('start', args.start_date), ('end', args.end_date)):
         try:
-            end_date = parse_date_string(args.end_date)
+            dates.append(parse_date_string(value) if value else None)
         except ValueError:
-            logger.error(f"Invalid end date format: {args.end_date}. Use YYYY-MM-DD")
-            sys.exit(1)
+            raise ValueError(f"Invalid {name} date format: {value}. Use YYYY-MM-DD") from None
+    return dates[0], dates[1]
+
+
+def collect(args, aggregator: CostAggregator) -> Dict[str, Any]:
+    """
+    Collect and store costs for the command line's date range and providers
+
+    Args:
+        args: Parsed arguments
+        aggregator: Cost aggregator
+
+    Returns:
+        Statistics of the aggregate_and_store() run
+
+    Raises:
+        ValueError: If --start-date or --end-date is malformed
+    """
+    logger = get_logger()
+
+    # Parse date range
+    start_date, end_date = parse_date_args(args)
 
     # Determine backfill settings
     # --backfill-days implies --backfill mode
@@ -181,6 +330,12 @@ def main():
 
     logger.info(f"Date range: {start_date} to {end_date}")
 
+    # Scheduled runs resume from collection watermarks; the date range above
+    # then only applies to accounts that have never been collected
+    incremental = not (args.start_date or args.end_date or backfill_enabled or args.no_watermarks or args.restate)
+    if incremental:
+        logger.info("Incremental mode: resuming each account from its collection watermarks")
+
     # Parse providers
     providers = None
     if args.providers:
@@ -193,46 +348,217 @@ def main():
     logger.info("=" * 60)
     logger.info("Starting cost aggregation...")
     logger.info("=" * 60)
+    logger.info("About to call aggregate_and_store()...")
+    logger.info(f"Parameters: start_date={start_date}, end_date={end_date}, providers={providers}")
+    stats = aggregator.aggregate_and_store(
+        start_date=start_date,
+        end_date=end_date,
+        providers=providers,
+        incremental=incremental,
+        restate=args.restate
+    )
+    logger.info("aggregate_and_store() completed successfully")
+
+    # Print summary
+    logger.info("=" * 60)
+    logger.info("Aggregation Summary")
+    logger.info("=" * 60)
+    logger.info(f"Date range: {start_date} to {end_date}")
+    logger.info(f"Total records: {stats['total_records']}")
+    logger.info(f"Saved records: {stats['saved_records']}")
+    logger.info(
+        f"  Inserted: {stats['inserted_records']}, updated: {stats['updated_records']}, "
+        f"unchanged: {stats['unchanged_records']}"
+    )
+    logger.info(f"Finalized days skipped: {stats['finalized_days_skipped']}")
+    logger.info(f"Providers succeeded: {stats['providers_succeeded']}")
+    logger.info(f"Providers failed: {stats['providers_failed']}")
+    logger.info(
+        f"Accounts collected: {stats['accounts_collected']}, up to date: {stats['accounts_up_to_date']}, "
+        f"failed: {stats['accounts_failed']}"
+    )
+    logger.info("")
+
+    # Print cost breakdown
+    for provider in ['aws', 'gcp', 'azure']:
+        cost_key = f'{provider}_cost_usd'
+        records_key = f'{provider}_records'
+        if cost_key in stats:
+            logger.info(
+                f"{provider.upper()}: ${stats[cost_key]:.2f} USD "
+                f"({stats[records_key]} records)"
+            )
+
+    logger.info("=" * 60)
+    logger.info("Aggregation completed successfully")
+
+    return stats
+
+
+def run_report(args, db_manager: DatabaseManager) -> int:
+    """
+    Print provider totals, top services and daily changes for a date range
+
+    Args:
+        args: Parsed arguments (--start-date, --end-date, --providers, --top, --format)
+        db_manager: Initialized database manager
+
+    Returns:
+        Process exit code
+    """
+    logger = get_logger()
     try:
-        logger.info("About to call aggregate_and_store()...")
-        logger.info(f"Parameters: start_date={start_date}, end_date={end_date}, providers={providers}")
-        stats = aggregator.aggregate_and_store(
-            start_date=start_date,
-            end_date=end_date,
-            providers=providers
+        end_date = parse_date_string(args.end_date) if args.end_date else date.today()
+        start_date = (
+            parse_date_string(args.start_date) if args.start_date
+            else end_date - timedelta(days=DEFAULT_REPORT_DAYS - 1)
+        )
+    except ValueError:
+        logger.error("Invalid date format. Use YYYY-MM-DD")
+        return 1
+    if start_date > end_date:
+        logger.error(f"Start date {start_date} is after end date {end_date}")
+        return 1
+    providers = [p.strip().lower() for p in args.providers.split(',')] if args.providers else None
+
+    reports = CostReports.from_config(db_manager, config.app)
+    try:
+        report = {
+            'start_date': start_date.isoformat(),
+            'end_date': end_date.isoformat(),
+            'providers': reports.provider_totals(start_date, end_date, providers),
+            'top_services': reports.top_services(start_date, end_date, args.top, providers),
+            'daily_changes': reports.daily_changes(start_date, end_date, providers)
+        }
+    except Exception as e:
+        logger.error(f"Report failed: {e}", exc_info=True)
+        return 1
+    finally:
+        db_manager.close()
+
+    if args.format == 'json':
+        print(json.dumps(report, indent=2))
+        return 0
+
+    print(f"Costs from {start_date} to {end_date}")
+    print()
+    print("Provider totals:")
+    for row in report['providers']:
+        print(f"  {row['cloud_provider'].upper():<8} ${row['total_cost_usd']:>14,.2f}")
+    print()
+    print(f"Top {args.top} services:")
+    for row in report['top_services']:
+        print(f"  {row['cloud_provider'].upper():<8} {row['service_name'][:60]:<60} ${row['total_cost_usd']:>14,.2f}")
+    print()
+    print("Daily changes:")
+    for row in report['daily_changes']:
+        change_pct = f"{row['change_pct']:+.1f}%" if row['change_pct'] is not None else 'n/a'
+        print(
+            f"  {row['usage_date']}  {row['cloud_provider'].upper():<8} ${row['total_cost_usd']:>12,.2f}  "
+            f"{row['change_usd']:>+12,.2f}  {change_pct:>8}"
         )
-        logger.info("aggregate_and_store() completed successfully")
-
-        # Print summary
-        logger.info("=" * 60)
-        logger.info("Aggregation Summary")
-        logger.info("=" * 60)
-        logger.info(f"Date range: {start_date} to {end_date}")
-        logger.info(f"Total records: {stats['total_records']}")
-        logger.info(f"Saved records: {stats['saved_records']}")
-        logger.info(f"Providers succeeded: {stats['providers_succeeded']}")
-        logger.info(f"Providers failed: {stats['providers_failed']}")
-        logger.info("")
-
-        # Print cost breakdown
-        for provider in ['aws', 'gcp', 'azure']:
-            cost_key = f'{provider}_cost_usd'
-            records_key = f'{provider}_records'
-            if cost_key in stats:
-                logger.info(
-                    f"{provider.upper()}: ${stats[cost_key]:.2f} USD "
-                    f"({stats[records_key]} records)"
-                )
-
-        logger.info("=" * 60)
-        logger.info("Aggregation completed successfully")
+    return 0
+
+
+def run_server(db_manager: DatabaseManager) -> int:
+    """
+    Run the HTTP read API until SIGINT/SIGTERM
+
+    Args:
+        db_manager: Initialized database manager
 
+    Returns:
+        Process exit code
+    """
+    logger = get_logger()
+    try:
+        server = CostApiServer.from_config(db_manager, config.app)
+        server.refresh(force=True)
     except Exception as e:
-        logger.error(f"Aggregation failed: {e}", exc_info=True)
-        sys.exit(1)
+        logger.error(f"Failed to start API server: {e}", exc_info=True)
+        db_manager.close()
+        return 1
+
+    signal.signal(signal.SIGTERM, lambda signum, frame: server.shutdown())
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
     finally:
-        # Cleanup
+        server.close()
+        db_manager.close()
+    logger.info("API server stopped")
+    return 0
+
+
+def run_daemon(args, db_manager: DatabaseManager, aggregator: CostAggregator) -> int:
+    """
+    Collect on the DAEMON_* schedule until SIGINT/SIGTERM, reusing one
+    aggregator, its collectors and the database pool for every run
+
+    With DAEMON_SERVE the HTTP read API runs alongside, reloading its
+    snapshot after each run and reporting the daemon state on /status.
+
+    Args:
+        args: Parsed arguments (collection options apply to every run)
+        db_manager: Initialized database manager
+        aggregator: Cost aggregator
+
+    Returns:
+        Process exit code
+    """
+    logger = get_logger()
+    app = config.app
+
+    # Every run reuses these arguments, so reject bad dates before scheduling
+    try:
+        parse_date_args(args)
+    except ValueError as e:
+        logger.error(str(e))
+        db_manager.close()
+        return 1
+
+    def run_collection() -> Dict[str, Any]:
+        reset = aggregator.reset_failed_collectors()
+        if reset:
+            logger.info(f"Retrying {reset} collector(s) that failed to initialize")
+        return collect(args, aggregator)
+
+    daemon = CollectionDaemon(
+        run_collection,
+        interval_minutes=app.daemon_interval_minutes,
+        offset_minutes=app.daemon_offset_minutes,
+        jitter_seconds=app.daemon_jitter_seconds,
+        run_on_start=app.daemon_run_on_start
+    )
+
+    server = None
+    if app.daemon_serve:
+        try:
+            server = CostApiServer.from_config(db_manager, app)
+            server.status_provider = daemon.status
+            server.refresh(force=True)
+        except Exception as e:
+            logger.error(f"Failed to start API server: {e}", exc_info=True)
+            db_manager.close()
+            return 1
+        aggregator.add_run_listener(server.on_aggregation_run)
+        threading.Thread(target=server.serve_forever, name='cost-api', daemon=True).start()
+
+    def stop(signum, frame):
+        logger.info("Stop requested; finishing the current run")
+        daemon.stop()
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    try:
+        daemon.run_forever()
+    finally:
+        if server is not None:
+            server.shutdown(wait=True)
+            server.close()
         db_manager.close()
+    return 0
 
 
 if __name__ == '__main__':
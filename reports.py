@@ -0,0 +1,334 @@
+"""
+Cost reports - the read side of the aggregator
+
+Per-provider and per-service totals, top services and day-over-day changes
+over a date range. Queries read the rollup tables where they cover the
+range (see database.rollups) and the covering report index of cloud_costs
+otherwise. Results are kept in an in-process LRU cache that is dropped
+whenever the data watermark (latest updated_at, attached partitions)
+moves, so repeated dashboard refreshes cost one index lookup.
+"""
+from collections import OrderedDict
+from datetime import date, timedelta
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+import logging
+import threading
+
+from sqlalchemy import text
+
+from database.connection import DatabaseManager
+from database.rollups import CostRollups
+from utils.date_utils import add_months, month_start
+
+logger = logging.getLogger(__name__)
+
+# Range reported when none is given: the last 30 days
+DEFAULT_REPORT_DAYS = 30
+
+# Changes whenever a write commits (updated_at is set on every insert and
+# changed update) or a partition is attached or detached
+_WATERMARK_SQL = """
+    SELECT
+        (SELECT MAX(updated_at) FROM cloud_costs),
+        (SELECT COUNT(*) FROM pg_inherits WHERE inhparent = 'cloud_costs'::regclass)
+"""
+
+_ROLLUP_WATERMARK_SQL = """
+    SELECT
+        (SELECT MAX(updated_at) FROM cost_rollup_daily_provider),
+        (SELECT MAX(updated_at) FROM cost_rollup_monthly_service)
+"""
+
+# Full months come from the monthly rollup, the partial months at either end
+# of the range from cloud_costs
+_SERVICE_TOTALS_SQL = """
+    SELECT cloud_provider, service_name, SUM(cost_usd) AS total_cost_usd
+    FROM (
+        SELECT cloud_provider, service_name, total_cost_usd AS cost_usd
+        FROM cost_rollup_monthly_service
+        WHERE usage_month >= :full_start AND usage_month < :full_end
+        UNION ALL
+        SELECT cloud_provider, service_name, cost_usd
+        FROM cloud_costs
+        WHERE (usage_date >= :start_date AND usage_date < :full_start)
+           OR (usage_date >= :full_end AND usage_date <= :end_date)
+    ) costs
+    WHERE TRUE {provider_filter}
+    GROUP BY cloud_provider, service_name
+    ORDER BY total_cost_usd DESC, cloud_provider, service_name
+    {limit}
+"""
+
+_SERVICE_TOTALS_UNROLLED_SQL = """
+    SELECT cloud_provider, service_name, SUM(cost_usd) AS total_cost_usd
+    FROM cloud_costs
+    WHERE usage_date >= :start_date AND usage_date <= :end_date {provider_filter}
+    GROUP BY cloud_provider, service_name
+    ORDER BY total_cost_usd DESC, cloud_provider, service_name
+    {limit}
+"""
+
+
+def _full_months(start_date: date, end_date: date) -> Tuple[date, date]:
+    """
+    Whole calendar months inside a date range
+
+    Returns:
+        (first month, month after the last) as first-of-month dates; both
+        are end_date + 1 day when the range holds no whole month
+    """
+    after_end = end_date + timedelta(days=1)
+    full_start = start_date if start_date.day == 1 else add_months(start_date, 1)
+    full_end = month_start(after_end)
+    if full_start >= full_end:
+        return after_end, after_end
+    return full_start, full_end
+
+
+class CostReports:
+    """
+    Cached cost summaries over cloud_costs and its rollup tables
+
+    Returned lists are shared with the cache and must not be modified.
+    """
+
+    def __init__(self, db_manager: DatabaseManager, cache_size: int = 256):
+        """
+        Initialize cost reports
+
+        Args:
+            db_manager: Database manager instance
+            cache_size: Results kept in the LRU cache (0 disables caching)
+        """
+        self.db_manager = db_manager
+        self.cache_size = max(0, cache_size)
+        self.rollups = CostRollups(db_manager)
+        self._rollups_available = None
+        self._cache: 'OrderedDict[Tuple, Any]' = OrderedDict()
+        self._cache_watermark = None
+        self._cache_lock = threading.Lock()
+
+    def uses_rollups(self) -> bool:
+        """Whether reports read the rollup tables (checked once)"""
+        if self._rollups_available is None:
+            self._rollups_available = self.rollups.available()
+            if not self._rollups_available:
+                logger.warning("Cost rollup tables not found; reports will aggregate cloud_costs directly")
+        return self._rollups_available
+
+    def data_watermark(self) -> Tuple:
+        """
+        Fingerprint of the reported data; cached results are valid while it is unchanged
+
+        Returns:
+            Tuple of latest updated_at values and the attached partition count
+        """
+        with self.db_manager.get_session() as session:
+            watermark = tuple(session.execute(text(_WATERMARK_SQL)).one())
+            if self.uses_rollups():
+                # A rollup rebuild changes totals without touching cloud_costs
+                watermark += tuple(session.execute(text(_ROLLUP_WATERMARK_SQL)).one())
+        return watermark
+
+    def provider_totals(
+        self,
+        start_date: date,
+        end_date: date,
+        providers: Optional[Sequence[str]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Total cost per provider over a date range
+
+        Args:
+            start_date: Start date (inclusive)
+            end_date: End date (inclusive)
+            providers: Providers to include (default: all)
+
+        Returns:
+            List of {'cloud_provider', 'total_cost_usd'} dicts, highest cost first
+        """
+        def query(session):
+            table, column = self._daily_source()
+            provider_filter, params = self._provider_filter(providers)
+            rows = session.execute(text(
+                f"SELECT cloud_provider, SUM({column}) AS total_cost_usd FROM {table} "
+                f"WHERE usage_date >= :start_date AND usage_date <= :end_date {provider_filter} "
+                f"GROUP BY cloud_provider ORDER BY total_cost_usd DESC, cloud_provider"
+            ), {'start_date': start_date, 'end_date': end_date, **params})
+            return [
+                {'cloud_provider': row.cloud_provider, 'total_cost_usd': float(row.total_cost_usd)}
+                for row in rows
+            ]
+
+        return self._cached('provider_totals', (start_date, end_date, self._provider_key(providers)), query)
+
+    def service_totals(
+        self,
+        start_date: date,
+        end_date: date,
+        providers: Optional[Sequence[str]] = None,
+        limit: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Total cost per provider service over a date range
+
+        Args:
+            start_date: Start date (inclusive)
+            end_date: End date (inclusive)
+            providers: Providers to include (default: all)
+            limit: Return only the most expensive services
+
+        Returns:
+            List of {'cloud_provider', 'service_name', 'total_cost_usd'} dicts,
+            highest cost first
+        """
+        def query(session):
+            provider_filter, params = self._provider_filter(providers)
+            limit_clause = 'LIMIT :limit' if limit else ''
+            params.update(start_date=start_date, end_date=end_date, limit=limit)
+            if self.uses_rollups():
+                full_start, full_end = _full_months(start_date, end_date)
+                params.update(full_start=full_start, full_end=full_end)
+                sql = _SERVICE_TOTALS_SQL
+            else:
+                sql = _SERVICE_TOTALS_UNROLLED_SQL
+            rows = session.execute(text(sql.format(provider_filter=provider_filter, limit=limit_clause)), params)
+            return [
+                {
+                    'cloud_provider': row.cloud_provider,
+                    'service_name': row.service_name,
+                    'total_cost_usd': float(row.total_cost_usd)
+                }
+                for row in rows
+            ]
+
+        return self._cached(
+            'service_totals',
+            (start_date, end_date, self._provider_key(providers), limit),
+            query
+        )
+
+    def top_services(
+        self,
+        start_date: date,
+        end_date: date,
+        count: int = 10,
+        providers: Optional[Sequence[str]] = None
+    ) -> List[Dict[str, Any]]:
+        """Most expensive provider services over a date range (see service_totals)"""
+        return self.service_totals(start_date, end_date, providers=providers, limit=max(1, count))
+
+    def daily_changes(
+        self,
+        start_date: date,
+        end_date: date,
+        providers: Optional[Sequence[str]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Daily cost per provider with the change from the previous day
+
+        Args:
+            start_date: Start date (inclusive)
+            end_date: End date (inclusive)
+            providers: Providers to include (default: all)
+
+        Returns:
+            List of {'usage_date', 'cloud_provider', 'total_cost_usd',
+            'change_usd', 'change_pct'} dicts in date order; change_pct is
+            None when the previous day had no cost
+        """
+        def query(session):
+            table, column = self._daily_source()
+            provider_filter, params = self._provider_filter(providers)
+            rows = session.execute(text(
+                f"SELECT usage_date, cloud_provider, SUM({column}) AS total_cost_usd FROM {table} "
+                f"WHERE usage_date >= :start_date AND usage_date <= :end_date {provider_filter} "
+                f"GROUP BY usage_date, cloud_provider ORDER BY usage_date, cloud_provider"
+            ), {'start_date': start_date - timedelta(days=1), 'end_date': end_date, **params})
+            totals = {(row.usage_date, row.cloud_provider): float(row.total_cost_usd) for row in rows}
+
+            changes = []
+            for (usage_date, provider), total in totals.items():
+                if usage_date < start_date:
+                    continue
+                previous = totals.get((usage_date - timedelta(days=1), provider), 0.0)
+                changes.append({
+                    'usage_date': usage_date.isoformat(),
+                    'cloud_provider': provider,
+                    'total_cost_usd': total,
+                    'change_usd': round(total - previous, 4),
+                    'change_pct': round((total - previous) / previous * 100, 2) if previous else None
+                })
+            return changes
+
+        return self._cached('daily_changes', (start_date, end_date, self._provider_key(providers)), query)
+
+    def clear_cache(self):
+        """Drop all cached results"""
+        with self._cache_lock:
+            self._cache.clear()
+            self._cache_watermark = None
+
+    def _daily_source(self) -> Tuple[str, str]:
+        """Table and cost column holding per-provider daily costs"""
+        if self.uses_rollups():
+            return 'cost_rollup_daily_provider', 'total_cost_usd'
+        return 'cloud_costs', 'cost_usd'
+
+    @staticmethod
+    def _provider_key(providers: Optional[Sequence[str]]) -> Optional[Tuple[str, ...]]:
+        """Order-independent cache key part for a provider filter"""
+        return tuple(sorted(set(providers))) if providers else None
+
+    @staticmethod
+    def _provider_filter(providers: Optional[Sequence[str]]) -> Tuple[str, Dict[str, Any]]:
+        """SQL condition (and its parameters) restricting rows to providers"""
+        if not providers:
+            return '', {}
+        return 'AND cloud_provider = ANY(:providers)', {'providers': sorted(set(providers))}
+
+    def _cached(self, name: str, params: Tuple, query: Callable) -> Any:
+        """
+        Return a cached result, or run the query and cache its result
+
+        The watermark is read before the query runs, so a result is never
+        cached under a newer watermark than the data it saw.
+
+        Args:
+            name: Report name
+            params: Hashable report parameters
+            query: Callable taking a session and returning the result
+
+        Returns:
+            Report result
+        """
+        if not self.cache_size:
+            with self.db_manager.get_session() as session:
+                return query(session)
+
+        key = (name, params)
+        watermark = self.data_watermark()
+        with self._cache_lock:
+            if watermark != self._cache_watermark:
+                if self._cache:
+                    logger.debug(f"Cost data changed; dropping {len(self._cache)} cached report(s)")
+                self._cache.clear()
+                self._cache_watermark = watermark
+            elif key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+
+        with self.db_manager.get_session() as session:
+            result = query(session)
+
+        with self._cache_lock:
+            if self._cache_watermark == watermark:
+                self._cache[key] = result
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        return result
+
+    @classmethod
+    def from_config(cls, db_manager: DatabaseManager, app_config) -> 'CostReports':
+        """Build cost reports from AppConfig settings"""
+        return cls(db_manager, cache_size=app_config.report_cache_size)
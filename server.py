@@ -0,0 +1,472 @@
+"""
+HTTP read API serving cost aggregates from memory
+
+The server keeps a columnar snapshot of cloud_costs (one row per day,
+provider and service, accounts summed) and answers every request from it;
+PostgreSQL is only read when the snapshot is refreshed. A background thread
+reloads the snapshot when the data watermark moves (see
+reports.CostReports.data_watermark), and an aggregator in the same process
+can trigger a reload after each run. Responses carry an ETag so polling
+dashboards get 304 Not Modified until the data changes.
+
+Endpoints (all GET, JSON):
+    /health                 Snapshot status
+    /status                 Collection daemon status (main.py daemon only)
+    /totals                 Totals per provider, or per service with group_by=service
+    /timeseries             Daily totals per provider
+    /top-services           Most expensive services (limit, default 10)
+
+Query parameters: start, end (YYYY-MM-DD, default the last 30 days of the
+snapshot) and providers (comma-separated).
+"""
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+from urllib.parse import parse_qs, urlsplit
+import hashlib
+import json
+import logging
+import threading
+
+from sqlalchemy import text
+
+from collectors.base_collector import COST_SCALE
+from database.connection import DatabaseManager
+from reports import CostReports, DEFAULT_REPORT_DAYS
+
+logger = logging.getLogger(__name__)
+
+_COST_DIVISOR = 10 ** COST_SCALE
+
+# Rendered responses kept per snapshot before the cache is reset
+_MAX_CACHED_RESPONSES = 1024
+
+_SNAPSHOT_SQL = """
+    SELECT usage_date, cloud_provider, service_name, SUM(cost_usd) AS cost_usd
+    FROM cloud_costs
+    WHERE usage_date >= :start_date
+    GROUP BY usage_date, cloud_provider, service_name
+    ORDER BY usage_date
+"""
+
+
+class CostSnapshot:
+    """
+    Immutable in-memory copy of daily costs per provider service
+
+    Rows are stored column-wise in date order: day ordinals, series indexes
+    (one series per provider service) and fixed-point cost units. A date
+    range is two bisections, and per-provider daily totals are precomputed.
+    """
+
+    def __init__(self, watermark: Tuple, rows: Sequence[Tuple[date, str, str, Any]]):
+        """
+        Build a snapshot
+
+        Args:
+            watermark: Data watermark the rows were read under
+            rows: (usage_date, cloud_provider, service_name, cost_usd) tuples in date order
+        """
+        self.watermark = watermark
+        self.version = hashlib.sha1(repr(watermark).encode('utf-8')).hexdigest()[:16]
+        self.loaded_at = datetime.utcnow()
+
+        self.series: List[Tuple[str, str]] = []
+        series_index: Dict[Tuple[str, str], int] = {}
+        self._days = array('i')
+        self._series = array('I')
+        self._cost_units = array('q')
+        # day ordinal -> provider -> cost units
+        self._daily: Dict[int, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+
+        for usage_date, cloud_provider, service_name, cost_usd in rows:
+            key = (cloud_provider, service_name)
+            index = series_index.get(key)
+            if index is None:
+                index = series_index[key] = len(self.series)
+                self.series.append(key)
+            day = usage_date.toordinal()
+            units = int(round(cost_usd * _COST_DIVISOR))
+            self._days.append(day)
+            self._series.append(index)
+            self._cost_units.append(units)
+            self._daily[day][cloud_provider] += units
+
+    @classmethod
+    def load(cls, db_manager: DatabaseManager, watermark: Tuple, since: Optional[date]) -> 'CostSnapshot':
+        """
+        Read a snapshot from cloud_costs
+
+        Args:
+            db_manager: Database manager instance
+            watermark: Data watermark read before the rows
+            since: First usage date to load (None = all)
+
+        Returns:
+            CostSnapshot
+        """
+        with db_manager.get_session() as session:
+            rows = session.execute(text(_SNAPSHOT_SQL), {'start_date': since or date.min}).all()
+        return cls(watermark, [tuple(row) for row in rows])
+
+    def __len__(self) -> int:
+        return len(self._days)
+
+    @property
+    def first_date(self) -> Optional[date]:
+        return date.fromordinal(self._days[0]) if self._days else None
+
+    @property
+    def last_date(self) -> Optional[date]:
+        return date.fromordinal(self._days[-1]) if self._days else None
+
+    def _row_range(self, start_date: date, end_date: date) -> range:
+        """Row positions with usage dates inside a range"""
+        return range(
+            bisect_left(self._days, start_date.toordinal()),
+            bisect_right(self._days, end_date.toordinal())
+        )
+
+    def provider_totals(self, start_date: date, end_date: date, providers: Optional[set] = None) -> List[Dict[str, Any]]:
+        """Total cost per provider, highest first"""
+        totals: Dict[str, int] = defaultdict(int)
+        for day in range(start_date.toordinal(), end_date.toordinal() + 1):
+            for provider, units in self._daily.get(day, {}).items():
+                if not providers or provider in providers:
+                    totals[provider] += units
+        return [
+            {'cloud_provider': provider, 'total_cost_usd': units / _COST_DIVISOR}
+            for provider, units in sorted(totals.items(), key=lambda item: (-item[1], item[0]))
+        ]
+
+    def service_totals(
+        self,
+        start_date: date,
+        end_date: date,
+        providers: Optional[set] = None,
+        limit: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """Total cost per provider service, highest first"""
+        totals: Dict[int, int] = defaultdict(int)
+        series, cost_units = self._series, self._cost_units
+        for position in self._row_range(start_date, end_date):
+            totals[series[position]] += cost_units[position]
+
+        ranked = sorted(
+            (
+                (units, self.series[index])
+                for index, units in totals.items()
+                if not providers or self.series[index][0] in providers
+            ),
+            key=lambda item: (-item[0], item[1])
+        )
+        return [
+            {'cloud_provider': provider, 'service_name': service, 'total_cost_usd': units / _COST_DIVISOR}
+            for units, (provider, service) in ranked[:limit]
+        ]
+
+    def timeseries(self, start_date: date, end_date: date, providers: Optional[set] = None) -> List[Dict[str, Any]]:
+        """Daily total per provider, in date order"""
+        points = []
+        for day in range(start_date.toordinal(), end_date.toordinal() + 1):
+            for provider, units in sorted(self._daily.get(day, {}).items()):
+                if not providers or provider in providers:
+                    points.append({
+                        'usage_date': date.fromordinal(day).isoformat(),
+                        'cloud_provider': provider,
+                        'total_cost_usd': units / _COST_DIVISOR
+                    })
+        return points
+
+
+class _BadRequest(ValueError):
+    """Invalid query parameter"""
+
+
+class CostApiServer:
+    """
+    Threaded HTTP server answering cost queries from a CostSnapshot
+    """
+
+    def __init__(
+        self,
+        db_manager: DatabaseManager,
+        host: str = '127.0.0.1',
+        port: int = 8080,
+        refresh_seconds: int = 60,
+        snapshot_days: int = 400
+    ):
+        """
+        Initialize the API server (call refresh() and serve_forever() to run it)
+
+        Args:
+            db_manager: Database manager instance
+            host: Interface to listen on
+            port: Port to listen on
+            refresh_seconds: Interval of data watermark checks (0 = only on demand)
+            snapshot_days: Days of history held in memory (0 = all)
+        """
+        self.db_manager = db_manager
+        self.refresh_seconds = refresh_seconds
+        self.snapshot_days = snapshot_days
+        # Cache disabled: only the watermark is needed
+        self._watermarks = CostReports(db_manager, cache_size=0)
+        self.snapshot: Optional[CostSnapshot] = None
+        # Returns the collection daemon's status for /status, when one runs in-process
+        self.status_provider: Optional[Callable[[], Dict[str, Any]]] = None
+        self._responses: Dict[Tuple, Tuple[str, bytes]] = {}
+        self._refresh_lock = threading.Lock()
+        self._stopped = threading.Event()
+
+        handler = type('CostApiRequestHandler', (_CostApiRequestHandler,), {'app': self})
+        self.httpd = ThreadingHTTPServer((host, port), handler)
+        self.httpd.daemon_threads = True
+
+    def refresh(self, force: bool = False) -> bool:
+        """
+        Reload the snapshot if the data watermark moved
+
+        Args:
+            force: Reload even if the watermark is unchanged
+
+        Returns:
+            True if a new snapshot was loaded
+        """
+        with self._refresh_lock:
+            watermark = self._watermarks.data_watermark()
+            if not force and self.snapshot is not None and self.snapshot.watermark == watermark:
+                return False
+
+            since = date.today() - timedelta(days=self.snapshot_days) if self.snapshot_days else None
+            snapshot = CostSnapshot.load(self.db_manager, watermark, since)
+            # Swapping the reference is atomic; requests keep the snapshot they started with
+            self.snapshot = snapshot
+            self._responses = {}
+
+        logger.info(
+            f"Loaded cost snapshot {snapshot.version}: {len(snapshot)} row(s), "
+            f"{snapshot.first_date} to {snapshot.last_date}"
+        )
+        return True
+
+    def on_aggregation_run(self, stats: Dict[str, Any]):
+        """Aggregator run listener: reload the snapshot once a run has written data"""
+        try:
+            self.refresh()
+        except Exception as e:
+            logger.warning(f"Failed to refresh cost snapshot after aggregation run: {e}")
+
+    def _refresh_loop(self):
+        while not self._stopped.wait(self.refresh_seconds):
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.warning(f"Failed to refresh cost snapshot: {e}")
+
+    def serve_forever(self):
+        """Serve requests (and poll the watermark) until shutdown()"""
+        if self.refresh_seconds > 0:
+            threading.Thread(target=self._refresh_loop, name='snapshot-refresh', daemon=True).start()
+        host, port = self.httpd.server_address[:2]
+        logger.info(f"Serving cost API on http://{host}:{port}")
+        self.httpd.serve_forever()
+
+    def shutdown(self, wait: bool = False):
+        """
+        Stop serving
+
+        Args:
+            wait: Block until serve_forever() has returned; must then be
+                  called from another thread than the serving one (without
+                  it, safe from signal handlers)
+        """
+        self._stopped.set()
+        if wait:
+            self.httpd.shutdown()
+        else:
+            threading.Thread(target=self.httpd.shutdown, daemon=True).start()
+
+    def close(self):
+        """Release the listening socket"""
+        self.httpd.server_close()
+
+    def handle(self, path: str, query: str, if_none_match: Optional[str]) -> Tuple[int, Dict[str, str], bytes]:
+        """
+        Answer one GET request
+
+        Args:
+            path: Request path
+            query: Raw query string
+            if_none_match: If-None-Match header value
+
+        Returns:
+            Tuple of (status, headers, body)
+        """
+        snapshot = self.snapshot
+        if path == '/health':
+            return self._json(200, self._health(snapshot))
+        if path == '/status' and self.status_provider is not None:
+            return self._json(200, self.status_provider())
+        if path not in _ENDPOINTS:
+            return self._json(404, {'error': f'Unknown endpoint: {path}'})
+        if snapshot is None:
+            return self._json(503, {'error': 'Cost snapshot not loaded yet'})
+
+        params = parse_qs(query, keep_blank_values=False)
+        key = (snapshot.version, path, tuple(sorted((name, tuple(values)) for name, values in params.items())))
+        cached = self._responses.get(key)
+        if cached is None:
+            try:
+                payload = _ENDPOINTS[path](snapshot, params)
+            except _BadRequest as e:
+                return self._json(400, {'error': str(e)})
+            body = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+            cached = ('"' + hashlib.sha1(body).hexdigest() + '"', body)
+            responses = self._responses
+            if len(responses) >= _MAX_CACHED_RESPONSES:
+                responses.clear()
+            responses[key] = cached
+
+        etag, body = cached
+        headers = {'ETag': etag, 'Cache-Control': 'no-cache'}
+        if if_none_match and _etag_matches(if_none_match, etag):
+            return 304, headers, b''
+        return 200, {**headers, 'Content-Type': 'application/json'}, body
+
+    @staticmethod
+    def _health(snapshot: Optional[CostSnapshot]) -> Dict[str, Any]:
+        if snapshot is None:
+            return {'status': 'loading'}
+        return {
+            'status': 'ok',
+            'snapshot': {
+                'version': snapshot.version,
+                'loaded_at': snapshot.loaded_at.isoformat() + 'Z',
+                'rows': len(snapshot),
+                'first_date': snapshot.first_date.isoformat() if snapshot.first_date else None,
+                'last_date': snapshot.last_date.isoformat() if snapshot.last_date else None
+            }
+        }
+
+    @staticmethod
+    def _json(status: int, payload: Dict[str, Any]) -> Tuple[int, Dict[str, str], bytes]:
+        return status, {'Content-Type': 'application/json', 'Cache-Control': 'no-cache'}, json.dumps(payload).encode('utf-8')
+
+    @classmethod
+    def from_config(cls, db_manager: DatabaseManager, app_config) -> 'CostApiServer':
+        """Build the API server from AppConfig settings"""
+        return cls(
+            db_manager,
+            host=app_config.serve_host,
+            port=app_config.serve_port,
+            refresh_seconds=app_config.serve_refresh_seconds,
+            snapshot_days=app_config.serve_snapshot_days
+        )
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """Whether an If-None-Match header matches an ETag (weak comparison)"""
+    candidates = [candidate.strip() for candidate in if_none_match.split(',')]
+    return '*' in candidates or etag in (candidate[2:] if candidate.startswith('W/') else candidate for candidate in candidates)
+
+
+def _param(params: Dict[str, List[str]], name: str) -> Optional[str]:
+    values = params.get(name)
+    return values[-1] if values else None
+
+
+def _date_range(snapshot: CostSnapshot, params: Dict[str, List[str]]) -> Tuple[date, date]:
+    """start/end parameters, defaulting to the last DEFAULT_REPORT_DAYS days of the snapshot"""
+    try:
+        end = _param(params, 'end')
+        end_date = date.fromisoformat(end) if end else (snapshot.last_date or date.today())
+        start = _param(params, 'start')
+        start_date = date.fromisoformat(start) if start else end_date - timedelta(days=DEFAULT_REPORT_DAYS - 1)
+    except ValueError:
+        raise _BadRequest('start and end must be dates in YYYY-MM-DD format')
+    if start_date > end_date:
+        raise _BadRequest('start must not be after end')
+    return start_date, end_date
+
+
+def _providers(params: Dict[str, List[str]]) -> Optional[set]:
+    value = _param(params, 'providers')
+    return {provider.strip().lower() for provider in value.split(',') if provider.strip()} if value else None
+
+
+def _limit(params: Dict[str, List[str]], default: Optional[int]) -> Optional[int]:
+    value = _param(params, 'limit')
+    if value is None:
+        return default
+    try:
+        limit = int(value)
+    except ValueError:
+        raise _BadRequest('limit must be an integer')
+    if limit < 1:
+        raise _BadRequest('limit must be positive')
+    return limit
+
+
+def _totals(snapshot: CostSnapshot, params: Dict[str, List[str]]) -> Dict[str, Any]:
+    start_date, end_date = _date_range(snapshot, params)
+    group_by = _param(params, 'group_by') or 'provider'
+    if group_by == 'provider':
+        totals = snapshot.provider_totals(start_date, end_date, _providers(params))
+    elif group_by == 'service':
+        totals = snapshot.service_totals(start_date, end_date, _providers(params), _limit(params, None))
+    else:
+        raise _BadRequest("group_by must be 'provider' or 'service'")
+    return {'start': start_date.isoformat(), 'end': end_date.isoformat(), 'group_by': group_by, 'totals': totals}
+
+
+def _timeseries(snapshot: CostSnapshot, params: Dict[str, List[str]]) -> Dict[str, Any]:
+    start_date, end_date = _date_range(snapshot, params)
+    return {
+        'start': start_date.isoformat(),
+        'end': end_date.isoformat(),
+        'points': snapshot.timeseries(start_date, end_date, _providers(params))
+    }
+
+
+def _top_services(snapshot: CostSnapshot, params: Dict[str, List[str]]) -> Dict[str, Any]:
+    start_date, end_date = _date_range(snapshot, params)
+    return {
+        'start': start_date.isoformat(),
+        'end': end_date.isoformat(),
+        'services': snapshot.service_totals(start_date, end_date, _providers(params), _limit(params, 10))
+    }
+
+
+_ENDPOINTS = {
+    '/totals': _totals,
+    '/timeseries': _timeseries,
+    '/top-services': _top_services,
+}
+
+
+class _CostApiRequestHandler(BaseHTTPRequestHandler):
+    """Routes GET requests to CostApiServer.handle (bound as the app attribute)"""
+
+    app: CostApiServer
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        try:
+            status, headers, body = self.app.handle(url.path.rstrip('/') or '/', url.query, self.headers.get('If-None-Match'))
+        except Exception as e:
+            logger.error(f"Failed to handle {self.path}: {e}", exc_info=True)
+            status, headers, body = CostApiServer._json(500, {'error': 'Internal server error'})
+
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logger.debug(f"{self.address_string()} - {format % args}")
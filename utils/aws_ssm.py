@@ -5,15 +5,72 @@ Provides functions to fetch parameters from AWS SSM
 import boto3
 from botocore.exceptions import ClientError
 from typing import Optional
+import hashlib
+import json
+import logging
 import os
+import time
 
+logger = logging.getLogger(__name__)
 
-def get_ssm_parameter(parameter_name: str) -> Optional[str]:
+# Fetched parameters are cached on disk so repeated runs skip the SSM round trip
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'cloud_cost_aggregator', 'ssm')
+DEFAULT_CACHE_TTL_SECONDS = 3600
+
+
+def _cache_path(parameter_name: str, cache_dir: str) -> str:
+    """Build the cache file path for a parameter"""
+    digest = hashlib.sha256(parameter_name.encode('utf-8')).hexdigest()
+    return os.path.join(cache_dir, f"{digest}.json")
+
+
+def _read_cached_parameter(parameter_name: str, cache_dir: str, ttl_seconds: int) -> Optional[str]:
+    """
+    Read a cached parameter value if present and not expired
+
+    Returns:
+        Cached value, or None on miss, expiry or unreadable cache
+    """
+    try:
+        with open(_cache_path(parameter_name, cache_dir), 'r', encoding='utf-8') as cache_file:
+            entry = json.load(cache_file)
+    except (OSError, ValueError):
+        return None
+
+    if time.time() - entry.get('fetched_at', 0) > ttl_seconds:
+        return None
+    return entry.get('value')
+
+
+def _write_cached_parameter(parameter_name: str, value: str, cache_dir: str):
+    """Write a parameter value to the cache, readable only by the current user"""
+    try:
+        os.makedirs(cache_dir, mode=0o700, exist_ok=True)
+        path = _cache_path(parameter_name, cache_dir)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'w', encoding='utf-8') as cache_file:
+            json.dump({'fetched_at': time.time(), 'value': value}, cache_file)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        logger.debug(f"Could not write SSM parameter cache: {e}")
+
+
+def get_ssm_parameter(
+    parameter_name: str,
+    cache_ttl_seconds: Optional[int] = None,
+    cache_dir: Optional[str] = None
+) -> Optional[str]:
     """
     Fetch a parameter from AWS Systems Manager Parameter Store
 
+    Values are cached on disk for cache_ttl_seconds (SSM_CACHE_TTL_SECONDS,
+    default 3600; 0 disables the cache) under cache_dir (SSM_CACHE_DIR).
+
     Args:
         parameter_name: The name/path of the parameter (e.g., '/cloud_cost_aggregator/AZURE_SPONSORSHIP_COOKIES')
+        cache_ttl_seconds: Optional cache TTL override
+        cache_dir: Optional cache directory override
 
     Returns:
         The parameter value as a string, or None if not found
@@ -21,6 +78,17 @@ def get_ssm_parameter(parameter_name: str) -> Optional[str]:
     Raises:
         ClientError: If there's an error accessing AWS SSM
     """
+    if cache_ttl_seconds is None:
+        cache_ttl_seconds = int(os.getenv('SSM_CACHE_TTL_SECONDS', str(DEFAULT_CACHE_TTL_SECONDS)))
+    if cache_dir is None:
+        cache_dir = os.getenv('SSM_CACHE_DIR', DEFAULT_CACHE_DIR)
+
+    if cache_ttl_seconds > 0:
+        cached_value = _read_cached_parameter(parameter_name, cache_dir, cache_ttl_seconds)
+        if cached_value is not None:
+            logger.debug(f"Using cached SSM parameter '{parameter_name}'")
+            return cached_value
+
     try:
         # Use AWS credentials from environment variables
         session_kwargs = {
@@ -38,7 +106,7 @@ def get_ssm_parameter(parameter_name: str) -> Optional[str]:
             WithDecryption=True
         )
 
-        return response['Parameter']['Value']
+        value = response['Parameter']['Value']
 
     except ClientError as e:
         error_code = e.response['Error']['Code']
@@ -48,3 +116,8 @@ def get_ssm_parameter(parameter_name: str) -> Optional[str]:
             raise Exception(f"Error fetching parameter from AWS SSM: {e}")
     except Exception as e:
         raise Exception(f"Unexpected error fetching parameter from AWS SSM: {e}")
+
+    if cache_ttl_seconds > 0:
+        _write_cached_parameter(parameter_name, value, cache_dir)
+
+    return value
@@ -121,3 +121,96 @@ def get_date_list(start_date: datetime.date, end_date: datetime.date) -> list[da
         current_date += datetime.timedelta(days=1)
 
     return date_list
+
+
+def split_date_range(
+    start_date: datetime.date,
+    end_date: datetime.date,
+    window_days: int
+) -> list[Tuple[datetime.date, datetime.date]]:
+    """
+    Split an inclusive date range into consecutive windows
+
+    Args:
+        start_date: Start date (inclusive)
+        end_date: End date (inclusive)
+        window_days: Maximum number of days per window
+
+    Returns:
+        List of (window_start, window_end) tuples, both inclusive, in date order
+
+    Examples:
+        >>> split_date_range(date(2025, 1, 1), date(2025, 1, 10), 4)
+        [(date(2025, 1, 1), date(2025, 1, 4)),
+         (date(2025, 1, 5), date(2025, 1, 8)),
+         (date(2025, 1, 9), date(2025, 1, 10))]
+    """
+    if window_days < 1:
+        raise ValueError(f"window_days must be at least 1, got {window_days}")
+
+    windows = []
+    window_start = start_date
+
+    while window_start <= end_date:
+        window_end = min(window_start + datetime.timedelta(days=window_days - 1), end_date)
+        windows.append((window_start, window_end))
+        window_start = window_end + datetime.timedelta(days=1)
+
+    return windows
+
+
+def group_consecutive_dates(
+    dates: list[datetime.date]
+) -> list[Tuple[datetime.date, datetime.date]]:
+    """
+    Collapse a set of dates into inclusive ranges of consecutive days
+
+    Args:
+        dates: Dates in any order (duplicates allowed)
+
+    Returns:
+        List of (range_start, range_end) tuples, both inclusive, in date order
+
+    Examples:
+        >>> group_consecutive_dates([date(2025, 1, 3), date(2025, 1, 1), date(2025, 1, 2), date(2025, 1, 7)])
+        [(date(2025, 1, 1), date(2025, 1, 3)), (date(2025, 1, 7), date(2025, 1, 7))]
+    """
+    ranges = []
+    for current in sorted(set(dates)):
+        if ranges and current == ranges[-1][1] + datetime.timedelta(days=1):
+            ranges[-1] = (ranges[-1][0], current)
+        else:
+            ranges.append((current, current))
+    return ranges
+
+
+def month_start(value: datetime.date) -> datetime.date:
+    """
+    Get the first day of a date's month
+
+    Args:
+        value: Any date
+
+    Returns:
+        First day of the month
+    """
+    return value.replace(day=1)
+
+
+def add_months(value: datetime.date, months: int) -> datetime.date:
+    """
+    Shift the first day of a date's month by a number of months
+
+    Args:
+        value: Any date
+        months: Months to add (negative to go back)
+
+    Returns:
+        First day of the resulting month
+
+    Examples:
+        >>> add_months(date(2025, 11, 20), 3)
+        date(2026, 2, 1)
+    """
+    month_index = value.year * 12 + value.month - 1 + months
+    return datetime.date(month_index // 12, month_index % 12 + 1, 1)
@@ -0,0 +1,375 @@
+"""
+Window task scheduler for cost collection
+
+Breaks each provider's date range into window tasks and runs them on one
+shared thread pool, enforcing a per-provider concurrency limit and request
+rate budget so a slow provider cannot hog the pool or trip API throttling.
+
+AsyncWindowTaskScheduler runs the same tasks as coroutines on a single
+asyncio event loop instead, with blocking calls confined to a bounded
+executor.
+"""
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from datetime import date
+from typing import Any, Awaitable, Callable, Deque, Dict, Iterator, List, Optional, Tuple
+from collections import deque
+import asyncio
+import threading
+import time
+import logging
+
+from utils.date_utils import split_date_range
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class WindowTask:
+    """A single (provider, account, date window) unit of collection work"""
+    provider: str
+    start_date: date
+    end_date: date
+    account_id: str = ''
+
+    @property
+    def source(self) -> str:
+        """Provider and (if any) account, e.g. 'AWS' or 'AWS/prod'"""
+        if self.account_id:
+            return f"{self.provider.upper()}/{self.account_id}"
+        return self.provider.upper()
+
+    def __str__(self) -> str:
+        return f"{self.source} {self.start_date}..{self.end_date}"
+
+
+class RateLimiter:
+    """
+    Token bucket limiting how many tasks may start per second
+
+    A rate of 0 (or less) disables limiting.
+    """
+
+    def __init__(self, rate_per_second: float, burst: int = 1):
+        self.rate = rate_per_second
+        self.capacity = max(1, burst)
+        self._tokens = float(self.capacity)
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def try_acquire(self) -> float:
+        """
+        Take a token if one is available
+
+        Returns:
+            0 if a token was taken, otherwise seconds until one is available
+        """
+        if self.rate <= 0:
+            return 0.0
+
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+            self._updated_at = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+            return (1 - self._tokens) / self.rate
+
+
+class WindowTaskScheduler:
+    """
+    Runs window tasks on a shared pool with per-provider limits
+
+    Tasks are dispatched round-robin across providers whenever the pool has
+    a free worker, the provider is below its concurrency limit and its rate
+    budget has a token, so no worker ever sits blocked waiting on a limit.
+    """
+
+    def __init__(
+        self,
+        max_workers: int,
+        provider_concurrency: Optional[Dict[str, int]] = None,
+        provider_rates: Optional[Dict[str, float]] = None
+    ):
+        """
+        Initialize scheduler
+
+        Args:
+            max_workers: Size of the shared thread pool
+            provider_concurrency: Max concurrent tasks per provider (default: unlimited)
+            provider_rates: Max task starts per second per provider (default: unlimited)
+        """
+        self.max_workers = max(1, max_workers)
+        self.provider_concurrency = provider_concurrency or {}
+        self.rate_limiters = {
+            provider: RateLimiter(rate, burst=self.provider_concurrency.get(provider, 1))
+            for provider, rate in (provider_rates or {}).items()
+        }
+
+    @staticmethod
+    def plan(
+        provider: str,
+        start_date: date,
+        end_date: date,
+        window_days: int,
+        account_id: str = ''
+    ) -> List[WindowTask]:
+        """
+        Split one provider account's range into window tasks
+
+        Args:
+            provider: Provider name
+            start_date: Start date (inclusive)
+            end_date: End date (inclusive)
+            window_days: Maximum days per task
+            account_id: Account to collect ('' for single-account setups)
+
+        Returns:
+            List of window tasks
+        """
+        return [
+            WindowTask(provider, window_start, window_end, account_id)
+            for window_start, window_end in split_date_range(start_date, end_date, window_days)
+        ]
+
+    def run(
+        self,
+        tasks: List[WindowTask],
+        task_fn: Callable[[WindowTask], Any]
+    ) -> Iterator[Tuple[WindowTask, Any, Optional[BaseException]]]:
+        """
+        Run tasks and yield their outcomes as they complete
+
+        A failing task does not affect the others; its exception is yielded
+        in place of a result.
+
+        Args:
+            tasks: Tasks to run
+            task_fn: Function executed for each task
+
+        Yields:
+            Tuples of (task, result, error); result is None when error is set
+        """
+        pending: Dict[str, Deque[WindowTask]] = {}
+        for task in tasks:
+            pending.setdefault(task.provider, deque()).append(task)
+        running: Dict[str, int] = {provider: 0 for provider in pending}
+        in_flight: Dict[Future, WindowTask] = {}
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while pending or in_flight:
+                retry_in = self._dispatch(executor, pending, running, in_flight, task_fn)
+
+                if not in_flight:
+                    # Everything left is waiting on a rate budget
+                    time.sleep(retry_in or 0)
+                    continue
+
+                done, _ = wait(list(in_flight), timeout=retry_in, return_when=FIRST_COMPLETED)
+                for future in done:
+                    task = in_flight.pop(future)
+                    running[task.provider] -= 1
+                    error = future.exception()
+                    yield task, (None if error else future.result()), error
+
+    def _dispatch(
+        self,
+        executor: ThreadPoolExecutor,
+        pending: Dict[str, Deque[WindowTask]],
+        running: Dict[str, int],
+        in_flight: Dict[Future, WindowTask],
+        task_fn: Callable[[WindowTask], Any]
+    ) -> Optional[float]:
+        """
+        Submit as many pending tasks as the limits allow
+
+        Returns:
+            Seconds until a rate-limited provider may start again, or None
+            if no provider is waiting on its rate budget
+        """
+        retry_in = None
+        progress = True
+
+        while progress and pending and len(in_flight) < self.max_workers:
+            progress = False
+            for provider in list(pending):
+                if len(in_flight) >= self.max_workers:
+                    break
+                limit = self.provider_concurrency.get(provider)
+                if limit and running[provider] >= limit:
+                    continue
+
+                limiter = self.rate_limiters.get(provider)
+                wait_seconds = limiter.try_acquire() if limiter else 0.0
+                if wait_seconds > 0:
+                    retry_in = wait_seconds if retry_in is None else min(retry_in, wait_seconds)
+                    continue
+
+                task = pending[provider].popleft()
+                if not pending[provider]:
+                    del pending[provider]
+                running[provider] += 1
+                in_flight[executor.submit(task_fn, task)] = task
+                logger.debug(f"Dispatched {task} ({len(in_flight)} task(s) in flight)")
+                progress = True
+
+        return retry_in
+
+
+class AsyncWindowTaskScheduler(WindowTaskScheduler):
+    """
+    Runs window tasks as coroutines on one asyncio event loop
+
+    The loop runs on a background thread and owns a shared aiohttp session
+    (when aiohttp is installed) for collectors with native async HTTP paths.
+    Blocking calls made through run_in_executor() land on the loop's default
+    executor, bounded to max_workers threads, so fanning out across many
+    accounts costs coroutines rather than threads.
+    """
+
+    def __init__(
+        self,
+        max_workers: int,
+        provider_concurrency: Optional[Dict[str, int]] = None,
+        provider_rates: Optional[Dict[str, float]] = None,
+        http_connections: int = 32
+    ):
+        """
+        Initialize scheduler
+
+        Args:
+            max_workers: Size of the executor for blocking calls
+            provider_concurrency: Max concurrent tasks per provider (default: unlimited)
+            provider_rates: Max task starts per second per provider (default: unlimited)
+            http_connections: Connection pool size of the shared HTTP session
+        """
+        super().__init__(max_workers, provider_concurrency, provider_rates)
+        self.http_connections = max(1, http_connections)
+
+    def run(
+        self,
+        tasks: List[WindowTask],
+        task_fn: Callable[[WindowTask, Any], Awaitable[Any]]
+    ) -> Iterator[Tuple[WindowTask, Any, Optional[BaseException]]]:
+        """
+        Run tasks and yield their outcomes as they complete
+
+        Args:
+            tasks: Tasks to run
+            task_fn: Coroutine function called with (task, http_session);
+                     http_session is None when aiohttp is not installed
+
+        Yields:
+            Tuples of (task, result, error); result is None when error is set
+        """
+        if not tasks:
+            return
+
+        loop = asyncio.new_event_loop()
+        executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='collector')
+        loop.set_default_executor(executor)
+        loop_thread = threading.Thread(target=loop.run_forever, name='collector-loop', daemon=True)
+        loop_thread.start()
+
+        # Bounded so finished windows wait in the loop rather than piling up
+        # in memory while the consumer is busy writing
+        outcomes = asyncio.run_coroutine_threadsafe(self._make_queue(), loop).result()
+        runner = asyncio.run_coroutine_threadsafe(self._start(tasks, task_fn, outcomes), loop).result()
+
+        try:
+            for _ in range(len(tasks)):
+                yield asyncio.run_coroutine_threadsafe(outcomes.get(), loop).result()
+        finally:
+            # Cancel whatever is left if the consumer stopped early, and let
+            # the runner close the HTTP session before the loop goes away
+            loop.call_soon_threadsafe(runner.cancel)
+            asyncio.run_coroutine_threadsafe(asyncio.wait([runner]), loop).result()
+            loop.call_soon_threadsafe(loop.stop)
+            loop_thread.join()
+            loop.close()
+            executor.shutdown(wait=True)
+
+    async def _make_queue(self) -> asyncio.Queue:
+        """Create the outcome queue on the loop it will be used from"""
+        return asyncio.Queue(maxsize=self.max_workers)
+
+    async def _start(
+        self,
+        tasks: List[WindowTask],
+        task_fn: Callable[[WindowTask, Any], Awaitable[Any]],
+        outcomes: asyncio.Queue
+    ) -> asyncio.Task:
+        """Schedule _run_all() on the loop and return its task handle"""
+        return asyncio.ensure_future(self._run_all(tasks, task_fn, outcomes))
+
+    async def _run_all(
+        self,
+        tasks: List[WindowTask],
+        task_fn: Callable[[WindowTask, Any], Awaitable[Any]],
+        outcomes: asyncio.Queue
+    ):
+        """Run every task under its provider's limits, reporting to outcomes"""
+        limits = {
+            provider: asyncio.Semaphore(limit)
+            for provider, limit in self.provider_concurrency.items()
+            if limit
+        }
+
+        async def run_task(task: WindowTask, http_session):
+            limit = limits.get(task.provider)
+            try:
+                if limit:
+                    await limit.acquire()
+                try:
+                    await self._wait_for_rate_budget(task.provider)
+                    logger.debug(f"Dispatched {task}")
+                    outcome = (task, await task_fn(task, http_session), None)
+                finally:
+                    if limit:
+                        limit.release()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                outcome = (task, None, e)
+            await outcomes.put(outcome)
+
+        http_session = self._open_http_session()
+        try:
+            await asyncio.gather(*(run_task(task, http_session) for task in tasks))
+        finally:
+            if http_session is not None:
+                await http_session.close()
+
+    async def _wait_for_rate_budget(self, provider: str):
+        """Sleep until the provider's rate limiter grants a token"""
+        limiter = self.rate_limiters.get(provider)
+        if limiter is None:
+            return
+        while True:
+            wait_seconds = limiter.try_acquire()
+            if wait_seconds <= 0:
+                return
+            await asyncio.sleep(wait_seconds)
+
+    def _open_http_session(self):
+        """
+        Create the shared aiohttp session, or None if aiohttp is not installed
+
+        Must be called from the event loop.
+        """
+        try:
+            import aiohttp
+        except ImportError:
+            logger.warning(
+                "aiohttp not installed; async engine will run HTTP collectors on the "
+                "blocking executor. Install with: pip install aiohttp"
+            )
+            return None
+
+        try:
+            connector = aiohttp.TCPConnector(limit=self.http_connections)
+            return aiohttp.ClientSession(connector=connector)
+        except Exception as e:
+            logger.warning(f"Failed to create shared HTTP session, falling back to blocking HTTP: {e}")
+            return None